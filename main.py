@@ -1,5 +1,10 @@
 # main.py
+import time
+
+_START = time.perf_counter()
+
 import flet as ft
+import importlib.util
 import os
 import sys
 import logging
@@ -16,21 +21,22 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Необходимые пакеты (проверяются без импорта: тяжелые модули грузятся при первом использовании)
+REQUIRED_MODULES = ('flet', 'okx', 'sqlalchemy', 'pandas', 'numpy', 'websockets')
+
+# Допустимое время от запуска процесса до отрисовки оболочки, сек
+STARTUP_BUDGET = 1.0
+
 
 def check_dependencies():
     """Проверка необходимых зависимостей"""
-    try:
-        import flet
-        import okx
-        import sqlalchemy
-        import pandas
-        import plotly
-        print("✅ Все зависимости установлены")
-        return True
-    except ImportError as e:
-        print(f"❌ Не установлена зависимость: {e}")
+    missing = [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"❌ Не установлены зависимости: {', '.join(missing)}")
         print("Установите зависимости: pip install -r requirements.txt")
         return False
+    print("✅ Все зависимости установлены")
+    return True
 
 
 def main(page: ft.Page):
@@ -39,6 +45,12 @@ def main(page: ft.Page):
         from ui.main_app import OKXDesktopApp
         app = OKXDesktopApp(page)
 
+        elapsed = time.perf_counter() - _START
+        if elapsed > STARTUP_BUDGET:
+            logger.warning(f"Запуск интерфейса занял {elapsed:.2f} с (бюджет {STARTUP_BUDGET:.1f} с)")
+        else:
+            logger.info(f"Интерфейс готов за {elapsed:.2f} с")
+
     except Exception as e:
         logger.error(f"Ошибка запуска приложения: {e}", exc_info=True)
         page.add(ft.Text(f"Критическая ошибка: {str(e)}", color=ft.Colors.RED))
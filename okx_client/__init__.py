@@ -1,8 +1,26 @@
 # okx_client/__init__.py
-from .client import OKXClient
-from .models import Order
-from .database import DatabaseManager
-from .config import Config
+import importlib
 
 __version__ = "1.0.0"
-__all__ = ['OKXClient', 'Order', 'DatabaseManager', 'Config']
+__all__ = ['OKXClient', 'AsyncOKXClient', 'Order', 'Instrument', 'Fill', 'DatabaseManager', 'Config']
+
+# Экспорт по требованию: `from okx_client.config import Config` не тянет
+# за собой клиента, SQLAlchemy и pandas
+_EXPORTS = {
+    'OKXClient': '.client',
+    'AsyncOKXClient': '.async_client',
+    'Order': '.models',
+    'Instrument': '.models',
+    'Fill': '.models',
+    'DatabaseManager': '.database',
+    'Config': '.config',
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,34 @@
+#okx_client/__main__.py
+"""
+Запуск движка данных без UI:
+
+    python -m okx_client serve [--host 127.0.0.1] [--port 8765]
+"""
+import argparse
+import logging
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m okx_client",
+                                     description="Движок данных OKX без UI")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help="Запуск сервиса данных для UI")
+    serve_parser.add_argument('--host', help="Адрес сокета (OKX_SERVICE_HOST)")
+    serve_parser.add_argument('--port', type=int, help="Порт сокета (OKX_SERVICE_PORT)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    )
+
+    if args.command == 'serve':
+        from okx_client.service import serve
+        try:
+            serve(args.host, args.port)
+        except ValueError as e:
+            parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Асинхронный клиент OKX API на общей HTTP/2 сессии
+"""
+import asyncio
+import json
+from typing import Dict, List, Optional, Union
+
+import httpx
+from okx import consts as c
+from okx import utils
+
+from okx_client.config import Config
+from okx_client.rate_limit import RequestScheduler, endpoint_key, rule_for
+from okx_client.transport import http_limits
+from okx_client.managers.public_data import AsyncPublicDataManager
+from okx_client.managers.account import AsyncAccountManager
+from okx_client.managers.trade import AsyncTradeManager
+
+
+class AsyncRestClient:
+    """Подпись и отправка REST-запросов OKX через один httpx.AsyncClient"""
+
+    def __init__(self, api_key: str, secret_key: str, passphrase: str, flag: str,
+                 base_url: str = c.API_URL, timeout: float = None,
+                 scheduler: Optional[RequestScheduler] = None):
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.passphrase = passphrase
+        self.flag = flag
+        self.base_url = base_url
+        self.timeout = timeout if timeout is not None else Config.API_TIMEOUT
+        self.scheduler = scheduler or RequestScheduler()
+        self._http: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        # Создаем лениво: сессия привязывается к event loop, в котором используется
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                # Пул и keep-alive - те же настройки, что у общего синхронного транспорта
+                transport=httpx.AsyncHTTPTransport(http2=True, limits=http_limits(),
+                                                   retries=Config.API_RETRY_COUNT),
+            )
+        return self._http
+
+    async def request(self, method: str, path: str, params: Optional[Union[Dict, List[Dict]]] = None,
+                      private: bool = True) -> Dict:
+        """
+        Выполнение запроса
+
+        Args:
+            method: GET или POST
+            path: Путь endpoint (например, okx.consts.ACCOUNT_INFO)
+            params: Параметры запроса (query для GET, тело для POST;
+                для пакетных endpoint - список ордеров)
+            private: Подписывать ли запрос ключами аккаунта
+        """
+        params = params or {}
+        endpoint = endpoint_key(method, path)
+        coalesce_key = None
+        if rule_for(endpoint).read_only:
+            coalesce_key = (private, utils.parse_params_to_str(params))
+        # Пакетные запросы OKX лимитирует по числу ордеров
+        cost = len(params) if isinstance(params, list) else 1
+        return await self.scheduler.execute_async(endpoint, self._send, method, path, params, private,
+                                                  coalesce_key=coalesce_key, cost=cost)
+
+    async def _send(self, method: str, path: str, params: Union[Dict, List[Dict]],
+                    private: bool) -> Dict:
+        if method == c.GET:
+            path = path + utils.parse_params_to_str(params)
+        body = json.dumps(params) if method == c.POST else ""
+
+        if private:
+            timestamp = utils.get_timestamp()
+            sign = utils.sign(utils.pre_hash(timestamp, method, path, body, False), self.secret_key)
+            headers = utils.get_header(self.api_key, sign, timestamp, self.passphrase, self.flag, False)
+        else:
+            headers = utils.get_header_no_sign(self.flag, False)
+
+        if method == c.GET:
+            response = await self.http.get(path, headers=headers)
+        else:
+            response = await self.http.post(path, content=body, headers=headers)
+        return response.json()
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+class AsyncOKXClient:
+    """
+    Асинхронный клиент OKX.
+
+    Все менеджеры работают через одну пулированную HTTP/2 сессию, поэтому
+    независимые запросы можно запускать параллельно (asyncio.gather) прямо
+    из async-обработчиков Flet, не блокируя UI.
+    """
+
+    def __init__(self, api_key: str = None, secret_key: str = None,
+                 passphrase: str = None, demo_mode: bool = None,
+                 session_factory=None, stream=None, scheduler: Optional[RequestScheduler] = None,
+                 order_writer=None):
+        """
+        Args:
+            api_key: API ключ (если None, берется из конфига)
+            secret_key: Секретный ключ (если None, берется из конфига)
+            passphrase: Парольная фраза (если None, берется из конфига)
+            demo_mode: Режим демо-торговли (если None, берется из конфига)
+            session_factory: Фабрика сессий БД для ордеров
+            stream: MarketDataStream для чтения тикеров и свечей из push-кэша
+            scheduler: Общий с OKXClient планировщик лимитов запросов
+            order_writer: Общий с OKXClient OrderWriter для фоновой записи ордеров
+        """
+        self.api_key = api_key or Config.API_KEY
+        self.secret_key = secret_key or Config.API_SECRET
+        self.passphrase = passphrase or Config.PASSPHRASE
+        self.demo_mode = demo_mode if demo_mode is not None else Config.DEMO_MODE
+        self.flag = "1" if self.demo_mode else "0"
+
+        self.rest = AsyncRestClient(self.api_key, self.secret_key, self.passphrase, self.flag,
+                                    scheduler=scheduler)
+        self.public = AsyncPublicDataManager(self.rest, stream)
+        self.account = AsyncAccountManager(self.rest)
+        self.trader = AsyncTradeManager(self.rest, session_factory, writer=order_writer)
+
+    async def refresh_account(self, inst_type: str = "SWAP") -> Dict[str, Dict]:
+        """Параллельный запрос баланса и позиций"""
+        balance, positions = await asyncio.gather(
+            self.account.get_balance(),
+            self.account.get_positions(inst_type),
+        )
+        return {'balance': balance, 'positions': positions}
+
+    async def aclose(self):
+        await self.rest.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
@@ -0,0 +1,191 @@
+#okx_client/cache.py
+"""
+Кэш ответов публичных endpoint OKX: LRU в памяти с TTL и дисковый уровень
+"""
+import copy
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from okx import consts as c
+
+from okx_client.rate_limit import endpoint_key
+
+logger = logging.getLogger(__name__)
+
+# Время жизни ответа по endpoint, сек. Endpoint без TTL не кэшируются
+PUBLIC_TTLS: Dict[str, float] = {
+    endpoint_key(c.GET, c.INSTRUMENT_INFO): 300,
+    endpoint_key(c.GET, c.HISTORY_CANDLES): 60,
+    endpoint_key(c.GET, c.MARKET_CANDLES): 1,
+    endpoint_key(c.GET, c.MARK_PRICE): 1,
+    endpoint_key(c.GET, c.TICKERS_INFO): 1,
+    endpoint_key(c.GET, c.TICKER_INFO): 0.5,
+    endpoint_key(c.GET, c.ORDER_BOOKS): 0.2,
+}
+
+
+class _DiskTier:
+    """Второй уровень: таблица SQLite (ключ, срок годности, JSON ответа)"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS responses "
+                           "(key TEXT PRIMARY KEY, expires REAL NOT NULL, value TEXT NOT NULL)")
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: float) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT expires, value FROM responses WHERE key = ?",
+                                     (key,)).fetchone()
+        if row is None or row[0] <= now:
+            return None
+        return row[0], json.loads(row[1])
+
+    def put(self, key: str, expires: float, value: Any):
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses (key, expires, value) VALUES (?, ?, ?)",
+                               (key, expires, data))
+
+    def purge(self, now: float):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    Двухуровневый кэш успешных ответов (code == '0').
+
+    Первый уровень - LRU в памяти на max_entries записей со своим TTL для
+    каждого endpoint. Второй (если задан disk_path) - SQLite-файл для
+    endpoint с TTL не меньше disk_min_ttl (справочник инструментов,
+    история свечей): такие ответы переживают перезапуск. Одинаковые
+    запросы в полете объединяет RequestScheduler (coalesce_key), поэтому
+    при промахе в OKX уходит один запрос, а остальные ждут его ответа.
+
+    Ключ включает режим (демо или реальный): инструменты и цены демо-режима
+    не попадают в реальный и наоборот, в том числе через общий файл на диске.
+    get() возвращает копию ответа - изменения вызывающего не портят кэш.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = 1024,
+                 disk_path: Optional[str] = None, disk_min_ttl: float = 60,
+                 demo_mode: bool = False):
+        """
+        Args:
+            ttls: TTL по endpoint (по умолчанию PUBLIC_TTLS)
+            max_entries: Размер LRU в памяти
+            disk_path: Файл дискового уровня; None - только память
+            disk_min_ttl: Минимальный TTL endpoint для записи на диск
+            demo_mode: Режим клиента, ответы которого кэшируются
+        """
+        self.mode = 'demo' if demo_mode else 'live'
+        self.ttls = dict(PUBLIC_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.disk_min_ttl = disk_min_ttl
+        self._entries: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._disk = None
+        if disk_path:
+            try:
+                self._disk = _DiskTier(disk_path)
+                self._disk.purge(time.time())
+            except sqlite3.Error as e:
+                logger.warning("Дисковый кэш недоступен (%s): %s", disk_path, e)
+
+    def caches(self, endpoint: str) -> bool:
+        return endpoint in self.ttls
+
+    def _count(self, endpoint: str, name: str):
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = {'hits': 0, 'disk_hits': 0, 'misses': 0,
+                                             'stores': 0, 'evictions': 0}
+        stats[name] += 1
+
+    def get(self, endpoint: str, key: Any) -> Tuple[bool, Any]:
+        """(найдено, ответ) из памяти или с диска"""
+        now = time.time()
+        full_key = (self.mode, endpoint, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(full_key)
+                    self._count(endpoint, 'hits')
+                    return True, copy.deepcopy(entry[1])
+                del self._entries[full_key]
+
+        if self._disk is not None and self.ttls[endpoint] >= self.disk_min_ttl:
+            try:
+                stored = self._disk.get(repr(full_key), now)
+            except sqlite3.Error as e:
+                logger.warning("Ошибка чтения дискового кэша: %s", e)
+                stored = None
+            if stored is not None:
+                with self._lock:
+                    self._remember(full_key, stored)
+                    self._count(endpoint, 'disk_hits')
+                return True, copy.deepcopy(stored[1])
+
+        with self._lock:
+            self._count(endpoint, 'misses')
+        return False, None
+
+    def put(self, endpoint: str, key: Any, value: Any):
+        """Сохранение ответа (ошибки OKX не кэшируются)"""
+        if not isinstance(value, dict) or value.get('code') != '0':
+            return
+        ttl = self.ttls[endpoint]
+        expires = time.time() + ttl
+        full_key = (self.mode, endpoint, key)
+        # Копия: вызывающий может менять свой ответ после put
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(full_key, (expires, value))
+            self._count(endpoint, 'stores')
+        if self._disk is not None and ttl >= self.disk_min_ttl:
+            try:
+                self._disk.put(repr(full_key), expires, value)
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                logger.warning("Ошибка записи дискового кэша: %s", e)
+
+    def _remember(self, full_key: tuple, entry: Tuple[float, Any]):
+        self._entries[full_key] = entry
+        self._entries.move_to_end(full_key)
+        while len(self._entries) > self.max_entries:
+            (_, endpoint, _), _ = self._entries.popitem(last=False)
+            self._count(endpoint, 'evictions')
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Статистика по endpoint: попадания (память/диск), промахи, доля попаданий"""
+        with self._lock:
+            result = {}
+            for endpoint, values in self._stats.items():
+                lookups = values['hits'] + values['disk_hits'] + values['misses']
+                hit_rate = (values['hits'] + values['disk_hits']) / lookups if lookups else 0.0
+                result[endpoint] = dict(values, hit_rate=round(hit_rate, 4))
+            return result
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
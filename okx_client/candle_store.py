@@ -0,0 +1,394 @@
+"""
+Локальное колоночное хранилище свечей OHLCV (NumPy) с дозагрузкой пропусков
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Структура одной свечи: поля ответа OKX в типизированном виде
+CANDLE_DTYPE = np.dtype([
+    ('ts', 'i8'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('vol', 'f8'),
+    ('vol_ccy', 'f8'),
+    ('vol_ccy_quote', 'f8'),
+    ('confirm', 'i1'),
+])
+
+_MINUTE = 60_000
+_HOUR = 60 * _MINUTE
+_DAY = 24 * _HOUR
+
+# Длительность баров OKX, мс
+BAR_MS: Dict[str, int] = {
+    '1m': _MINUTE, '3m': 3 * _MINUTE, '5m': 5 * _MINUTE, '15m': 15 * _MINUTE,
+    '30m': 30 * _MINUTE, '1H': _HOUR, '2H': 2 * _HOUR, '4H': 4 * _HOUR,
+    '6H': 6 * _HOUR, '12H': 12 * _HOUR, '1D': _DAY, '2D': 2 * _DAY, '3D': 3 * _DAY,
+    '6Hutc': 6 * _HOUR, '12Hutc': 12 * _HOUR, '1Dutc': _DAY, '2Dutc': 2 * _DAY,
+    '3Dutc': 3 * _DAY,
+}
+
+# Бары от 6H без суффикса utc OKX выравнивает по времени Гонконга (UTC+8)
+_HK_OFFSET = 8 * _HOUR
+
+TimeLike = Union[int, float, datetime]
+
+
+def bar_offset(bar: str) -> int:
+    """Смещение начала бара относительно UTC, мс"""
+    if bar.endswith('utc') or BAR_MS[bar] < 6 * _HOUR:
+        return 0
+    return -_HK_OFFSET
+
+
+def to_ms(value: TimeLike) -> int:
+    """Перевод datetime/секунд/миллисекунд в миллисекунды"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    value = int(value)
+    # Значения меньше ~2001 года в мс считаем секундами
+    return value * 1000 if value < 10 ** 12 else value
+
+
+def parse_candles(rows: List[List[str]]) -> np.ndarray:
+    """Разбор ответа OKX (список строковых списков) в структурированный массив, по возрастанию ts"""
+    if not rows:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    # Одно векторное преобразование строк в float64 для всей таблицы
+    values = np.asarray(rows, dtype=object).astype(np.float64)
+    result = np.empty(len(values), dtype=CANDLE_DTYPE)
+    for index, name in enumerate(CANDLE_DTYPE.names):
+        if index < values.shape[1]:
+            result[name] = values[:, index]
+        else:
+            result[name] = 1 if name == 'confirm' else 0
+    result.sort(order='ts')
+    return result
+
+
+def merge_candles(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Слияние двух рядов; при совпадении ts побеждает новая свеча"""
+    if not len(old):
+        return new
+    if not len(new):
+        return old
+    combined = np.concatenate([new, old])
+    _, first = np.unique(combined['ts'], return_index=True)
+    return combined[first]
+
+
+def rollup(candles: np.ndarray, bar: str, source_bar: str = '1m') -> np.ndarray:
+    """Сворачивание мелких свечей source_bar в бар более крупного таймфрейма"""
+    if not len(candles):
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    step = BAR_MS[bar]
+    offset = bar_offset(bar)
+    buckets = (candles['ts'] - offset) // step * step + offset
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(candles)] - 1
+
+    result = np.empty(len(starts), dtype=CANDLE_DTYPE)
+    result['ts'] = buckets[starts]
+    result['open'] = candles['open'][starts]
+    result['close'] = candles['close'][ends]
+    result['high'] = np.maximum.reduceat(candles['high'], starts)
+    result['low'] = np.minimum.reduceat(candles['low'], starts)
+    for name in ('vol', 'vol_ccy', 'vol_ccy_quote'):
+        result[name] = np.add.reduceat(candles[name], starts)
+    result['confirm'] = np.minimum.reduceat(candles['confirm'], starts)
+    # Последний бар неполный, если исходный ряд закончился раньше его конца
+    if candles['ts'][-1] + BAR_MS[source_bar] < result['ts'][-1] + step:
+        result['confirm'][-1] = 0
+    return result
+
+
+def _subtract(start: int, end: int, covered: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Части интервала [start, end], не покрытые интервалами covered"""
+    gaps = []
+    cursor = start
+    for c_start, c_end in covered:
+        if c_end < cursor:
+            continue
+        if c_start > end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, c_start - 1))
+        cursor = max(cursor, c_end + 1)
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _add_interval(covered: List[Tuple[int, int]], start: int, end: int) -> List[Tuple[int, int]]:
+    intervals = sorted(covered + [(start, end)])
+    merged = [intervals[0]]
+    for c_start, c_end in intervals[1:]:
+        last_start, last_end = merged[-1]
+        if c_start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, c_end))
+        else:
+            merged.append((c_start, c_end))
+    return merged
+
+
+def _read_npy_header(f) -> Optional[Tuple[int, int, int]]:
+    """
+    (длина ряда, начало заголовка, начало данных) файла .npy, открытого на чтение
+
+    None - формат заголовка, который не переписывается на месте (3.0).
+    """
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        read_header, size_bytes = np.lib.format.read_array_header_1_0, 2
+    elif version == (2, 0):
+        read_header, size_bytes = np.lib.format.read_array_header_2_0, 4
+    else:
+        return None
+    header_start = f.tell() + size_bytes
+    shape, _, _ = read_header(f)
+    return shape[0], header_start, f.tell()
+
+
+def _npy_header(length: int, size: int) -> Optional[bytes]:
+    """
+    Заголовок .npy ряда длины length, дополненный пробелами до size байт
+
+    np.save оставляет в заголовке запас под рост первой оси, поэтому новая
+    длина помещается на место старой. None - не помещается.
+    """
+    fields = {'descr': np.lib.format.dtype_to_descr(CANDLE_DTYPE), 'fortran_order': False,
+              'shape': (length,)}
+    header = "{" + "".join(f"'{key}': {value!r}, " for key, value in sorted(fields.items())) + "}"
+    if len(header) + 1 > size:
+        return None
+    return (header.ljust(size - 1) + '\n').encode('latin1')
+
+
+class CandleStore:
+    """
+    Хранилище свечей по ключу (instId, bar).
+
+    Каждый ряд - файл .npy со структурированным массивом CANDLE_DTYPE
+    (открывается через memory map) и рядом .json со списком интервалов
+    времени, которые уже загружены. get_range отдает данные с диска и
+    догружает из OKX только непокрытые интервалы, постранично через
+    history-candles, поэтому одни и те же данные не скачиваются дважды:
+    дозагрузку одного ряда одновременно выполняет только один поток.
+    Свечи новее последней записанной дописываются в конец файла, весь
+    файл переписывается только при вставке в середину ряда.
+    """
+
+    PAGE_LIMIT = 100
+
+    def __init__(self, public_manager, root_dir: str = "candles"):
+        """
+        Args:
+            public_manager: PublicDataManager для загрузки истории
+            root_dir: Каталог с файлами рядов
+        """
+        self.public = public_manager
+        self.root_dir = root_dir
+        self._lock = threading.RLock()
+        self._series: Dict[Tuple[str, str], np.ndarray] = {}
+        self._coverage: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+        # Замки дозагрузки по ряду: параллельные get_range не качают одно и то же
+        self._fetch_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    # --- Файлы ---
+
+    def _paths(self, inst_id: str, bar: str) -> Tuple[str, str]:
+        directory = os.path.join(self.root_dir, inst_id)
+        return os.path.join(directory, f"{bar}.npy"), os.path.join(directory, f"{bar}.json")
+
+    def _load(self, inst_id: str, bar: str):
+        key = (inst_id, bar)
+        if key in self._series:
+            return
+        data_path, meta_path = self._paths(inst_id, bar)
+        if os.path.exists(data_path):
+            self._series[key] = np.load(data_path, mmap_mode='r')
+            try:
+                with open(meta_path) as f:
+                    self._coverage[key] = [tuple(item) for item in json.load(f)]
+            except (OSError, ValueError) as e:
+                # Без списка интервалов данные считаем непроверенными: промах кэша,
+                # интервалы догрузятся и сольются с тем, что уже есть в файле
+                logger.warning("Нет списка интервалов ряда %s %s: %s", inst_id, bar, e)
+                self._coverage[key] = []
+        else:
+            self._series[key] = np.empty(0, dtype=CANDLE_DTYPE)
+            self._coverage[key] = []
+
+    def _save(self, inst_id: str, bar: str):
+        key = (inst_id, bar)
+        data_path, meta_path = self._paths(inst_id, bar)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        # Ряд - в память, ссылка на memory map старого файла отпускается: в Windows
+        # отображенный файл нельзя подменить (PermissionError в os.replace)
+        series = np.array(self._series[key])
+        self._series[key] = series
+        # Пишем во временные файлы и атомарно подменяем
+        with open(data_path + '.tmp', 'wb') as f:
+            np.save(f, series)
+        del series
+        os.replace(data_path + '.tmp', data_path)
+        self._save_coverage(inst_id, bar)
+        self._series[key] = np.load(data_path, mmap_mode='r')
+
+    def _save_coverage(self, inst_id: str, bar: str):
+        _, meta_path = self._paths(inst_id, bar)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(self._coverage[(inst_id, bar)], f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def _append_tail(self, inst_id: str, bar: str, candles: np.ndarray) -> bool:
+        """
+        Дописать свечи в конец файла ряда без перезаписи всего файла
+
+        Возможно, если свечи упорядочены и не старше последней записанной
+        (свеча с тем же ts заменяет последнюю). False - нужна полная запись.
+        """
+        key = (inst_id, bar)
+        series = self._series[key]
+        data_path, _ = self._paths(inst_id, bar)
+        ts = candles['ts']
+        if not len(series) or ts[0] < series['ts'][-1] or np.any(np.diff(ts) <= 0):
+            return False
+        position = len(series) - 1 if ts[0] == series['ts'][-1] else len(series)
+        with open(data_path, 'r+b') as f:
+            layout = _read_npy_header(f)
+            if layout is None or layout[0] != len(series):
+                return False
+            _, header_start, data_offset = layout
+            header = _npy_header(position + len(candles), data_offset - header_start)
+            if header is None:
+                return False
+            # Сначала данные, затем длина в заголовке: при сбое длина ряда остается прежней
+            f.seek(data_offset + position * CANDLE_DTYPE.itemsize)
+            f.write(np.ascontiguousarray(candles, dtype=CANDLE_DTYPE).tobytes())
+            f.flush()
+            f.seek(header_start)
+            f.write(header)
+        self._series[key] = np.load(data_path, mmap_mode='r')
+        return True
+
+    # --- Запись ---
+
+    def append(self, inst_id: str, bar: str, candles: np.ndarray,
+               covered: Optional[Tuple[int, int]] = None):
+        """Добавление свечей в ряд и отметка интервала как загруженного"""
+        key = (inst_id, bar)
+        with self._lock:
+            self._load(inst_id, bar)
+            if covered:
+                self._coverage[key] = _add_interval(self._coverage[key], *covered)
+            # Без новых свечей меняется только список интервалов
+            if not len(candles) or self._append_tail(inst_id, bar, candles):
+                if self._coverage[key] or os.path.exists(self._paths(inst_id, bar)[0]):
+                    self._save_coverage(inst_id, bar)
+                return
+            self._series[key] = merge_candles(np.asarray(self._series[key]), candles)
+            self._save(inst_id, bar)
+
+    # --- Чтение ---
+
+    def missing(self, inst_id: str, bar: str, start: TimeLike, end: TimeLike) -> List[Tuple[int, int]]:
+        """Интервалы [start, end], которых нет локально"""
+        with self._lock:
+            self._load(inst_id, bar)
+            return _subtract(to_ms(start), to_ms(end), self._coverage[(inst_id, bar)])
+
+    def get_range(self, inst_id: str, bar: str, start: TimeLike,
+                  end: Optional[TimeLike] = None, fetch: bool = True) -> np.ndarray:
+        """
+        Свечи в интервале [start, end] (по возрастанию времени)
+
+        Args:
+            inst_id: Инструмент (например, 'BTC-USDT')
+            bar: Таймфрейм OKX ('1m', '1H', '1D', ...)
+            start: Начало интервала (datetime, секунды или миллисекунды)
+            end: Конец интервала (по умолчанию - сейчас)
+            fetch: Догружать ли отсутствующие интервалы из OKX
+        """
+        start_ms = to_ms(start)
+        end_ms = to_ms(end) if end is not None else int(time.time() * 1000)
+        if fetch:
+            # Пропуски пересчитываются под замком ряда: второй поток увидит
+            # уже загруженное первым и не пойдет в OKX за теми же свечами
+            with self._fetch_lock(inst_id, bar):
+                for gap_start, gap_end in self.missing(inst_id, bar, start_ms, end_ms):
+                    self._backfill(inst_id, bar, gap_start, gap_end)
+
+        with self._lock:
+            self._load(inst_id, bar)
+            series = self._series[(inst_id, bar)]
+            lo = np.searchsorted(series['ts'], start_ms, side='left')
+            hi = np.searchsorted(series['ts'], end_ms, side='right')
+            return np.array(series[lo:hi])
+
+    def get_rollup(self, inst_id: str, bar: str, start: TimeLike,
+                   end: Optional[TimeLike] = None, source_bar: str = '1m') -> np.ndarray:
+        """Бары таймфрейма bar, собранные локально из ряда source_bar"""
+        step = BAR_MS[bar]
+        offset = bar_offset(bar)
+        start_ms = (to_ms(start) - offset) // step * step + offset
+        return rollup(self.get_range(inst_id, source_bar, start_ms, end), bar, source_bar)
+
+    # --- Дозагрузка ---
+
+    def _fetch_lock(self, inst_id: str, bar: str) -> threading.Lock:
+        with self._lock:
+            return self._fetch_locks.setdefault((inst_id, bar), threading.Lock())
+
+    def _backfill(self, inst_id: str, bar: str, gap_start: int, gap_end: int):
+        """Постраничная загрузка интервала от новых свечей к старым"""
+        step = BAR_MS[bar]
+        now_ms = int(time.time() * 1000)
+        cursor = gap_end + 1
+        pages = []
+        complete = True
+        while cursor > gap_start:
+            result = self.public.get_history_candlesticks(inst_id, bar=bar, after=str(cursor),
+                                                          limit=self.PAGE_LIMIT)
+            if result.get('code') != '0':
+                # Ошибка сети/API: сохраняем загруженное, но интервал не отмечаем
+                complete = False
+                break
+            rows = result.get('data', [])
+            if not rows:
+                break
+            page = parse_candles(rows)
+            pages.append(page)
+            cursor = int(page['ts'][0])
+            if len(rows) < self.PAGE_LIMIT:
+                break
+
+        candles = merge_candles(np.empty(0, dtype=CANDLE_DTYPE),
+                                np.concatenate(pages)) if pages else np.empty(0, dtype=CANDLE_DTYPE)
+        candles = candles[(candles['ts'] >= gap_start) & (candles['ts'] <= gap_end)]
+        if not complete:
+            if len(candles):
+                self.append(inst_id, bar, candles)
+            return
+
+        # Незакрытый бар не считаем загруженным - его обновят следующие запросы
+        covered_end = min(gap_end, now_ms - step)
+        if len(candles) and not candles['confirm'][-1]:
+            covered_end = min(covered_end, int(candles['ts'][-1]) - 1)
+        self.append(inst_id, bar, candles,
+                    covered=(gap_start, covered_end) if covered_end >= gap_start else None)
@@ -2,8 +2,7 @@
 """
 Основной клиент для работы с OKX API
 """
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
 
 # Импорт библиотеки OKX
 from okx.Account import AccountAPI
@@ -12,11 +11,22 @@ from okx.PublicData import PublicAPI
 from okx.Trade import TradeAPI
 
 # Импорт собственных модулей
+from okx_client.cache import ResponseCache
 from okx_client.config import Config
-from okx_client.models import Base
+from okx_client.database import DatabaseManager
+from okx_client.market_stream import MarketDataStream
+from okx_client.rate_limit import RequestScheduler, ScheduledAPI
 from okx_client.managers.public_data import PublicDataManager
 from okx_client.managers.account import AccountManager
 from okx_client.managers.trade import TradeManager
+from okx_client.managers.instruments import InstrumentRegistry
+from okx_client.managers.fills import FillHistory
+from okx_client.order_tracker import OrderTracker
+from okx_client.persistence import OrderWriter
+from okx_client.poller import RefreshScheduler, keyed_diff
+from okx_client.pool import AccountCredentials, ClientPool
+from okx_client.snapshot import StartupSnapshot
+from okx_client.transport import use_transport
 
 class OKXClient:
     """Основной клиент для работы с OKX API"""
@@ -42,10 +52,22 @@ class OKXClient:
         # Проверка ключей
         self._validate_keys()
 
+        # Планировщик запросов с лимитами OKX по endpoint и кэшем публичных ответов
+        self.cache = None
+        if Config.CACHE_ENABLED:
+            self.cache = ResponseCache(max_entries=Config.CACHE_MAX_ENTRIES,
+                                       disk_path=Config.CACHE_PATH or None,
+                                       demo_mode=self.demo_mode)
+        self.scheduler = RequestScheduler(cache=self.cache)
+
         # Инициализация
         self._init_api_clients()
         self._init_database()
+        self._init_stream()
         self._init_managers()
+        self._init_accounts()
+        self._init_poller()
+        self._aio = None
 
         print("✅ OKXClient успешно инициализирован")
 
@@ -66,15 +88,17 @@ class OKXClient:
     def _init_api_clients(self):
         """Инициализация API клиентов OKX"""
         try:
+            # Все клиенты работают через общий транспорт: TLS-соединения с OKX
+            # устанавливаются один раз и переиспользуются (keep-alive, HTTP/2)
+            keys = (self.api_key, self.secret_key, self.passphrase, False, self.flag)
+
             # Для приватных запросов (баланс, ордера) нужны все ключи
-            self.account_api = AccountAPI(self.api_key, self.secret_key,
-                                        self.passphrase, False, self.flag)
-            self.trade_api = TradeAPI(self.api_key, self.secret_key,
-                                    self.passphrase, False, self.flag)
+            self.account_api = ScheduledAPI(use_transport(AccountAPI(*keys)), self.scheduler)
+            self.trade_api = ScheduledAPI(use_transport(TradeAPI(*keys)), self.scheduler)
 
             # Для публичных запросов ключи не нужны
-            self.public_api = PublicAPI(flag=self.flag)
-            self.market_api = MarketAPI(flag=self.flag)
+            self.public_api = ScheduledAPI(use_transport(PublicAPI(flag=self.flag)), self.scheduler)
+            self.market_api = ScheduledAPI(use_transport(MarketAPI(flag=self.flag)), self.scheduler)
 
             print("✅ API клиенты инициализированы")
 
@@ -85,25 +109,149 @@ class OKXClient:
     def _init_database(self):
         """Инициализация базы данных SQLite"""
         try:
-            engine = create_engine(Config.DATABASE_URL, echo=False)
-            Base.metadata.create_all(engine)
-            Session = sessionmaker(bind=engine)
-            self.db_session = Session()
+            self.database = DatabaseManager(Config.DATABASE_URL)
+            self.database.init_db()
+            # Запись - через единственное соединение писателя, UI читает из пула читателей
+            self.session_factory = self.database.session_factory
+            self.read_session_factory = self.database.read_session_factory
+            # Ордера пишутся в фоне пачками, путь ордера не ждет диска
+            self.order_writer = OrderWriter(self.session_factory,
+                                            dead_letter_path=Config.ORDERS_DEAD_LETTER_PATH)
+            self.order_writer.start()
             print("✅ База данных SQLite инициализирована")
         except Exception as e:
             print(f"❌ Ошибка инициализации базы данных: {e}")
             raise
 
+    def _init_stream(self):
+        """Инициализация потока рыночных данных (WebSocket)"""
+        self.market_stream = None
+        if not Config.WS_ENABLED:
+            return
+        self.market_stream = MarketDataStream(
+            demo_mode=self.demo_mode,
+            public_url=Config.WS_PUBLIC_URL or None,
+            business_url=Config.WS_BUSINESS_URL or None,
+        )
+        self.market_stream.start()
+        print("✅ Поток рыночных данных запущен")
+
     def _init_managers(self):
         """Инициализация менеджеров"""
-        self.public = PublicDataManager(self.public_api, self.market_api)
+        self.public = PublicDataManager(self.public_api, self.market_api, self.market_stream,
+                                        max_watched=Config.MAX_TICKERS)
         self.account = AccountManager(self.account_api)
-        self.trader = TradeManager(self.trade_api, self.db_session)
+        self.trader = TradeManager(self.trade_api, self.read_session_factory, writer=self.order_writer)
+        self._init_order_tracker()
+
+        # История сделок: инкрементальная синхронизация в локальную БД
+        self.fills = FillHistory(self.trader, self.session_factory, self.read_session_factory)
+
+        # Справочник инструментов: мгновенно из БД, обновление в фоне
+        self.instruments = InstrumentRegistry(self.public, self.session_factory,
+                                              ttl=Config.INSTRUMENTS_TTL)
+        self.instruments.load()
+        self.instruments.refresh_in_background()
+
+        # Оценка портфеля (pandas) и история свечей (NumPy) создаются при первом обращении
+        self._portfolio = None
+        self._candles = None
+        self._lazy_lock = threading.Lock()
         print("✅ Менеджеры инициализированы")
 
+    def _init_accounts(self):
+        """Пул аккаунтов: основной + субаккаунты из Config.ACCOUNTS_FILE"""
+        try:
+            accounts = [AccountCredentials(**account) for account in Config.load_accounts()]
+        except Exception as e:
+            print(f"❌ Ошибка загрузки субаккаунтов: {e}")
+            accounts = []
+        self.accounts = ClientPool(self, accounts)
+
+    def _init_order_tracker(self):
+        """Отслеживание своих ордеров через приватный WebSocket"""
+        self.order_tracker = None
+        if not Config.WS_ENABLED:
+            return
+        self.order_tracker = OrderTracker(
+            self.api_key, self.secret_key, self.passphrase,
+            writer=self.order_writer,
+            trade_manager=self.trader,
+            demo_mode=self.demo_mode,
+            private_url=Config.WS_PRIVATE_URL or None,
+        )
+        self.trader.tracker = self.order_tracker
+        self.order_tracker.start()
+        print("✅ Приватный поток ордеров запущен")
+
+    def _init_poller(self):
+        """
+        Регистрация фоновых обновлений.
+
+        Задачи создаются приостановленными: приложение включает только те,
+        что нужны видимой вкладке (poller.set_active) и запускает poller.start().
+        """
+        self.poller = RefreshScheduler()
+        self.poller.add('balance', self.account.get_balance, Config.REFRESH_INTERVAL)
+        self.poller.add('positions', self.account.get_positions, Config.REFRESH_INTERVAL)
+        self.poller.add('orders', lambda: self.trader.get_pending_orders(limit=Config.MAX_ORDERS),
+                        Config.REFRESH_INTERVAL)
+        self.poller.add('tickers', self.public.get_watched_tickers,
+                        Config.TICKERS_REFRESH_INTERVAL, diff=keyed_diff)
+        self.poller.add('prices', lambda: self.portfolio.refresh_prices(),
+                        Config.PRICES_REFRESH_INTERVAL, diff=keyed_diff)
+        self.poller.add('fills', self.fills.sync_and_report, Config.FILLS_SYNC_INTERVAL)
+        if len(self.accounts) > 1:
+            self.poller.add('accounts', self.accounts.refresh, Config.REFRESH_INTERVAL)
+
+        # Данные прошлого запуска: представления показывают их до первого ответа OKX
+        self.snapshot = StartupSnapshot(Config.SNAPSHOT_PATH)
+        if self.snapshot.restore(self.poller, self.public):
+            print("✅ Загружен снимок данных прошлого запуска")
+
+    @property
+    def portfolio(self):
+        """Оценка портфеля по вектору цен спотовых тикеров"""
+        with self._lazy_lock:
+            if self._portfolio is None:
+                from okx_client.managers.portfolio import PortfolioValuation
+                self._portfolio = PortfolioValuation(self.public)
+        return self._portfolio
+
+    @property
+    def candles(self):
+        """Локальная история свечей"""
+        with self._lazy_lock:
+            if self._candles is None:
+                from okx_client.candle_store import CandleStore
+                self._candles = CandleStore(self.public, Config.CANDLES_DIR)
+        return self._candles
+
+    @property
+    def aio(self):
+        """Асинхронный клиент с теми же ключами, БД и потоком рыночных данных"""
+        if self._aio is None:
+            from okx_client.async_client import AsyncOKXClient
+            self._aio = AsyncOKXClient(self.api_key, self.secret_key, self.passphrase,
+                                       self.demo_mode, session_factory=self.read_session_factory,
+                                       stream=self.market_stream, scheduler=self.scheduler,
+                                       order_writer=self.order_writer)
+        return self._aio
+
     def close(self):
-        """Закрытие соединения с БД"""
-        self.db_session.close()
+        """Закрытие соединений с биржей и БД"""
+        self.poller.stop()
+        self.snapshot.save(self.poller, self.public.watched)
+        self.accounts.close()
+        if self.order_tracker:
+            self.order_tracker.stop()
+        if self.market_stream:
+            self.market_stream.stop()
+        # Дописываем очередь ордеров до закрытия БД
+        self.order_writer.close()
+        self.database.close()
+        if self.cache:
+            self.cache.close()
         print("✅ Соединение с БД закрыто")
 
     def __enter__(self):
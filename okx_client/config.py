@@ -1,4 +1,5 @@
 # okx_client/config.py
+import json
 import os
 from dotenv import load_dotenv
 from dataclasses import dataclass
@@ -17,15 +18,64 @@ class Config:
 
     # Настройки БД
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///okx_trades.db")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    CANDLES_DIR: str = os.getenv("CANDLES_DIR", "candles")
+    SNAPSHOT_PATH: str = os.getenv("SNAPSHOT_PATH", "okx_snapshot.bin")
+    # Изменения ордеров, которые не удалось записать в БД (JSON Lines)
+    ORDERS_DEAD_LETTER_PATH: str = os.getenv("ORDERS_DEAD_LETTER_PATH", "okx_orders_dead_letter.jsonl")
+
+    # Субаккаунты: JSON-список {"name", "api_key", "secret_key", "passphrase"}
+    ACCOUNTS_FILE: str = os.getenv("OKX_ACCOUNTS_FILE", "accounts.json")
 
     # Настройки приложения
     REFRESH_INTERVAL: int = int(os.getenv("REFRESH_INTERVAL", "10"))
+    TICKERS_REFRESH_INTERVAL: int = int(os.getenv("TICKERS_REFRESH_INTERVAL", "2"))
     MAX_TICKERS: int = int(os.getenv("MAX_TICKERS", "50"))
     MAX_ORDERS: int = int(os.getenv("MAX_ORDERS", "100"))
+    PRICES_REFRESH_INTERVAL: int = int(os.getenv("PRICES_REFRESH_INTERVAL", "10"))
+    FILLS_SYNC_INTERVAL: int = int(os.getenv("FILLS_SYNC_INTERVAL", "60"))
+    INSTRUMENTS_TTL: int = int(os.getenv("INSTRUMENTS_TTL", "3600"))
 
     # Настройки API
     API_TIMEOUT: int = int(os.getenv("API_TIMEOUT", "30"))
     API_RETRY_COUNT: int = int(os.getenv("API_RETRY_COUNT", "3"))
+    # Базовая задержка повтора, сек (растет вдвое с каждой попыткой, со случайным jitter)
+    API_RETRY_BACKOFF: float = float(os.getenv("API_RETRY_BACKOFF", "0.2"))
+    # Дублировать read-only запрос, не ответивший за p95 своего endpoint
+    API_HEDGE_ENABLED: bool = os.getenv("API_HEDGE_ENABLED", "true").lower() == "true"
+    # Circuit breaker: сбоев подряд до отключения endpoint и пауза до пробного запроса, сек
+    BREAKER_THRESHOLD: int = int(os.getenv("BREAKER_THRESHOLD", "5"))
+    BREAKER_RESET: float = float(os.getenv("BREAKER_RESET", "30"))
+    # Пул HTTP-соединений (общий для всех клиентов python-okx)
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_KEEPALIVE: int = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+    # Кэш ответов публичных endpoint (пустой CACHE_PATH - только память)
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    CACHE_PATH: str = os.getenv("CACHE_PATH", "okx_cache.db")
+
+    # Настройки WebSocket (пустой адрес - адрес OKX по умолчанию для режима)
+    WS_ENABLED: bool = os.getenv("OKX_WS_ENABLED", "true").lower() == "true"
+    WS_PUBLIC_URL: str = os.getenv("OKX_WS_PUBLIC_URL", "")
+    WS_BUSINESS_URL: str = os.getenv("OKX_WS_BUSINESS_URL", "")
+    WS_PRIVATE_URL: str = os.getenv("OKX_WS_PRIVATE_URL", "")
+
+    # Headless-сервис (python -m okx_client serve) и подключение UI к нему
+    SERVICE_HOST: str = os.getenv("OKX_SERVICE_HOST", "127.0.0.1")
+    SERVICE_PORT: int = int(os.getenv("OKX_SERVICE_PORT", "8765"))
+    SERVICE_TOKEN: str = os.getenv("OKX_SERVICE_TOKEN", "")
+    # host:port запущенного сервиса; пусто - UI создает свой OKXClient
+    SERVICE_ADDR: str = os.getenv("OKX_SERVICE_ADDR", "")
+
+    @classmethod
+    def load_accounts(cls):
+        """Ключи субаккаунтов из ACCOUNTS_FILE (пустой список, если файла нет)"""
+        if not os.path.exists(cls.ACCOUNTS_FILE):
+            return []
+        with open(cls.ACCOUNTS_FILE, encoding='utf-8') as f:
+            return json.load(f)
 
     @classmethod
     def validate(cls):
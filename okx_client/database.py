@@ -1,22 +1,98 @@
 # okx_client/database.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import StaticPool
 from okx_client.models import Base
 from okx_client.config import Config
 
+# Настройки соединений SQLite: WAL позволяет читать параллельно с записью,
+# synchronous=NORMAL в WAL безопасен и не делает fsync на каждый commit
+SQLITE_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # в КБ: 64 МБ
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+
 
 class DatabaseManager:
-    def __init__(self, database_url=None):
+    """
+    Единая точка доступа к БД.
+
+    Для SQLite используются два пула соединений к одному файлу:
+    писатель - ровно одно соединение (записи из разных потоков идут по
+    очереди и не получают "database is locked"), и читатели - несколько
+    соединений с query_only для UI и фоновых запросов. В режиме WAL
+    читатели не блокируются писателем. Для других СУБД оба пула совпадают.
+    """
+
+    def __init__(self, database_url=None, pool_size=None):
         self.database_url = database_url or Config.DATABASE_URL
-        self.engine = create_engine(self.database_url, echo=False)
+        self.pool_size = pool_size or Config.DB_POOL_SIZE
+        url = make_url(self.database_url)
+        self.is_sqlite = url.get_backend_name() == 'sqlite'
+
+        if not self.is_sqlite:
+            self.engine = create_engine(self.database_url, echo=False, pool_pre_ping=True)
+            self.read_engine = self.engine
+        elif url.database in (None, '', ':memory:'):
+            # БД в памяти существует в рамках одного соединения
+            self.engine = create_engine(self.database_url, echo=False, poolclass=StaticPool,
+                                        connect_args={'check_same_thread': False})
+            self.read_engine = self.engine
+        else:
+            connect_args = {'check_same_thread': False, 'timeout': 30}
+            self.engine = create_engine(self.database_url, echo=False, pool_size=1,
+                                        max_overflow=0, pool_timeout=60,
+                                        connect_args=connect_args)
+            self.read_engine = create_engine(self.database_url, echo=False,
+                                             pool_size=self.pool_size, max_overflow=self.pool_size,
+                                             connect_args=connect_args)
+
+        if self.is_sqlite:
+            event.listen(self.engine, 'connect', self._set_pragmas)
+            if self.read_engine is not self.engine:
+                event.listen(self.read_engine, 'connect', self._set_pragmas)
+                event.listen(self.read_engine, 'connect', self._set_read_only)
+
         self.session_factory = sessionmaker(bind=self.engine)
+        # Сессии чтения не истекают при commit: объекты остаются доступны UI
+        self.read_session_factory = sessionmaker(bind=self.read_engine, autoflush=False,
+                                                 expire_on_commit=False)
         self.Session = scoped_session(self.session_factory)
 
+    @staticmethod
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @staticmethod
+    def _set_read_only(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
     def init_db(self):
         Base.metadata.create_all(self.engine)
+        # create_all не добавляет новые индексы в уже существующие таблицы
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(self.engine, checkfirst=True)
 
     def get_session(self):
         return self.Session()
 
+    def get_read_session(self):
+        """Сессия только для чтения (UI, отчеты)"""
+        return self.read_session_factory()
+
     def close(self):
+        self.Session.remove()
         self.engine.dispose()
+        if self.read_engine is not self.engine:
+            self.read_engine.dispose()
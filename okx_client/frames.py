@@ -0,0 +1,44 @@
+"""
+Преобразование свечей в типизированные pandas DataFrame
+"""
+import numpy as np
+import pandas as pd
+
+from okx_client.candle_store import CANDLE_DTYPE, parse_candles
+
+# Колонки DataFrame свечей (все поля CANDLE_DTYPE, кроме ts - он идет в индекс)
+FRAME_COLUMNS = tuple(name for name in CANDLE_DTYPE.names if name != 'ts')
+
+
+def _frame(ts: np.ndarray, columns) -> pd.DataFrame:
+    index = pd.DatetimeIndex(ts.astype('datetime64[ms]'), name='timestamp', tz='UTC')
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def candles_to_frame(candles: np.ndarray) -> pd.DataFrame:
+    """
+    DataFrame из структурированного массива CANDLE_DTYPE
+
+    Поля в структурированном массиве лежат вперемешку (по свечам), поэтому
+    каждая колонка копируется один раз в непрерывный массив; pandas эти
+    массивы уже не копирует. Индекс - DatetimeIndex (UTC) по ts.
+    """
+    return _frame(candles['ts'], {name: np.ascontiguousarray(candles[name]) for name in FRAME_COLUMNS})
+
+
+def rows_to_frame(rows) -> pd.DataFrame:
+    """
+    DataFrame напрямую из ответа OKX (список строковых списков)
+
+    Таблица разбирается одним преобразованием в float64 и один раз
+    переставляется в колоночный блок (поле - непрерывная строка блока).
+    Float-колонки DataFrame - представления этого блока, без копий по колонкам.
+    """
+    if not rows or len(rows[0]) < len(CANDLE_DTYPE.names):
+        return candles_to_frame(parse_candles(rows))
+    values = np.asarray(rows, dtype=object).astype(np.float64)
+    # Сортировка по ts и транспонирование - одна копия всей таблицы
+    block = np.ascontiguousarray(values[np.argsort(values[:, 0], kind='stable')].T)
+    columns = {name: block[index] for index, name in enumerate(CANDLE_DTYPE.names) if name in FRAME_COLUMNS}
+    columns['confirm'] = columns['confirm'].astype(np.int8)
+    return _frame(block[0].astype(np.int64), columns)
@@ -4,6 +4,8 @@
 """
 from typing import Dict, Optional
 
+from okx import consts as c
+
 
 class AccountManager:
     """Управление данными аккаунта"""
@@ -59,3 +61,44 @@ class AccountManager:
         except Exception as e:
             print(f"✗ Ошибка при запросе конфигурации аккаунта: {e}")
             return {'code': '-1', 'msg': str(e)}
+
+
+class AsyncAccountManager:
+    """Асинхронное управление данными аккаунта"""
+
+    def __init__(self, rest):
+        self.rest = rest
+
+    async def get_balance(self, ccy: Optional[str] = None) -> Dict:
+        """
+        Получение баланса
+
+        Args:
+            ccy: Код валюты (например, 'BTC', 'USDT')
+        """
+        try:
+            params = {'ccy': ccy} if ccy else {}
+            result = await self.rest.request(c.GET, c.ACCOUNT_INFO, params)
+            if result.get('code') != '0':
+                print(f"✗ Ошибка API при запросе баланса: Код {result.get('code', 'N/A')}, "
+                      f"{result.get('msg', 'Неизвестная ошибка')}")
+            return result
+        except Exception as e:
+            print(f"✗ Неожиданная ошибка при запросе баланса: {e}")
+            return {'code': '-1', 'msg': str(e)}
+
+    async def get_positions(self, inst_type: str = "SWAP") -> Dict:
+        """Получение позиций"""
+        try:
+            return await self.rest.request(c.GET, c.POSITION_INFO, {'instType': inst_type})
+        except Exception as e:
+            print(f"✗ Ошибка при запросе позиций: {e}")
+            return {'code': '-1', 'msg': str(e)}
+
+    async def get_account_config(self) -> Dict:
+        """Получение конфигурации аккаунта"""
+        try:
+            return await self.rest.request(c.GET, c.ACCOUNT_CONFIG)
+        except Exception as e:
+            print(f"✗ Ошибка при запросе конфигурации аккаунта: {e}")
+            return {'code': '-1', 'msg': str(e)}
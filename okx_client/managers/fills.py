@@ -0,0 +1,173 @@
+#okx_client/managers/fills.py
+"""
+Локальная история сделок (fills) с инкрементальной синхронизацией и отчетами
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from okx_client.models import Fill
+
+# Типы инструментов, по которым OKX отдает fills-history
+HISTORY_INST_TYPES = ('SPOT', 'MARGIN', 'SWAP', 'FUTURES', 'OPTION')
+
+# Endpoint fills отдает только последние 3 дня; оставляем запас в час
+_RECENT_WINDOW_MS = (3 * 24 - 1) * 3600 * 1000
+
+
+class FillHistory:
+    """
+    Сделки аккаунта в таблице fills.
+
+    billId у OKX монотонно растет, поэтому курсор синхронизации - самый
+    большой billId в БД. sync() листает ответы OKX от новых к старым и
+    останавливается на первой уже известной сделке, так что скачиваются
+    только новые записи. Если последняя синхронизация была больше 3 дней
+    назад (или БД пуста), используется fills-history по каждому типу
+    инструментов, иначе - один запрос к fills. Отчеты (дневной PnL,
+    комиссии) считаются запросами к локальной БД.
+    """
+
+    PAGE_LIMIT = 100
+
+    def __init__(self, trade_manager, session_factory, read_session_factory=None,
+                 inst_types: Tuple[str, ...] = HISTORY_INST_TYPES):
+        """
+        Args:
+            trade_manager: TradeManager для запросов к OKX
+            session_factory: Фабрика сессий БД для записи
+            read_session_factory: Фабрика сессий только для чтения (отчеты)
+            inst_types: Типы инструментов для загрузки fills-history
+        """
+        self.trader = trade_manager
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory or session_factory
+        self.inst_types = tuple(inst_types)
+        self._sync_lock = threading.Lock()
+
+    # --- Синхронизация ---
+
+    def last_fill(self) -> Optional[Tuple[int, int]]:
+        """(billId, ts) последней сохраненной сделки"""
+        session = self.read_session_factory()
+        try:
+            return session.query(Fill.bill_id, Fill.ts).order_by(Fill.bill_id.desc()).first()
+        finally:
+            session.close()
+
+    def sync(self) -> int:
+        """Загрузка новых сделок; возвращает число добавленных"""
+        with self._sync_lock:
+            last = self.last_fill()
+            last_bill = last[0] if last else 0
+            now_ms = int(time.time() * 1000)
+
+            if last and now_ms - last[1] < _RECENT_WINDOW_MS:
+                rows = self._page_back(lambda after: self.trader.get_fills(after=after,
+                                                                           limit=self.PAGE_LIMIT),
+                                       last_bill)
+            else:
+                rows = []
+                for inst_type in self.inst_types:
+                    rows.extend(self._page_back(
+                        lambda after, t=inst_type: self.trader.get_fills_history(
+                            t, after=after, limit=self.PAGE_LIMIT),
+                        last_bill))
+            return self._store(rows)
+
+    def _page_back(self, fetch: Callable[[str], Dict], stop_bill: int) -> List[Dict]:
+        """Страницы от новых к старым до сделки с billId <= stop_bill"""
+        rows = []
+        after = ''
+        while True:
+            result = fetch(after)
+            if result.get('code') != '0':
+                # Частичную загрузку не сохраняем: иначе курсор перескочит через пропуск
+                raise RuntimeError(f"Ошибка загрузки сделок: {result.get('msg')}")
+            page = result.get('data', [])
+            new = [row for row in page if int(row['billId']) > stop_bill]
+            rows.extend(new)
+            if len(new) < len(page) or len(page) < self.PAGE_LIMIT:
+                return rows
+            after = page[-1]['billId']
+
+    def _store(self, rows: List[Dict]) -> int:
+        if not rows:
+            return 0
+        values = {}
+        for row in rows:
+            columns = Fill.columns_from_okx(row)
+            values[columns['bill_id']] = columns
+
+        session = self.session_factory()
+        try:
+            existing = {bill_id for (bill_id,) in session.query(Fill.bill_id).filter(
+                Fill.bill_id >= min(values))}
+            new_rows = [columns for bill_id, columns in values.items() if bill_id not in existing]
+            if new_rows:
+                session.bulk_insert_mappings(Fill, new_rows)
+                session.commit()
+            print(f"💾 Сохранено сделок: {len(new_rows)}")
+            return len(new_rows)
+        except Exception as e:
+            print(f"✗ Ошибка сохранения сделок: {e}")
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    # --- Отчеты ---
+
+    @staticmethod
+    def _day_range(day: Optional[date] = None) -> Tuple[int, int]:
+        """Границы локальных суток в мс"""
+        start = datetime.combine(day or date.today(), datetime.min.time())
+        end = start + timedelta(days=1)
+        return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+
+    def daily_pnl(self, day: Optional[date] = None) -> Dict:
+        """
+        Реализованный PnL и комиссии за сутки
+
+        fillPnl начисляется в валюте расчетов инструмента (USDT, USDC или сама
+        монета у инверсных контрактов), в ней же списывается комиссия, поэтому
+        суммы группируются по feeCcy и не складываются между валютами.
+
+        Returns:
+            {'pnl': {валюта: fillPnl}, 'fees': {валюта: комиссия}, 'fills': число сделок}
+        """
+        start, end = self._day_range(day)
+        session = self.read_session_factory()
+        try:
+            query = session.query(Fill.fee_ccy, func.sum(Fill.fill_pnl), func.count(Fill.id)).filter(
+                Fill.ts >= start, Fill.ts < end).group_by(Fill.fee_ccy)
+            pnl, count = {}, 0
+            for ccy, total, fills in query:
+                count += fills
+                if ccy and total:
+                    pnl[ccy] = float(total)
+            fees = self.fee_report(start, end, session=session)
+            return {'pnl': pnl, 'fees': fees, 'fills': count}
+        finally:
+            session.close()
+
+    def fee_report(self, since: int, until: Optional[int] = None, session=None) -> Dict[str, float]:
+        """Сумма комиссий по валютам за интервал [since, until) в мс"""
+        own_session = session is None
+        session = session or self.read_session_factory()
+        try:
+            query = session.query(Fill.fee_ccy, func.sum(Fill.fee)).filter(Fill.ts >= since)
+            if until is not None:
+                query = query.filter(Fill.ts < until)
+            return {ccy: float(total or 0) for ccy, total in query.group_by(Fill.fee_ccy) if ccy}
+        finally:
+            if own_session:
+                session.close()
+
+    def sync_and_report(self) -> Dict:
+        """Синхронизация и отчет за сегодня (задача фонового обновления)"""
+        self.sync()
+        return self.daily_pnl()
@@ -0,0 +1,218 @@
+#okx_client/managers/instruments.py
+"""
+Локальный справочник инструментов OKX с TTL и инкрементальным обновлением
+"""
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional
+
+from okx_client.models import Instrument
+
+INST_TYPES = ('SPOT', 'SWAP', 'FUTURES', 'OPTION')
+
+
+class InstrumentRegistry:
+    """
+    Справочник инструментов всех типов.
+
+    Инструменты хранятся в таблице instruments и читаются из in-memory
+    индексов (по instId, базовой и котируемой валюте). Обновление сравнивает
+    свежий ответ OKX с предыдущим снимком и пишет в БД только разницу.
+    """
+
+    def __init__(self, public_manager, session_factory, ttl: int = 3600,
+                 option_families: Iterable[str] = ('BTC-USD', 'ETH-USD')):
+        """
+        Args:
+            public_manager: PublicDataManager для запросов к OKX
+            session_factory: Фабрика сессий БД
+            ttl: Время жизни снимка типа инструментов, сек
+            option_families: Семейства опционов (OKX отдает опционы только по instFamily)
+        """
+        self.public = public_manager
+        self.session_factory = session_factory
+        self.ttl = timedelta(seconds=ttl)
+        self.option_families = tuple(option_families)
+
+        self._lock = threading.RLock()
+        self._by_id: Dict[str, Dict] = {}
+        self._by_base: Dict[str, set] = {}
+        self._by_quote: Dict[str, set] = {}
+        self._refreshed_at: Dict[str, datetime] = {}
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    # --- Загрузка и индексы ---
+
+    def load(self) -> int:
+        """Загрузка снимка из БД в память"""
+        session = self.session_factory()
+        try:
+            rows = session.query(Instrument).all()
+            with self._lock:
+                self._by_id.clear()
+                self._by_base.clear()
+                self._by_quote.clear()
+                self._refreshed_at.clear()
+                for row in rows:
+                    self._index(row.to_dict())
+                    refreshed = self._refreshed_at.get(row.inst_type)
+                    if row.refreshed_at and (refreshed is None or row.refreshed_at < refreshed):
+                        self._refreshed_at[row.inst_type] = row.refreshed_at
+            return len(rows)
+        finally:
+            session.close()
+
+    def _index(self, inst: Dict):
+        inst_id = inst['instId']
+        self._by_id[inst_id] = inst
+        if inst.get('baseCcy'):
+            self._by_base.setdefault(inst['baseCcy'], set()).add(inst_id)
+        if inst.get('quoteCcy'):
+            self._by_quote.setdefault(inst['quoteCcy'], set()).add(inst_id)
+
+    def _unindex(self, inst_id: str):
+        inst = self._by_id.pop(inst_id, None)
+        if inst:
+            self._by_base.get(inst.get('baseCcy'), set()).discard(inst_id)
+            self._by_quote.get(inst.get('quoteCcy'), set()).discard(inst_id)
+
+    # --- Поиск ---
+
+    def get(self, inst_id: str) -> Optional[Dict]:
+        """Инструмент по instId"""
+        return self._by_id.get(inst_id)
+
+    def find(self, inst_type: Optional[str] = None, base: Optional[str] = None,
+             quote: Optional[str] = None) -> List[Dict]:
+        """Инструменты по типу, базовой и/или котируемой валюте (сортировка по instId)"""
+        with self._lock:
+            if base is not None:
+                ids = set(self._by_base.get(base, ()))
+                if quote is not None:
+                    ids &= self._by_quote.get(quote, set())
+            elif quote is not None:
+                ids = set(self._by_quote.get(quote, ()))
+            else:
+                ids = self._by_id.keys()
+            result = [self._by_id[i] for i in ids]
+        if inst_type:
+            result = [inst for inst in result if inst.get('instType') == inst_type]
+        return sorted(result, key=lambda inst: inst['instId'])
+
+    def is_stale(self, inst_type: str) -> bool:
+        refreshed = self._refreshed_at.get(inst_type)
+        return refreshed is None or datetime.utcnow() - refreshed > self.ttl
+
+    def ensure(self, inst_type: str = "SPOT") -> List[Dict]:
+        """Инструменты типа; синхронная загрузка только если локально их нет"""
+        instruments = self.find(inst_type)
+        if not instruments:
+            self.refresh(inst_type)
+            instruments = self.find(inst_type)
+        elif self.is_stale(inst_type):
+            self.refresh_in_background([inst_type])
+        return instruments
+
+    # --- Обновление ---
+
+    def _fetch(self, inst_type: str) -> Optional[List[Dict]]:
+        if inst_type != 'OPTION':
+            result = self.public.get_instruments(inst_type)
+            return result.get('data', []) if result.get('code') == '0' else None
+
+        data = []
+        for family in self.option_families:
+            result = self.public.get_instruments(inst_type, inst_family=family)
+            if result.get('code') != '0':
+                return None
+            data.extend(result.get('data', []))
+        return data
+
+    def refresh(self, inst_type: str = "SPOT") -> Dict[str, int]:
+        """
+        Обновление типа инструментов с записью только изменений
+
+        Returns:
+            Количество добавленных, измененных и удаленных инструментов
+        """
+        fresh = self._fetch(inst_type)
+        if fresh is None:
+            return {'added': 0, 'changed': 0, 'removed': 0}
+
+        fresh_by_id = {inst['instId']: inst for inst in fresh}
+        with self._lock:
+            previous = {i: inst for i, inst in self._by_id.items() if inst.get('instType') == inst_type}
+
+        added = [i for i in fresh_by_id if i not in previous]
+        removed = [i for i in previous if i not in fresh_by_id]
+        changed = [i for i in fresh_by_id if i in previous and
+                   Instrument.columns_from_okx(fresh_by_id[i]) != Instrument.columns_from_okx(previous[i])]
+
+        now = datetime.utcnow()
+        session = self.session_factory()
+        try:
+            if removed:
+                session.query(Instrument).filter(Instrument.inst_id.in_(removed)) \
+                    .delete(synchronize_session=False)
+            if changed:
+                rows = session.query(Instrument).filter(Instrument.inst_id.in_(changed)).all()
+                for row in rows:
+                    for column, value in Instrument.columns_from_okx(fresh_by_id[row.inst_id]).items():
+                        setattr(row, column, value)
+            if added:
+                session.bulk_insert_mappings(Instrument, [
+                    dict(Instrument.columns_from_okx(fresh_by_id[i]), refreshed_at=now) for i in added
+                ])
+            session.query(Instrument).filter(Instrument.inst_type == inst_type) \
+                .update({Instrument.refreshed_at: now}, synchronize_session=False)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"✗ Ошибка сохранения инструментов в БД: {e}")
+            return {'added': 0, 'changed': 0, 'removed': 0}
+        finally:
+            session.close()
+
+        with self._lock:
+            for inst_id in removed:
+                self._unindex(inst_id)
+            for inst_id in added + changed:
+                self._unindex(inst_id)
+                self._index(Instrument.okx_from_columns(Instrument.columns_from_okx(fresh_by_id[inst_id])))
+            self._refreshed_at[inst_type] = now
+
+        print(f"🔄 Инструменты {inst_type}: +{len(added)} ~{len(changed)} -{len(removed)}")
+        return {'added': len(added), 'changed': len(changed), 'removed': len(removed)}
+
+    def refresh_stale(self, inst_types: Iterable[str] = INST_TYPES):
+        for inst_type in inst_types:
+            if self.is_stale(inst_type):
+                self.refresh(inst_type)
+
+    def refresh_in_background(self, inst_types: Iterable[str] = INST_TYPES):
+        """Обновление устаревших типов в фоновом потоке"""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        self._refresh_thread = threading.Thread(target=self.refresh_stale, args=(tuple(inst_types),),
+                                                name="okx-instruments", daemon=True)
+        self._refresh_thread.start()
+
+    # --- Валидация ордеров ---
+
+    def validate_order(self, inst_id: str, sz: str, px: Optional[str] = None) -> Optional[str]:
+        """Проверка размера и цены по lotSz/minSz/tickSz. Возвращает текст ошибки или None"""
+        inst = self.get(inst_id)
+        if inst is None:
+            return None
+        try:
+            size = Decimal(sz)
+            if inst.get('minSz') and size < Decimal(inst['minSz']):
+                return f"Минимальный размер ордера {inst['minSz']}"
+            if inst.get('lotSz') and size % Decimal(inst['lotSz']) != 0:
+                return f"Размер должен быть кратен {inst['lotSz']}"
+            if px and inst.get('tickSz') and Decimal(px) % Decimal(inst['tickSz']) != 0:
+                return f"Цена должна быть кратна {inst['tickSz']}"
+        except InvalidOperation:
+            return "Некорректное число"
+        return None
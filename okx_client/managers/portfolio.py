@@ -0,0 +1,209 @@
+#okx_client/managers/portfolio.py
+"""
+Оценка портфеля в USD по вектору цен спотовых тикеров
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Валюты, которые оцениваются 1:1 к котируемой
+STABLE_COINS = ('USDT', 'USDC', 'USD')
+
+# Поля деталей баланса OKX -> колонки оценки
+_BALANCE_FIELDS = {
+    'cashBal': 'balance',
+    'availBal': 'avail',
+    'frozenBal': 'frozen',
+    'eqUsd': 'eq_usd',
+}
+
+
+class PortfolioValuation:
+    """
+    Стоимость всех активов аккаунта в USD.
+
+    Цены всех спотовых пар к quote берутся одним запросом
+    get_tickers(SPOT) (или из push-кэша потока, если там есть все
+    удерживаемые валюты) и хранятся как pandas Series {валюта: цена}.
+    Стоимость считается одной векторной операцией balance * price по всем
+    валютам сразу; для валют без пары к quote используется eqUsd из ответа
+    OKX. При изменении цен (reprice) пересчитываются те же векторы без
+    повторного разбора баланса.
+    """
+
+    def __init__(self, public_manager, quote: str = 'USDT'):
+        """
+        Args:
+            public_manager: PublicDataManager (get_tickers и поток тикеров)
+            quote: Котируемая валюта пар, по которым оцениваются активы
+        """
+        self.public = public_manager
+        self.quote = quote
+        self._suffix = f"-{quote}"
+        self._prices = pd.Series(dtype='float64')
+        self._holdings: Optional[pd.DataFrame] = None
+        self._subscribed = set()
+        self._lock = threading.Lock()
+
+    # --- Цены ---
+
+    def _pair(self, ccy: str) -> str:
+        return f"{ccy}{self._suffix}"
+
+    def _stream_prices(self) -> Optional[Dict[str, float]]:
+        """Цены удерживаемых валют из push-кэша (None, если какой-то нет)"""
+        stream = self.public.stream
+        if stream is None or self._holdings is None or self._prices.empty:
+            return None
+        prices = {}
+        for ccy in self._holdings.index:
+            if ccy in STABLE_COINS:
+                continue
+            if ccy not in self._subscribed:
+                # Валюта без пары к quote не мешает, новая - нужен снимок REST
+                if ccy in self._prices.index:
+                    return None
+                continue
+            ticker = stream.get_ticker(self._pair(ccy))
+            if not ticker:
+                return None
+            prices[ccy] = float(ticker['last'])
+        return prices
+
+    def refresh_prices(self) -> Dict:
+        """
+        Обновление вектора цен
+
+        Returns:
+            {валюта: цена} всех известных цен или ответ API с ошибкой
+        """
+        prices = self._stream_prices()
+        if prices is not None:
+            self.set_prices(prices)
+            return self.prices()
+
+        result = self.public.get_tickers('SPOT')
+        if result.get('code') != '0':
+            return result
+
+        tickers = pd.DataFrame(result.get('data', []), columns=['instId', 'last'])
+        tickers = tickers[tickers['instId'].str.endswith(self._suffix)]
+        series = pd.Series(pd.to_numeric(tickers['last'], errors='coerce').to_numpy(),
+                           index=tickers['instId'].str[:-len(self._suffix)].to_numpy(),
+                           dtype='float64')
+        with self._lock:
+            self._prices = series.dropna()
+        self._subscribe_holdings()
+        return self.prices()
+
+    def set_prices(self, prices: Dict[str, float]):
+        """Точечное обновление цен {валюта: цена} (например, из push-тикеров)"""
+        if not prices:
+            return
+        update = pd.Series(prices, dtype='float64')
+        with self._lock:
+            self._prices = update.combine_first(self._prices)
+
+    def prices(self) -> Dict[str, float]:
+        with self._lock:
+            return self._prices.to_dict()
+
+    def _subscribe_holdings(self):
+        """Подписка на push-тикеры удерживаемых валют, у которых есть пара к quote"""
+        stream = self.public.stream
+        if stream is None or self._holdings is None:
+            return
+        with self._lock:
+            new = [ccy for ccy in self._holdings.index
+                   if ccy not in self._subscribed and ccy not in STABLE_COINS and ccy in self._prices.index]
+        if new:
+            self._subscribed.update(new)
+            stream.subscribe_tickers([self._pair(ccy) for ccy in new])
+
+    # --- Оценка ---
+
+    def value(self, balance_result: Dict) -> Optional[pd.DataFrame]:
+        """
+        Оценка баланса (ответ get_balance)
+
+        Returns:
+            DataFrame с индексом ccy и колонками balance, avail, frozen,
+            price, usd или None при ошибке в ответе
+        """
+        if not balance_result or balance_result.get('code') != '0':
+            return None
+
+        details = [detail for account in balance_result.get('data', [])
+                   for detail in account.get('details', [])]
+        frame = pd.DataFrame.from_records(details, columns=['ccy', *_BALANCE_FIELDS])
+        frame = frame.rename(columns=_BALANCE_FIELDS).set_index('ccy')
+        frame = frame.apply(pd.to_numeric, errors='coerce').astype('float64')
+        frame[['avail', 'frozen']] = frame[['avail', 'frozen']].fillna(0.0)
+        frame['balance'] = frame['balance'].fillna(frame['avail'] + frame['frozen'])
+
+        with self._lock:
+            self._holdings = frame
+        self._subscribe_holdings()
+        return self.valuation()
+
+    def valuation(self) -> Optional[pd.DataFrame]:
+        """Стоимость последнего баланса по текущему вектору цен"""
+        with self._lock:
+            holdings, prices = self._holdings, self._prices
+        if holdings is None:
+            return None
+
+        price = prices.reindex(holdings.index).to_numpy(copy=True)
+        price[holdings.index.isin(STABLE_COINS)] = 1.0
+        usd = holdings['balance'].to_numpy() * price
+        # Нет пары к quote - берем оценку OKX
+        usd = np.where(np.isnan(usd), holdings['eq_usd'].to_numpy(), usd)
+
+        result = holdings[['balance', 'avail', 'frozen']].copy()
+        result['price'] = price
+        result['usd'] = np.nan_to_num(usd)
+        return result
+
+    def reprice(self, prices: Dict[str, float]) -> Optional[pd.DataFrame]:
+        """
+        Пересчет после изменения цен
+
+        Returns:
+            Строки оценки только изменившихся валют или None, если их нет
+        """
+        self.set_prices(prices)
+        valuation = self.valuation()
+        if valuation is None:
+            return None
+        changed = valuation[valuation.index.isin(list(prices))]
+        return changed if len(changed) else None
+
+    def to_usd(self, amounts: Dict[str, float]) -> Tuple[float, Dict[str, float]]:
+        """
+        Перевод сумм {валюта: количество} в USD по текущему вектору цен
+
+        Returns:
+            (сумма в USD, {валюта: количество} для валют без цены)
+        """
+        with self._lock:
+            prices = self._prices
+        usd, unpriced = 0.0, {}
+        for ccy, amount in amounts.items():
+            price = 1.0 if ccy in STABLE_COINS else prices.get(ccy)
+            if price is None or np.isnan(price):
+                unpriced[ccy] = amount
+            else:
+                usd += amount * float(price)
+        return usd, unpriced
+
+    @staticmethod
+    def total(valuation: pd.DataFrame) -> float:
+        return float(valuation['usd'].sum())
+
+    @staticmethod
+    def rows(valuation: pd.DataFrame) -> List[Dict]:
+        """Строки для таблицы балансов (ненулевые остатки)"""
+        visible = valuation[(valuation['balance'] > 0) | (valuation['frozen'] > 0)]
+        return visible.reset_index().to_dict('records')
@@ -2,21 +2,36 @@
 """
 Менеджер для работы с публичными данными OKX API
 """
-from typing import Dict, List
+from typing import Dict, Iterable, List
 from datetime import datetime
 
+from okx import consts as c
+
+from okx_client.orderbook import OrderBook
+
 
 class PublicDataManager:
     """Управление публичными данными (без аутентификации)"""
 
-    def __init__(self, public_api, market_api):
+    def __init__(self, public_api, market_api, stream=None, max_watched: int = 50):
+        """
+        Args:
+            public_api: Клиент PublicAPI
+            market_api: Клиент MarketAPI
+            stream: MarketDataStream - если задан, тикеры и свечи читаются
+                из push-кэша, а REST используется только как fallback
+            max_watched: Предел числа отслеживаемых тикеров
+        """
         self.public = public_api
         self.market = market_api
+        self.stream = stream
+        self.watched: List[str] = []
+        self.max_watched = max_watched
 
-    def get_instruments(self, inst_type: str = "SPOT") -> Dict:
+    def get_instruments(self, inst_type: str = "SPOT", inst_family: str = '') -> Dict:
         """Получение списка инструментов"""
         try:
-            result = self.public.get_instruments(instType=inst_type)
+            result = self.public.get_instruments(instType=inst_type, instFamily=inst_family)
             if result.get('code') == '0':
                 print(f"✓ Получено {len(result['data'])} инструментов типа {inst_type}")
                 return result
@@ -29,10 +44,18 @@ class PublicDataManager:
 
     def get_candlesticks(self, inst_id: str, bar: str = "1m", limit: int = 100) -> List[List[str]]:
         """Получение свечных данных"""
+        if self.stream:
+            cached = self.stream.get_candles(inst_id, bar, limit)
+            if cached is not None:
+                return cached
+
         try:
             result = self.market.get_candlesticks(instId=inst_id, bar=bar, limit=limit)
             if result.get('code') == '0':
-                return result.get('data', [])
+                data = result.get('data', [])
+                if self.stream:
+                    self.stream.seed_candles(inst_id, bar, data, limit)
+                return data
             else:
                 print(f"✗ Ошибка получения свечей: {result.get('msg')}")
                 return []
@@ -40,6 +63,38 @@ class PublicDataManager:
             print(f"✗ Исключение при запросе свечей: {e}")
             return []
 
+    def get_candles_frame(self, inst_id: str, bar: str = "1m", limit: int = 100):
+        """
+        Свечи в виде pandas DataFrame
+
+        Колонки open/high/low/close/vol/... имеют тип float64, индекс -
+        время открытия свечи (UTC), сортировка по возрастанию.
+        """
+        from okx_client.frames import rows_to_frame
+        return rows_to_frame(self.get_candlesticks(inst_id, bar, limit))
+
+    def get_history_candlesticks(self, inst_id: str, bar: str = "1m", after: str = '',
+                                 before: str = '', limit: int = 100) -> Dict:
+        """
+        Получение исторических свечей (постранично)
+
+        Args:
+            inst_id: Инструмент
+            bar: Таймфрейм
+            after: Вернуть свечи старше этого ts (мс)
+            before: Вернуть свечи новее этого ts (мс)
+            limit: Размер страницы (не более 100)
+        """
+        try:
+            result = self.market.get_history_candlesticks(instId=inst_id, after=after, before=before,
+                                                           bar=bar, limit=limit)
+            if result.get('code') != '0':
+                print(f"✗ Ошибка получения истории свечей: {result.get('msg')}")
+            return result
+        except Exception as e:
+            print(f"✗ Исключение при запросе истории свечей: {e}")
+            return {'code': '-1', 'msg': str(e), 'data': []}
+
     def get_mark_price(self, inst_type: str, inst_id: str) -> Dict:
         """Получение маркировочной цены"""
         try:
@@ -50,8 +105,154 @@ class PublicDataManager:
 
     def get_ticker(self, inst_id: str) -> Dict:
         """Получение информации о тикере"""
+        if self.stream:
+            cached = self.stream.get_ticker(inst_id)
+            if cached:
+                return {'code': '0', 'msg': '', 'data': [cached]}
+
+        try:
+            result = self.market.get_ticker(instId=inst_id)
+            if self.stream and result.get('code') == '0' and result.get('data'):
+                self.stream.seed_ticker(result['data'][0])
+            return result
+        except Exception as e:
+            print(f"✗ Ошибка при запросе тикера: {e}")
+            return {'code': '-1', 'msg': str(e)}
+
+    def get_tickers(self, inst_type: str = "SPOT") -> Dict:
+        """Получение тикеров всех инструментов типа одним запросом"""
+        try:
+            result = self.market.get_tickers(instType=inst_type)
+            if result.get('code') != '0':
+                print(f"✗ Ошибка получения тикеров: {result.get('msg')}")
+            return result
+        except Exception as e:
+            print(f"✗ Ошибка при запросе тикеров: {e}")
+            return {'code': '-1', 'msg': str(e), 'data': []}
+
+    def get_watched_tickers(self) -> Dict[str, Dict]:
+        """
+        Тикеры отслеживаемых инструментов {instId: тикер}
+
+        Из push-кэша, если там есть все инструменты, иначе одним запросом get_tickers.
+        """
+        if self.stream:
+            cached = {inst_id: self.stream.get_ticker(inst_id) for inst_id in self.watched}
+            if all(cached.values()):
+                return cached
+
+        inst_types = {'SPOT' if inst_id.count('-') == 1 else
+                      ('SWAP' if inst_id.endswith('-SWAP') else 'FUTURES')
+                      for inst_id in self.watched}
+        tickers = {}
+        for inst_type in inst_types:
+            result = self.get_tickers(inst_type)
+            if result.get('code') != '0':
+                return result
+            tickers.update({t['instId']: t for t in result.get('data', []) if t['instId'] in self.watched})
+        return tickers
+
+    def get_order_book(self, inst_id: str, channel: str = "books", depth: int = 400):
+        """
+        Стакан инструмента (неизменяемый BookSnapshot)
+
+        При наличии потока возвращается копия живого стакана канала из
+        WebSocket; пока он не получен - снимок из REST.
+        """
+        if self.stream:
+            book = self.stream.get_book(inst_id, channel, depth)
+            if book is not None:
+                return book
+            self.stream.subscribe_books(inst_id, channel)
+
+        try:
+            result = self.market.get_orderbook(instId=inst_id, sz=depth)
+            if result.get('code') == '0' and result.get('data'):
+                book = OrderBook(inst_id)
+                book.apply(result['data'][0])
+                return book.snapshot(depth)
+            print(f"✗ Ошибка получения стакана: {result.get('msg')}")
+        except Exception as e:
+            print(f"✗ Исключение при запросе стакана: {e}")
+        return None
+
+    def watch_tickers(self, inst_ids: Iterable[str]):
+        """Добавление инструментов в отслеживаемые (и подписка на push-обновления)"""
+        new_ids = [inst_id for inst_id in inst_ids if inst_id not in self.watched]
+        # Храним не более max_watched последних инструментов
+        self.watched = (self.watched + new_ids)[-self.max_watched:]
+        if self.stream and new_ids:
+            self.stream.subscribe_tickers(new_ids)
+
+
+class AsyncPublicDataManager:
+    """Асинхронное управление публичными данными (без аутентификации)"""
+
+    def __init__(self, rest, stream=None):
+        self.rest = rest
+        self.stream = stream
+
+    async def get_instruments(self, inst_type: str = "SPOT") -> Dict:
+        """Получение списка инструментов"""
+        try:
+            result = await self.rest.request(c.GET, c.INSTRUMENT_INFO, {'instType': inst_type},
+                                             private=False)
+            if result.get('code') != '0':
+                print(f"✗ Ошибка получения инструментов: {result.get('msg')}")
+            return result
+        except Exception as e:
+            print(f"✗ Исключение при запросе инструментов: {e}")
+            return {'code': '-1', 'msg': str(e), 'data': []}
+
+    async def get_candlesticks(self, inst_id: str, bar: str = "1m", limit: int = 100) -> List[List[str]]:
+        """Получение свечных данных"""
+        if self.stream:
+            cached = self.stream.get_candles(inst_id, bar, limit)
+            if cached is not None:
+                return cached
+
+        try:
+            result = await self.rest.request(c.GET, c.MARKET_CANDLES,
+                                             {'instId': inst_id, 'bar': bar, 'limit': limit},
+                                             private=False)
+            if result.get('code') == '0':
+                data = result.get('data', [])
+                if self.stream:
+                    self.stream.seed_candles(inst_id, bar, data, limit)
+                return data
+            print(f"✗ Ошибка получения свечей: {result.get('msg')}")
+            return []
+        except Exception as e:
+            print(f"✗ Исключение при запросе свечей: {e}")
+            return []
+
+    async def get_candles_frame(self, inst_id: str, bar: str = "1m", limit: int = 100):
+        """Свечи в виде pandas DataFrame (см. PublicDataManager.get_candles_frame)"""
+        from okx_client.frames import rows_to_frame
+        return rows_to_frame(await self.get_candlesticks(inst_id, bar, limit))
+
+    async def get_mark_price(self, inst_type: str, inst_id: str) -> Dict:
+        """Получение маркировочной цены"""
+        try:
+            return await self.rest.request(c.GET, c.MARK_PRICE,
+                                           {'instType': inst_type, 'instId': inst_id},
+                                           private=False)
+        except Exception as e:
+            print(f"✗ Ошибка при запросе маркировочной цены: {e}")
+            return {'code': '-1', 'msg': str(e)}
+
+    async def get_ticker(self, inst_id: str) -> Dict:
+        """Получение информации о тикере"""
+        if self.stream:
+            cached = self.stream.get_ticker(inst_id)
+            if cached:
+                return {'code': '0', 'msg': '', 'data': [cached]}
+
         try:
-            return self.market.get_ticker(instId=inst_id)
+            result = await self.rest.request(c.GET, c.TICKER_INFO, {'instId': inst_id}, private=False)
+            if self.stream and result.get('code') == '0' and result.get('data'):
+                self.stream.seed_ticker(result['data'][0])
+            return result
         except Exception as e:
             print(f"✗ Ошибка при запросе тикера: {e}")
             return {'code': '-1', 'msg': str(e)}
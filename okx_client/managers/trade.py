@@ -2,37 +2,273 @@
 """
 Менеджер для торговых операций OKX API
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional
-from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+
+from okx import consts as c
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import sessionmaker
 
 from okx_client.models import Order
+from okx_client.persistence import OrderWriter, order_record, upsert_orders
+
+
+def _order_params(inst_id: str, td_mode: str, side: str, ord_type: str, sz: str,
+                   px: Optional[str] = None, cl_ord_id: Optional[str] = None) -> Dict:
+    """Параметры запроса на размещение ордера"""
+    params = {
+        'instId': inst_id,
+        'tdMode': td_mode,
+        'side': side,
+        'ordType': ord_type,
+        'sz': sz,
+    }
+
+    if px and ord_type == 'limit':
+        params['px'] = px
+    if cl_ord_id:
+        params['clOrdId'] = cl_ord_id
+    return params
+
+
+def _amend_params(inst_id: str, ord_id: Optional[str] = None, cl_ord_id: Optional[str] = None,
+                  new_sz: Optional[str] = None, new_px: Optional[str] = None) -> Dict:
+    """Параметры запроса на изменение ордера"""
+    params = {'instId': inst_id}
+    if ord_id:
+        params['ordId'] = ord_id
+    if cl_ord_id:
+        params['clOrdId'] = cl_ord_id
+    if new_sz:
+        params['newSz'] = new_sz
+    if new_px:
+        params['newPx'] = new_px
+    return params
+
+
+def _cancel_params(inst_id: str, ord_id: Optional[str] = None,
+                   cl_ord_id: Optional[str] = None) -> Dict:
+    """Параметры запроса на отмену ордера"""
+    params = {'instId': inst_id}
+    if ord_id:
+        params['ordId'] = ord_id
+    if cl_ord_id:
+        params['clOrdId'] = cl_ord_id
+    return params
+
+
+# Максимум ордеров в одном пакетном запросе OKX
+BATCH_LIMIT = 20
+# Размер страницы orders-pending OKX
+PENDING_PAGE_LIMIT = 100
+# Сколько пакетов отправлять одновременно (лимит соблюдает RequestScheduler)
+BATCH_WORKERS = 4
+
+
+def _chunks(items: List[Dict], size: int = BATCH_LIMIT) -> List[List[Dict]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _merge_batch_results(chunks: List[List[Dict]], results: List) -> Dict:
+    """
+    Сборка ответов пакетов в один ответ с результатом по каждому ордеру
+
+    Как у OKX: code '0' - все ордера успешны, '1' - все с ошибкой, '2' - частично.
+    """
+    data = []
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, Exception):
+            result = {'code': '-1', 'msg': str(result)}
+        items = result.get('data') or []
+        if len(items) == len(chunk):
+            data.extend(items)
+        else:
+            # Пакет отклонен целиком - ошибка для каждого ордера пакета
+            data.extend({'ordId': params.get('ordId', ''), 'clOrdId': params.get('clOrdId', ''),
+                         'sCode': result.get('code', '-1'), 'sMsg': result.get('msg', '')}
+                        for params in chunk)
+    succeeded = sum(1 for item in data if item.get('sCode') == '0')
+    code = '0' if succeeded == len(data) else ('1' if succeeded == 0 else '2')
+    return {'code': code, 'msg': '', 'data': data}
+
 
+# Колонки облегченной выборки истории ордеров (кортежи без ORM-объектов)
+ORDER_ROW_COLUMNS = (Order.id, Order.order_id, Order.symbol, Order.side, Order.order_type,
+                     Order.price, Order.quantity, Order.status, Order.created_at)
+
+
+class _OrderStoreMixin:
+    """Работа с локальной БД ордеров (общая для sync и async менеджеров)"""
+
+    session_factory: Optional[sessionmaker] = None
+    writer: Optional[OrderWriter] = None
+
+    def _persist(self, records: List[Dict]):
+        """
+        Запись изменений ордеров
+
+        С OrderWriter изменения уходят в фоновую очередь и путь ордера не ждет
+        диска; без него пишутся сразу одной транзакцией.
+        """
+        if not records:
+            return
+        if self.writer is not None:
+            for record in records:
+                self.writer.submit(record)
+            return
+        session = self.session_factory()
+        try:
+            upsert_orders(session, records)
+            session.commit()
+        except Exception as e:
+            print(f"✗ Ошибка записи ордеров в БД: {e}")
+            session.rollback()
+        finally:
+            session.close()
+
+    def _save_order_to_db(self, order_data: Dict, symbol: str,
+                          side: str, order_type: str, quantity: str,
+                          price: Optional[str] = None):
+        """
+        Сохранение ордера в базу данных
+
+        Статус не пишется: в ответе на размещение его нет, а push канала orders
+        мог уже записать более свежий ('live', 'filled'). Новая строка получает 'pending'.
+        """
+        self._persist([{
+            'order_id': order_data.get('ordId', 'N/A'),
+            'symbol': symbol,
+            'side': side,
+            'order_type': order_type,
+            'price': float(price) if price else None,
+            'quantity': float(quantity),
+        }])
+        print(f"💾 Ордер {order_data.get('ordId', 'N/A')} поставлен в очередь записи")
+
+    def _update_order_in_db(self, order_data: Dict):
+        """Обновление ордера в базе данных"""
+        self._persist([order_record(order_data)])
 
-class TradeManager:
+    def _save_orders_to_db(self, params: List[Dict], results: List[Dict]):
+        """Сохранение успешно размещенных ордеров пакета"""
+        records = [{
+            'order_id': item.get('ordId', 'N/A'),
+            'symbol': order['instId'],
+            'side': order['side'],
+            'order_type': order['ordType'],
+            'price': float(order['px']) if order.get('px') else None,
+            'quantity': float(order['sz']),
+        } for order, item in zip(params, results) if item.get('sCode') == '0']
+        self._persist(records)
+        if records:
+            print(f"💾 Ордеров поставлено в очередь записи: {len(records)}")
+
+    def _amend_orders_in_db(self, params: List[Dict], results: List[Dict]):
+        """Обновление цены и объема измененных ордеров (только измененные колонки)"""
+        records = []
+        for changes, item in zip(params, results):
+            if item.get('sCode') != '0' or not item.get('ordId'):
+                continue
+            record = {'order_id': item['ordId'], 'updated_at': datetime.utcnow()}
+            if changes.get('newPx'):
+                record['price'] = float(changes['newPx'])
+            if changes.get('newSz'):
+                record['quantity'] = float(changes['newSz'])
+            records.append(record)
+        self._persist(records)
+
+    def get_local_orders(self, symbol: Optional[str] = None) -> list[type[Order]]:
+        """Получение ордеров из локальной БД"""
+        if self.writer is not None:
+            # Читаем собственные записи: дожидаемся очереди
+            self.writer.flush()
+        # Короткая сессия на чтение: менеджер вызывается из разных потоков
+        session = self.session_factory()
+        try:
+            query = session.query(Order)
+            if symbol:
+                query = query.filter(Order.symbol == symbol)
+            return query.order_by(Order.created_at.desc()).all()
+        finally:
+            session.close()
+
+    def get_order_history(self, symbol: Optional[str] = None, side: Optional[str] = None,
+                          status: Optional[str] = None, since: Optional[datetime] = None,
+                          until: Optional[datetime] = None, limit: int = 100,
+                          cursor: Optional[Tuple[datetime, int]] = None,
+                          as_rows: bool = True) -> Tuple[List, Optional[Tuple[datetime, int]]]:
+        """
+        Страница истории ордеров из локальной БД (новые первыми)
+
+        Пагинация по ключу (created_at, id): следующая страница читается по
+        индексу с места курсора, без OFFSET.
+
+        Args:
+            symbol, side, status: Фильтры
+            since, until: Интервал времени создания
+            limit: Размер страницы
+            cursor: Курсор, возвращенный предыдущим вызовом
+            as_rows: Вернуть кортежи колонок ORDER_ROW_COLUMNS вместо ORM-объектов
+
+        Returns:
+            (ордера, курсор следующей страницы или None, если страница последняя)
+        """
+        if self.writer is not None:
+            self.writer.flush()
+        stmt = select(*ORDER_ROW_COLUMNS) if as_rows else select(Order)
+        if symbol:
+            stmt = stmt.where(Order.symbol == symbol)
+        if side:
+            stmt = stmt.where(Order.side == side)
+        if status:
+            stmt = stmt.where(Order.status == status)
+        if since:
+            stmt = stmt.where(Order.created_at >= since)
+        if until:
+            stmt = stmt.where(Order.created_at < until)
+        if cursor:
+            stmt = stmt.where(tuple_(Order.created_at, Order.id) < tuple_(*cursor))
+        stmt = stmt.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+
+        session = self.session_factory()
+        try:
+            result = session.execute(stmt)
+            items = result.all() if as_rows else result.scalars().all()
+        finally:
+            session.close()
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = (items[-1].created_at, items[-1].id)
+        return items, next_cursor
+
+
+class TradeManager(_OrderStoreMixin):
     """Управление торговыми операциями"""
 
-    def __init__(self, trade_api, db_session: Session):
+    def __init__(self, trade_api, session_factory: Optional[sessionmaker], tracker=None,
+                 writer: Optional[OrderWriter] = None):
+        """
+        Args:
+            trade_api: Клиент TradeAPI
+            session_factory: Фабрика сессий БД; на каждое чтение - своя короткая сессия
+            tracker: OrderTracker - если задан, состояние ордеров читается
+                из push-кэша приватного канала, а REST используется как fallback
+            writer: OrderWriter для фоновой записи ордеров в БД
+        """
         self.trade = trade_api
-        self.db = db_session
+        self.session_factory = session_factory
+        self.tracker = tracker
+        self.writer = writer
 
     def place_order(self, inst_id: str, td_mode: str, side: str,
                     ord_type: str, sz: str, px: Optional[str] = None,
                     cl_ord_id: Optional[str] = None) -> Dict:
         """Размещение ордера"""
-        params = {
-            'instId': inst_id,
-            'tdMode': td_mode,
-            'side': side,
-            'ordType': ord_type,
-            'sz': sz,
-        }
-
-        if px and ord_type == 'limit':
-            params['px'] = px
-        if cl_ord_id:
-            params['clOrdId'] = cl_ord_id
-
+        params = _order_params(inst_id, td_mode, side, ord_type, sz, px, cl_ord_id)
         print(f"📝 Размещение ордера: {params}")
 
         try:
@@ -46,33 +282,22 @@ class TradeManager:
             print(f"✗ Ошибка при размещении ордера: {e}")
             return {'code': '-1', 'msg': str(e)}
 
-    def _save_order_to_db(self, order_data: Dict, symbol: str,
-                          side: str, order_type: str, quantity: str,
-                          price: Optional[str] = None):
-        """Сохранение ордера в базу данных"""
-        try:
-            order = Order(
-                order_id=order_data.get('ordId', 'N/A'),
-                symbol=symbol,
-                side=side,
-                order_type=order_type,
-                price=float(price) if price else None,
-                quantity=float(quantity),
-                status=order_data.get('state', 'pending')
-            )
-            self.db.add(order)
-            self.db.commit()
-            print(f"💾 Ордер {order.order_id} сохранен в БД")
-        except Exception as e:
-            print(f"✗ Ошибка сохранения ордера в БД: {e}")
-            self.db.rollback()
+    def get_order_details(self, inst_id: str, ord_id: str, store: bool = True) -> Dict:
+        """
+        Получение деталей ордера
+
+        Args:
+            store: Обновить ордер в локальной БД (трекер пишет в БД сам)
+        """
+        if self.tracker and self.tracker.synced and self.tracker.is_connected:
+            cached = self.tracker.get_order(ord_id)
+            if cached:
+                return {'code': '0', 'msg': '', 'data': [cached]}
 
-    def get_order_details(self, inst_id: str, ord_id: str) -> Dict:
-        """Получение деталей ордера"""
         try:
-            result = self.trade.get_order_details(instId=inst_id, ordId=ord_id)
+            result = self.trade.get_order(instId=inst_id, ordId=ord_id)
 
-            if result.get('code') == '0' and result.get('data'):
+            if store and result.get('code') == '0' and result.get('data'):
                 self._update_order_in_db(result['data'][0])
 
             return result
@@ -80,32 +305,72 @@ class TradeManager:
             print(f"✗ Ошибка при запросе деталей ордера: {e}")
             return {'code': '-1', 'msg': str(e)}
 
-    def _update_order_in_db(self, order_data: Dict):
-        """Обновление ордера в базе данных"""
+    def get_pending_orders(self, inst_type: str = '', limit: int = 100) -> Dict:
+        """Получение активных ордеров (не более 100 - ограничение OKX)"""
+        if self.tracker:
+            cached = self.tracker.pending_orders()
+            if cached is not None:
+                if inst_type:
+                    cached = [order for order in cached if order.get('instType') == inst_type]
+                return {'code': '0', 'msg': '', 'data': cached[:limit]}
+
         try:
-            order_id = order_data.get('ordId')
-            order = self.db.query(Order).filter_by(order_id=order_id).first()
-
-            if order:
-                order.status = order_data.get('state', order.status)
-                avg_px = order_data.get('avgPx')
-                if avg_px:
-                    order.price = float(avg_px)
-                order.updated_at = datetime.utcnow()
-                self.db.commit()
-                print(f"🔄 Ордер {order_id} обновлен в БД. Статус: {order.status}")
-            else:
-                print(f"⚠️ Ордер {order_id} не найден в БД")
+            return self.trade.get_order_list(instType=inst_type, limit=str(min(limit, 100)))
         except Exception as e:
-            print(f"✗ Ошибка обновления ордера в БД: {e}")
-            self.db.rollback()
+            print(f"✗ Ошибка при запросе активных ордеров: {e}")
+            return {'code': '-1', 'msg': str(e)}
 
-    def get_local_orders(self, symbol: Optional[str] = None) -> list[type[Order]]:
-        """Получение ордеров из локальной БД"""
-        query = self.db.query(Order)
-        if symbol:
-            query = query.filter(Order.symbol == symbol)
-        return query.order_by(Order.created_at.desc()).all()
+    def get_all_pending_orders(self, inst_type: str = '', inst_id: str = '',
+                               use_cache: bool = True) -> Dict:
+        """
+        Все активные ордера без ограничения в 100: страницы orders-pending
+        читаются по курсору after (ordId последнего ордера страницы)
+
+        Args:
+            inst_type, inst_id: Фильтры OKX
+            use_cache: Взять список из push-кэша трекера, если он сверен с биржей
+        """
+        if use_cache and self.tracker:
+            cached = self.tracker.pending_orders()
+            if cached is not None:
+                return {'code': '0', 'msg': '', 'data': [
+                    order for order in cached
+                    if (not inst_type or order.get('instType') == inst_type)
+                    and (not inst_id or order.get('instId') == inst_id)]}
+
+        orders = []
+        after = ''
+        try:
+            while True:
+                result = self.trade.get_order_list(instType=inst_type, instId=inst_id, after=after,
+                                                   limit=str(PENDING_PAGE_LIMIT))
+                if result.get('code') != '0':
+                    return result
+                page = result.get('data', [])
+                orders.extend(page)
+                if len(page) < PENDING_PAGE_LIMIT:
+                    return {'code': '0', 'msg': '', 'data': orders}
+                after = page[-1]['ordId']
+        except Exception as e:
+            print(f"✗ Ошибка при запросе активных ордеров: {e}")
+            return {'code': '-1', 'msg': str(e)}
+
+    def get_fills(self, inst_type: str = '', after: str = '', limit: int = 100) -> Dict:
+        """Сделки за последние 3 дня (новые первыми, страница до billId after)"""
+        try:
+            return self.trade.get_fills(instType=inst_type, after=after, limit=str(min(limit, 100)))
+        except Exception as e:
+            print(f"✗ Ошибка при запросе сделок: {e}")
+            return {'code': '-1', 'msg': str(e)}
+
+    def get_fills_history(self, inst_type: str, after: str = '', limit: int = 100) -> Dict:
+        """Сделки за последние 3 месяца по типу инструментов"""
+        try:
+            return self.trade.get_fills_history(instType=inst_type, after=after,
+                                                limit=str(min(limit, 100)))
+        except Exception as e:
+            print(f"✗ Ошибка при запросе истории сделок: {e}")
+            return {'code': '-1', 'msg': str(e)}
 
     def cancel_order(self, inst_id: str, ord_id: str) -> Dict:
         """Отмена ордера"""
@@ -115,3 +380,175 @@ class TradeManager:
         except Exception as e:
             print(f"✗ Ошибка при отмене ордера: {e}")
             return {'code': '-1', 'msg': str(e)}
+
+    def _send_batches(self, method: str, params: List[Dict]) -> Dict:
+        """Отправка пакетами по BATCH_LIMIT, пакеты выполняются параллельно"""
+        chunks = _chunks(params)
+
+        def send(chunk):
+            try:
+                return getattr(self.trade, method)(chunk)
+            except Exception as e:
+                return {'code': '-1', 'msg': str(e)}
+
+        if len(chunks) == 1:
+            results = [send(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(chunks), BATCH_WORKERS)) as pool:
+                results = list(pool.map(send, chunks))
+        return _merge_batch_results(chunks, results)
+
+    def place_orders(self, orders: List[Dict]) -> Dict:
+        """
+        Пакетное размещение ордеров
+
+        Args:
+            orders: Список параметров как у place_order
+                ({'inst_id', 'td_mode', 'side', 'ord_type', 'sz', 'px', 'cl_ord_id'})
+
+        Returns:
+            Ответ в формате OKX: data - результат по каждому ордеру в исходном порядке
+        """
+        if not orders:
+            return {'code': '0', 'msg': '', 'data': []}
+        params = [_order_params(**order) for order in orders]
+        print(f"📝 Пакетное размещение ордеров: {len(params)}")
+        result = self._send_batches('place_multiple_orders', params)
+        self._save_orders_to_db(params, result['data'])
+        return result
+
+    def amend_orders(self, amendments: List[Dict]) -> Dict:
+        """
+        Пакетное изменение ордеров
+
+        Args:
+            amendments: [{'inst_id', 'ord_id' или 'cl_ord_id', 'new_sz', 'new_px'}]
+        """
+        if not amendments:
+            return {'code': '0', 'msg': '', 'data': []}
+        params = [_amend_params(**amendment) for amendment in amendments]
+        result = self._send_batches('amend_multiple_orders', params)
+        self._amend_orders_in_db(params, result['data'])
+        return result
+
+    def cancel_orders(self, orders: List[Dict]) -> Dict:
+        """
+        Пакетная отмена ордеров
+
+        Args:
+            orders: [{'inst_id', 'ord_id' или 'cl_ord_id'}]
+        """
+        if not orders:
+            return {'code': '0', 'msg': '', 'data': []}
+        params = [_cancel_params(**order) for order in orders]
+        print(f"🗑️ Пакетная отмена ордеров: {len(params)}")
+        return self._send_batches('cancel_multiple_orders', params)
+
+    def cancel_all(self, inst_id: Optional[str] = None, inst_type: str = '',
+                   all_instruments: bool = False) -> Dict:
+        """
+        Отмена всех активных ордеров инструмента (или типа инструментов)
+
+        Args:
+            inst_id: Инструмент; без него отмена затронула бы весь аккаунт
+            inst_type: Тип инструментов
+            all_instruments: Явное подтверждение отмены по всем инструментам
+        """
+        if not inst_id and not inst_type and not all_instruments:
+            return {'code': '-1', 'msg': 'Не выбран инструмент: для отмены всех ордеров аккаунта '
+                                         'передайте all_instruments=True'}
+        pending = self.get_all_pending_orders(inst_type, inst_id or '')
+        if pending.get('code') != '0':
+            return pending
+        orders = [{'inst_id': order['instId'], 'ord_id': order['ordId']}
+                  for order in pending.get('data', [])]
+        return self.cancel_orders(orders)
+
+
+class AsyncTradeManager(_OrderStoreMixin):
+    """Асинхронное управление торговыми операциями"""
+
+    def __init__(self, rest, session_factory: Optional[sessionmaker] = None,
+                 writer: Optional[OrderWriter] = None):
+        self.rest = rest
+        self.session_factory = session_factory
+        self.writer = writer
+
+    @property
+    def _stores(self) -> bool:
+        return self.session_factory is not None or self.writer is not None
+
+    async def place_order(self, inst_id: str, td_mode: str, side: str,
+                          ord_type: str, sz: str, px: Optional[str] = None,
+                          cl_ord_id: Optional[str] = None) -> Dict:
+        """Размещение ордера"""
+        params = _order_params(inst_id, td_mode, side, ord_type, sz, px, cl_ord_id)
+        print(f"📝 Размещение ордера: {params}")
+
+        try:
+            result = await self.rest.request(c.POST, c.PLACR_ORDER, params)
+
+            if self._stores and result.get('code') == '0' and result.get('data'):
+                self._save_order_to_db(result['data'][0], inst_id, side, ord_type, sz, px)
+
+            return result
+        except Exception as e:
+            print(f"✗ Ошибка при размещении ордера: {e}")
+            return {'code': '-1', 'msg': str(e)}
+
+    async def get_order_details(self, inst_id: str, ord_id: str) -> Dict:
+        """Получение деталей ордера"""
+        try:
+            result = await self.rest.request(c.GET, c.ORDER_INFO, {'instId': inst_id, 'ordId': ord_id})
+
+            if self._stores and result.get('code') == '0' and result.get('data'):
+                self._update_order_in_db(result['data'][0])
+
+            return result
+        except Exception as e:
+            print(f"✗ Ошибка при запросе деталей ордера: {e}")
+            return {'code': '-1', 'msg': str(e)}
+
+    async def cancel_order(self, inst_id: str, ord_id: str) -> Dict:
+        """Отмена ордера"""
+        try:
+            return await self.rest.request(c.POST, c.CANCEL_ORDER, {'instId': inst_id, 'ordId': ord_id})
+        except Exception as e:
+            print(f"✗ Ошибка при отмене ордера: {e}")
+            return {'code': '-1', 'msg': str(e)}
+
+    async def _send_batches(self, path: str, params: List[Dict]) -> Dict:
+        """Отправка пакетами по BATCH_LIMIT, пакеты выполняются конкурентно"""
+        chunks = _chunks(params)
+        results = await asyncio.gather(*(self.rest.request(c.POST, path, chunk) for chunk in chunks),
+                                       return_exceptions=True)
+        return _merge_batch_results(chunks, results)
+
+    async def place_orders(self, orders: List[Dict]) -> Dict:
+        """Пакетное размещение ордеров (параметры как у TradeManager.place_orders)"""
+        if not orders:
+            return {'code': '0', 'msg': '', 'data': []}
+        params = [_order_params(**order) for order in orders]
+        print(f"📝 Пакетное размещение ордеров: {len(params)}")
+        result = await self._send_batches(c.BATCH_ORDERS, params)
+        if self._stores:
+            self._save_orders_to_db(params, result['data'])
+        return result
+
+    async def amend_orders(self, amendments: List[Dict]) -> Dict:
+        """Пакетное изменение ордеров"""
+        if not amendments:
+            return {'code': '0', 'msg': '', 'data': []}
+        params = [_amend_params(**amendment) for amendment in amendments]
+        result = await self._send_batches(c.AMEND_BATCH_ORDER, params)
+        if self._stores:
+            self._amend_orders_in_db(params, result['data'])
+        return result
+
+    async def cancel_orders(self, orders: List[Dict]) -> Dict:
+        """Пакетная отмена ордеров"""
+        if not orders:
+            return {'code': '0', 'msg': '', 'data': []}
+        params = [_cancel_params(**order) for order in orders]
+        print(f"🗑️ Пакетная отмена ордеров: {len(params)}")
+        return await self._send_batches(c.CANCEL_BATCH_ORDERS, params)
@@ -0,0 +1,253 @@
+"""
+Потоковый движок рыночных данных OKX поверх WebSocket
+"""
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from okx_client.orderbook import BookSnapshot, OrderBook
+from okx_client.ws import WsConnection, WsLoop, default_ws_urls
+
+logger = logging.getLogger(__name__)
+
+# Каналы стаканов, которые обслуживает публичный endpoint
+BOOK_CHANNELS = ('books5', 'books', 'bbo-tbt', 'books-l2-tbt', 'books50-l2-tbt')
+
+# Максимум свечей в одном ответе REST market/candles
+REST_CANDLES_LIMIT = 300
+
+
+class MarketDataStream:
+    """
+    In-memory состояние рынка, поддерживаемое push-сообщениями OKX.
+
+    Тикеры и стаканы идут через публичный endpoint, свечи - через
+    business endpoint (так требует OKX), каждый endpoint - одно
+    мультиплексированное соединение. REST используется только для
+    холодного старта и дозаполнения после переподключения: после
+    разрыва все свечные ряды помечаются устаревшими до нового seed.
+    """
+
+    def __init__(self, demo_mode: bool = False, public_url: Optional[str] = None,
+                 business_url: Optional[str] = None, max_candles: int = 500):
+        urls = default_ws_urls(demo_mode)
+        self.max_candles = max_candles
+
+        self._lock = threading.Lock()
+        self._tickers: Dict[str, Dict] = {}
+        self._candles: Dict[tuple, List[List[str]]] = {}
+        self._fresh_candles = set()
+        # Ряды, в которых есть вся история инструмента (REST отдал меньше, чем просили)
+        self._complete_candles = set()
+        # Стаканы по (канал, инструмент): books5 и books одного инструмента - разные стаканы
+        self._books: Dict[tuple, OrderBook] = {}
+        self._books_lock = threading.Lock()
+
+        self.messages_received = 0
+        self.last_message_at: Optional[float] = None
+
+        self._ws_loop = WsLoop("okx-market-ws")
+        self.public = WsConnection(public_url or urls['public'], self.handle_message,
+                                   on_disconnect=self._on_public_disconnect)
+        self.business = WsConnection(business_url or urls['business'], self.handle_message,
+                                     on_disconnect=self._on_business_disconnect)
+        self._started = False
+
+    # --- Жизненный цикл ---
+
+    def start(self):
+        """Запуск соединений в фоновом потоке"""
+        if self._started:
+            return
+        self._ws_loop.start()
+        self._ws_loop.submit(self.public.run())
+        self._ws_loop.submit(self.business.run())
+        self._started = True
+
+    def stop(self):
+        """Остановка соединений и фонового потока"""
+        if not self._started:
+            return
+        for connection in (self.public, self.business):
+            try:
+                self._ws_loop.submit(connection.close()).result(timeout=5)
+            except Exception as e:
+                logger.warning("Ошибка закрытия WebSocket: %s", e)
+        self._ws_loop.stop()
+        self._started = False
+
+    @property
+    def is_connected(self) -> bool:
+        return self.public.connected
+
+    # --- Подписки ---
+
+    def _subscribe(self, connection: WsConnection, args: List[Dict]):
+        if self._started:
+            self._ws_loop.submit(connection.subscribe(args))
+        else:
+            # До старта просто запоминаем - подписки уйдут при подключении
+            for arg in args:
+                connection.subscriptions[tuple(sorted(arg.items()))] = arg
+
+    def subscribe_tickers(self, inst_ids: Iterable[str]):
+        self._subscribe(self.public, [{'channel': 'tickers', 'instId': i} for i in inst_ids])
+
+    def subscribe_ticker(self, inst_id: str):
+        self.subscribe_tickers([inst_id])
+
+    def subscribe_candles(self, inst_id: str, bar: str = "1m"):
+        self._subscribe(self.business, [{'channel': f'candle{bar}', 'instId': inst_id}])
+
+    def subscribe_books(self, inst_id: str, channel: str = "books5"):
+        if channel not in BOOK_CHANNELS:
+            raise ValueError(f"Неизвестный канал стакана: {channel}")
+        self._subscribe(self.public, [{'channel': channel, 'instId': inst_id}])
+
+    def _resync_book(self, inst_id: str, channel: str):
+        """Переподписка на канал стакана для получения нового снимка"""
+        with self._books_lock:
+            book = self._books.get((channel, inst_id))
+            if book:
+                book.resyncs += 1
+        logger.warning("Стакан %s (%s) рассинхронизирован, запрашиваем снимок", inst_id, channel)
+        arg = [{'channel': channel, 'instId': inst_id}]
+        if self._started:
+            self._ws_loop.submit(self._resubscribe(arg))
+
+    async def _resubscribe(self, args: List[Dict]):
+        await self.public.unsubscribe(args)
+        await self.public.subscribe(args)
+
+    # --- Чтение состояния ---
+
+    def get_ticker(self, inst_id: str) -> Optional[Dict]:
+        """Последний тикер или None, если данных нет или соединение потеряно"""
+        if not self.public.connected:
+            return None
+        return self._tickers.get(inst_id)
+
+    def get_candles(self, inst_id: str, bar: str = "1m",
+                    limit: int = 100) -> Optional[List[List[str]]]:
+        """
+        Свечи (новые первыми, формат REST) или None, если ряд не покрывает запрос
+
+        Ряд покрывает запрос, если в нем не меньше limit свечей или в нем вся
+        история инструмента - тогда REST вернул бы те же свечи.
+        """
+        key = (inst_id, bar)
+        with self._lock:
+            if key not in self._fresh_candles or not self.business.connected:
+                return None
+            series = self._candles.get(key, [])
+            if len(series) < limit and key not in self._complete_candles:
+                return None
+            return [list(row) for row in series[:limit]]
+
+    def get_book(self, inst_id: str, channel: str = "books5",
+                 depth: Optional[int] = None) -> Optional[BookSnapshot]:
+        """
+        Копия актуального стакана канала или None, если он не получен или рассинхронизирован
+
+        Args:
+            depth: Число уровней каждой стороны в копии (None - все)
+        """
+        if not self.public.connected:
+            return None
+        with self._books_lock:
+            book = self._books.get((channel, inst_id))
+            if book is None or not book.valid:
+                return None
+            return book.snapshot(depth)
+
+    # --- Холодный старт из REST ---
+
+    def seed_ticker(self, ticker: Dict):
+        inst_id = ticker.get('instId')
+        if inst_id:
+            self._tickers[inst_id] = ticker
+            self.subscribe_ticker(inst_id)
+
+    def seed_candles(self, inst_id: str, bar: str, rows: List[List[str]],
+                     limit: Optional[int] = None):
+        """
+        Заполнение ряда из REST-ответа (новые первыми)
+
+        Args:
+            limit: Сколько свечей запрашивалось; если пришло меньше - это вся история
+        """
+        key = (inst_id, bar)
+        with self._lock:
+            merged = {row[0]: row for row in self._candles.get(key, [])}
+            merged.update({row[0]: row for row in rows})
+            series = sorted(merged.values(), key=lambda r: int(r[0]), reverse=True)
+            self._candles[key] = series[:self.max_candles]
+            self._fresh_candles.add(key)
+            if limit is not None and len(rows) < min(limit, REST_CANDLES_LIMIT) \
+                    and len(series) <= self.max_candles:
+                self._complete_candles.add(key)
+        self.subscribe_candles(inst_id, bar)
+
+    # --- Обработка сообщений ---
+
+    def handle_message(self, message: Dict):
+        """Применение одного сообщения OKX (можно вызывать с записанными кадрами)"""
+        if 'event' in message:
+            if message['event'] == 'error':
+                logger.warning("Ошибка подписки OKX: %s %s", message.get('code'), message.get('msg'))
+            return
+
+        arg = message.get('arg', {})
+        channel = arg.get('channel', '')
+        data = message.get('data') or []
+        self.messages_received += 1
+        self.last_message_at = time.time()
+
+        if channel == 'tickers':
+            for ticker in data:
+                self._tickers[ticker['instId']] = ticker
+        elif channel.startswith('candle'):
+            self._apply_candles(arg['instId'], channel[len('candle'):], data)
+        elif channel in BOOK_CHANNELS:
+            self._apply_book(arg['instId'], channel, message.get('action', 'snapshot'), data)
+
+    def _apply_book(self, inst_id: str, channel: str, action: str, data: List[Dict]):
+        resync = False
+        with self._books_lock:
+            book = self._books.get((channel, inst_id))
+            if book is None:
+                book = self._books[(channel, inst_id)] = OrderBook(inst_id)
+            for item in data:
+                was_valid = book.valid
+                if not book.apply(item, action):
+                    # Переподписываемся один раз - до нового снимка дельты игнорируются
+                    resync = action != 'update' or was_valid
+                    break
+        if resync:
+            self._resync_book(inst_id, channel)
+
+    def _apply_candles(self, inst_id: str, bar: str, rows: List[List[str]]):
+        key = (inst_id, bar)
+        with self._lock:
+            series = self._candles.setdefault(key, [])
+            for row in rows:
+                if series and series[0][0] == row[0]:
+                    series[0] = row
+                elif not series or int(row[0]) > int(series[0][0]):
+                    series.insert(0, row)
+                    if len(series) > self.max_candles:
+                        series.pop()
+                        # Самая старая свеча отброшена - ряд больше не вся история
+                        self._complete_candles.discard(key)
+
+    def _on_public_disconnect(self, connection: WsConnection):
+        # Тикеры после переподключения придут полным снимком
+        self._tickers.clear()
+        with self._books_lock:
+            self._books.clear()
+
+    def _on_business_disconnect(self, connection: WsConnection):
+        # Во время разрыва могли быть пропущены свечи - нужен REST gap-fill
+        with self._lock:
+            self._fresh_candles.clear()
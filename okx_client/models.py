@@ -3,7 +3,7 @@
 Модели базы данных SQLAlchemy
 """
 from datetime import datetime
-from sqlalchemy import Column, String, Float, DateTime, Integer
+from sqlalchemy import Column, String, Float, DateTime, Integer, BigInteger, Index
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -24,6 +24,13 @@ class Order(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Индексы под выборки истории: фильтр + сортировка по времени
+    __table_args__ = (
+        Index('ix_orders_symbol_created', 'symbol', 'created_at', 'id'),
+        Index('ix_orders_status_created', 'status', 'created_at', 'id'),
+        Index('ix_orders_created', 'created_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<Order {self.order_id}: {self.symbol} {self.side} {self.quantity} @ {self.price}>"
 
@@ -41,3 +48,129 @@ class Order(Base):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+
+class Instrument(Base):
+    """Модель для хранения справочника инструментов OKX"""
+    __tablename__ = 'instruments'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    inst_id = Column(String, unique=True, nullable=False, index=True)
+    inst_type = Column(String, nullable=False, index=True)  # SPOT/SWAP/FUTURES/OPTION
+    inst_family = Column(String, nullable=True)
+    base_ccy = Column(String, nullable=True, index=True)
+    quote_ccy = Column(String, nullable=True, index=True)
+    settle_ccy = Column(String, nullable=True)
+    # Размеры храним строками, чтобы не терять точность шага
+    tick_sz = Column(String, nullable=True)
+    lot_sz = Column(String, nullable=True)
+    min_sz = Column(String, nullable=True)
+    ct_val = Column(String, nullable=True)
+    state = Column(String, nullable=True)
+    list_time = Column(BigInteger, nullable=True)
+    exp_time = Column(BigInteger, nullable=True)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+    # Соответствие колонок полям ответа OKX
+    FIELDS = {
+        'inst_id': 'instId',
+        'inst_type': 'instType',
+        'inst_family': 'instFamily',
+        'base_ccy': 'baseCcy',
+        'quote_ccy': 'quoteCcy',
+        'settle_ccy': 'settleCcy',
+        'tick_sz': 'tickSz',
+        'lot_sz': 'lotSz',
+        'min_sz': 'minSz',
+        'ct_val': 'ctVal',
+        'state': 'state',
+        'list_time': 'listTime',
+        'exp_time': 'expTime',
+    }
+
+    def __repr__(self):
+        return f"<Instrument {self.inst_id} ({self.inst_type})>"
+
+    @classmethod
+    def columns_from_okx(cls, data: dict) -> dict:
+        """Значения колонок из записи ответа OKX"""
+        values = {}
+        for column, field in cls.FIELDS.items():
+            value = data.get(field) or None
+            if value is not None and column in ('list_time', 'exp_time'):
+                value = int(value)
+            values[column] = value
+        return values
+
+    @classmethod
+    def okx_from_columns(cls, values: dict) -> dict:
+        """Запись в формате OKX из значений колонок"""
+        return {field: (str(values[column]) if values.get(column) is not None else '')
+                for column, field in cls.FIELDS.items()}
+
+    def to_dict(self):
+        """Преобразование в словарь в формате OKX"""
+        return self.okx_from_columns({column: getattr(self, column) for column in self.FIELDS})
+
+
+class Fill(Base):
+    """Модель для хранения исполненных сделок (fills) аккаунта"""
+    __tablename__ = 'fills'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # billId монотонно растет - курсор инкрементальной синхронизации
+    bill_id = Column(BigInteger, unique=True, nullable=False, index=True)
+    trade_id = Column(String, nullable=True)
+    ord_id = Column(String, nullable=True, index=True)
+    inst_id = Column(String, nullable=False)
+    inst_type = Column(String, nullable=False)
+    side = Column(String, nullable=True)  # buy/sell
+    pos_side = Column(String, nullable=True)
+    exec_type = Column(String, nullable=True)  # T - taker, M - maker
+    fill_px = Column(Float, nullable=True)
+    fill_sz = Column(Float, nullable=True)
+    fill_pnl = Column(Float, nullable=True)
+    fee = Column(Float, nullable=True)  # отрицательная - списанная комиссия
+    fee_ccy = Column(String, nullable=True)
+    ts = Column(BigInteger, nullable=False)  # мс
+
+    __table_args__ = (
+        Index('ix_fills_ts', 'ts'),
+        Index('ix_fills_inst_ts', 'inst_id', 'ts'),
+    )
+
+    # Соответствие колонок полям ответа OKX
+    FIELDS = {
+        'bill_id': 'billId',
+        'trade_id': 'tradeId',
+        'ord_id': 'ordId',
+        'inst_id': 'instId',
+        'inst_type': 'instType',
+        'side': 'side',
+        'pos_side': 'posSide',
+        'exec_type': 'execType',
+        'fill_px': 'fillPx',
+        'fill_sz': 'fillSz',
+        'fill_pnl': 'fillPnl',
+        'fee': 'fee',
+        'fee_ccy': 'feeCcy',
+        'ts': 'ts',
+    }
+    _INT_COLUMNS = ('bill_id', 'ts')
+    _FLOAT_COLUMNS = ('fill_px', 'fill_sz', 'fill_pnl', 'fee')
+
+    def __repr__(self):
+        return f"<Fill {self.bill_id}: {self.inst_id} {self.side} {self.fill_sz} @ {self.fill_px}>"
+
+    @classmethod
+    def columns_from_okx(cls, data: dict) -> dict:
+        """Значения колонок из записи ответа OKX"""
+        values = {}
+        for column, field in cls.FIELDS.items():
+            value = data.get(field) or None
+            if value is not None and column in cls._INT_COLUMNS:
+                value = int(value)
+            elif value is not None and column in cls._FLOAT_COLUMNS:
+                value = float(value)
+            values[column] = value
+        return values
@@ -0,0 +1,284 @@
+"""
+Отслеживание собственных ордеров, сделок, баланса и позиций через приватный WebSocket OKX
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from okx.utils import sign
+
+from okx_client.persistence import OrderWriter, order_record
+from okx_client.ws import WsConnection, WsLoop, default_ws_urls
+
+logger = logging.getLogger(__name__)
+
+# Каналы приватного endpoint, на которые подписывается трекер
+PRIVATE_CHANNELS = (
+    {'channel': 'orders', 'instType': 'ANY'},
+    {'channel': 'fills'},
+    {'channel': 'account'},
+    {'channel': 'positions', 'instType': 'ANY'},
+)
+
+# Конечные состояния ордера OKX
+FINAL_STATES = ('filled', 'canceled', 'mmp_canceled')
+
+# Пауза перед повтором неудачной сверки с REST, сек (растет вдвое до максимума)
+RECONCILE_BACKOFF = 1.0
+RECONCILE_MAX_BACKOFF = 30.0
+
+
+def _order_time(order: Dict) -> int:
+    return int(order.get('uTime') or order.get('cTime') or 0)
+
+
+class OrderTracker:
+    """
+    In-memory состояние собственных ордеров, поддерживаемое push-сообщениями.
+
+    После login трекер подписывается на каналы orders, fills, account и
+    positions. Обновления ордера применяются по uTime (устаревший push не
+    перезаписывает более свежее состояние) и передаются в OrderWriter,
+    который пишет их в таблицу orders пачками. После каждого
+    (пере)подключения активные ордера сверяются с REST: пропущенные за
+    время разрыва изменения запрашиваются отдельно, неудачная сверка
+    повторяется с нарастающей паузой. Завершенные ордера хранятся в памяти
+    ограниченно: старейшие вытесняются (в БД они уже записаны).
+    """
+
+    def __init__(self, api_key: str, secret_key: str, passphrase: str,
+                 writer: Optional[OrderWriter] = None, trade_manager=None,
+                 demo_mode: bool = False, private_url: Optional[str] = None,
+                 max_fills: int = 1000, max_finished_orders: int = 1000):
+        """
+        Args:
+            api_key, secret_key, passphrase: Ключи API для login
+            writer: OrderWriter для пакетной записи в БД
+            trade_manager: TradeManager для сверки с REST после переподключения
+            demo_mode: Демо-режим (адрес wspap)
+            private_url: Адрес приватного WebSocket (по умолчанию - OKX)
+            max_fills: Сколько последних сделок держать в памяти
+            max_finished_orders: Сколько завершенных ордеров держать в памяти
+        """
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.passphrase = passphrase
+        self.writer = writer
+        self.trade_manager = trade_manager
+
+        self._lock = threading.Lock()
+        # Упорядочивает применение ордеров и их отправку в OrderWriter (без блокировки читателей)
+        self._apply_lock = threading.Lock()
+        self.orders: Dict[str, Dict] = {}
+        self.fills = deque(maxlen=max_fills)
+        self.max_finished_orders = max_finished_orders
+        # Завершенные ордера в порядке завершения - для вытеснения старейших
+        self._finished = deque()
+        self.balance: Optional[Dict] = None
+        self.positions: Dict[str, Dict] = {}
+        self._listeners: List[Callable[[str, List[Dict]], None]] = []
+
+        # Кэш активных ордеров достоверен только после сверки с REST
+        self.synced = False
+        self.messages_received = 0
+        # Номер соединения: сверка, начатая до разрыва, не отмечает кэш сверенным
+        self._epoch = 0
+        self._reconcile_task: Optional[asyncio.Task] = None
+
+        self._ws_loop = WsLoop("okx-private-ws")
+        self.connection = WsConnection(private_url or default_ws_urls(demo_mode)['private'],
+                                       self.handle_message,
+                                       on_connect=self._on_connect,
+                                       on_disconnect=self._on_disconnect,
+                                       login_args=self._login_message)
+        for arg in PRIVATE_CHANNELS:
+            self.connection.subscriptions[tuple(sorted(arg.items()))] = dict(arg)
+        self._started = False
+
+    # --- Жизненный цикл ---
+
+    def start(self):
+        """Запуск соединения в фоновом потоке"""
+        if self._started:
+            return
+        self._ws_loop.start()
+        self._ws_loop.submit(self.connection.run())
+        self._started = True
+
+    def stop(self):
+        """Остановка соединения"""
+        if not self._started:
+            return
+        try:
+            self._ws_loop.submit(self.connection.close()).result(timeout=5)
+        except Exception as e:
+            logger.warning("Ошибка закрытия приватного WebSocket: %s", e)
+        self._ws_loop.stop()
+        self._started = False
+
+    @property
+    def is_connected(self) -> bool:
+        return self.connection.connected
+
+    def _login_message(self) -> str:
+        timestamp = str(int(time.time()))
+        signature = sign(timestamp + 'GET' + '/users/self/verify', self.secret_key).decode()
+        return json.dumps({'op': 'login', 'args': [{
+            'apiKey': self.api_key,
+            'passphrase': self.passphrase,
+            'timestamp': timestamp,
+            'sign': signature,
+        }]})
+
+    # --- Подписчики ---
+
+    def subscribe(self, callback: Callable[[str, List[Dict]], None]) -> Callable[[], None]:
+        """Подписка на изменения (канал, данные); возвращает функцию отписки"""
+        self._listeners.append(callback)
+
+        def unsubscribe():
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+        return unsubscribe
+
+    def _notify(self, channel: str, data: List[Dict]):
+        for callback in list(self._listeners):
+            try:
+                callback(channel, data)
+            except Exception:
+                logger.exception("Ошибка подписчика канала %s", channel)
+
+    # --- Чтение состояния ---
+
+    def get_order(self, ord_id: str) -> Optional[Dict]:
+        return self.orders.get(ord_id)
+
+    def pending_orders(self) -> Optional[List[Dict]]:
+        """Активные ордера или None, если кэш не сверен с биржей"""
+        if not self.synced or not self.connection.connected:
+            return None
+        with self._lock:
+            return [order for order in self.orders.values()
+                    if order.get('state') not in FINAL_STATES]
+
+    # --- Обработка сообщений ---
+
+    def handle_message(self, message: Dict):
+        """Применение одного сообщения OKX (можно вызывать с записанными кадрами)"""
+        if 'event' in message:
+            if message['event'] == 'error':
+                logger.warning("Ошибка приватного канала OKX: %s %s",
+                               message.get('code'), message.get('msg'))
+            return
+
+        channel = message.get('arg', {}).get('channel', '')
+        data = message.get('data') or []
+        self.messages_received += 1
+
+        if channel == 'orders':
+            data = self.apply_orders(data)
+        elif channel == 'fills':
+            self.fills.extend(data)
+        elif channel == 'account':
+            self.balance = {'code': '0', 'msg': '', 'data': data}
+        elif channel == 'positions':
+            with self._lock:
+                for position in data:
+                    if position.get('pos') in ('0', ''):
+                        self.positions.pop(position.get('posId'), None)
+                    else:
+                        self.positions[position.get('posId')] = position
+        if data:
+            self._notify(channel, data)
+
+    def apply_orders(self, orders: List[Dict]) -> List[Dict]:
+        """Применение состояний ордеров; возвращает те, что действительно изменились"""
+        applied = []
+        with self._apply_lock:
+            with self._lock:
+                for order in orders:
+                    ord_id = order.get('ordId')
+                    if not ord_id:
+                        continue
+                    current = self.orders.get(ord_id)
+                    if current is not None and _order_time(current) > _order_time(order):
+                        continue
+                    if current == order:
+                        continue
+                    self.orders[ord_id] = order
+                    applied.append(order)
+                    if order.get('state') in FINAL_STATES and (
+                            current is None or current.get('state') not in FINAL_STATES):
+                        self._finished.append(ord_id)
+                self._evict_finished()
+            # В очередь записи - в том же порядке, что и в памяти; submit может ждать
+            # места в очереди, поэтому вне замка, который нужен читателям кэша
+            if self.writer is not None:
+                for order in applied:
+                    self.writer.submit(order_record(order))
+        return applied
+
+    def _evict_finished(self):
+        """Вытеснение старейших завершенных ордеров сверх лимита (под self._lock)"""
+        while len(self._finished) > self.max_finished_orders:
+            ord_id = self._finished.popleft()
+            order = self.orders.get(ord_id)
+            if order is not None and order.get('state') in FINAL_STATES:
+                del self.orders[ord_id]
+
+    # --- Сверка с REST ---
+
+    def _on_connect(self, connection: WsConnection):
+        # Вызывается в loop соединения: сверка идет там же, REST - в пуле потоков
+        self._reconcile_task = asyncio.ensure_future(self._reconcile_until_synced())
+
+    def _on_disconnect(self, connection: WsConnection):
+        # Во время разрыва могли быть пропущены изменения - нужна сверка
+        self._epoch += 1
+        self.synced = False
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            self._reconcile_task = None
+
+    async def _reconcile_until_synced(self):
+        """Сверка с повторами, пока она не удастся или соединение не оборвется"""
+        loop = asyncio.get_running_loop()
+        backoff = RECONCILE_BACKOFF
+        while not await loop.run_in_executor(None, self.reconcile):
+            logger.warning("Повтор сверки ордеров через %.0f с", backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, RECONCILE_MAX_BACKOFF)
+
+    def reconcile(self) -> bool:
+        """Сверка активных ордеров с REST после (пере)подключения; False - не удалась"""
+        epoch = self._epoch
+        if self.trade_manager is None:
+            self.synced = True
+            return True
+        # Все страницы из REST: кэш трекера до сверки недостоверен
+        result = self.trade_manager.get_all_pending_orders(use_cache=False)
+        if result.get('code') != '0':
+            logger.warning("Сверка ордеров не удалась: %s", result.get('msg'))
+            return False
+        pending = result.get('data', [])
+        self._notify('orders', self.apply_orders(pending))
+
+        # Ордера, которые мы считали активными, но их нет в списке - завершились в разрыве
+        pending_ids = {order['ordId'] for order in pending}
+        with self._lock:
+            missing = [order for ord_id, order in self.orders.items()
+                       if ord_id not in pending_ids and order.get('state') not in FINAL_STATES]
+        for order in missing:
+            details = self.trade_manager.get_order_details(order['instId'], order['ordId'], store=False)
+            if details.get('code') != '0':
+                logger.warning("Не удалось уточнить ордер %s: %s", order['ordId'], details.get('msg'))
+                return False
+            if details.get('data'):
+                self._notify('orders', self.apply_orders(details['data']))
+        # Разрыв во время сверки: ее результат уже неполный
+        self.synced = epoch == self._epoch
+        return self.synced
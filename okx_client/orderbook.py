@@ -0,0 +1,265 @@
+"""
+Стакан заявок (Level 2) с инкрементальными обновлениями и проверкой checksum OKX
+"""
+import zlib
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Количество уровней каждой стороны, участвующих в checksum OKX
+CHECKSUM_DEPTH = 25
+
+
+class _BookSide:
+    """
+    Одна сторона стакана: отсортированный список ключей цены и словарь уровней.
+
+    Поиск уровня - бинарный (O(log n)); для bids ключ - цена со знаком минус,
+    так что у обеих сторон лучший уровень всегда первый.
+    """
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self.keys: List[float] = []
+        # ключ -> (строка цены, строка размера, размер, число ордеров)
+        self.levels: Dict[float, Tuple[str, str, float, str]] = {}
+
+    def _key(self, price: float) -> float:
+        return -price if self.is_bid else price
+
+    def clear(self):
+        self.keys.clear()
+        self.levels.clear()
+
+    def apply(self, level: List[str]):
+        """Применение уровня [цена, размер, _, число ордеров]; размер 0 удаляет уровень"""
+        price_str, size_str = level[0], level[1]
+        key = self._key(float(price_str))
+        size = float(size_str)
+        if size == 0:
+            if self.levels.pop(key, None) is not None:
+                del self.keys[bisect_left(self.keys, key)]
+            return
+        if key not in self.levels:
+            self.keys.insert(bisect_left(self.keys, key), key)
+        self.levels[key] = (price_str, size_str, size, level[3] if len(level) > 3 else '')
+
+    def top(self, n: int) -> List[Tuple[float, float]]:
+        return [(abs(key), self.levels[key][2]) for key in self.keys[:n]]
+
+    def raw_top(self, n: int) -> List[Tuple[str, str]]:
+        return [self.levels[key][:2] for key in self.keys[:n]]
+
+    def size_at(self, price: float) -> float:
+        level = self.levels.get(self._key(price))
+        return level[2] if level else 0.0
+
+    def __len__(self):
+        return len(self.keys)
+
+
+Level = Tuple[float, float]
+
+
+@dataclass(frozen=True)
+class BookSnapshot:
+    """
+    Неизменяемая копия верхних уровней стакана на момент snapshot().
+
+    Живой OrderBook меняется в потоке WebSocket; UI и расчеты работают с
+    копией, поэтому не видят наполовину примененное обновление.
+    """
+    inst_id: str
+    bids: Tuple[Level, ...]
+    asks: Tuple[Level, ...]
+    ts: Optional[int] = None
+    seq_id: Optional[int] = None
+
+    def best_bid(self) -> Optional[Level]:
+        return self.bids[0] if self.bids else None
+
+    def best_ask(self) -> Optional[Level]:
+        return self.asks[0] if self.asks else None
+
+    def mid(self) -> Optional[float]:
+        if not self.bids or not self.asks:
+            return None
+        return (self.bids[0][0] + self.asks[0][0]) / 2
+
+    def spread(self) -> Optional[float]:
+        if not self.bids or not self.asks:
+            return None
+        return self.asks[0][0] - self.bids[0][0]
+
+    def top(self, n: int = 5) -> Dict[str, List[Level]]:
+        """Лучшие n уровней каждой стороны: [(цена, размер)]"""
+        return {'bids': list(self.bids[:n]), 'asks': list(self.asks[:n])}
+
+    def depth_at(self, price: float, side: str = 'bids') -> float:
+        """Размер на конкретном ценовом уровне (в пределах копии)"""
+        for level_price, size in (self.bids if side == 'bids' else self.asks):
+            if level_price == price:
+                return size
+        return 0.0
+
+    def estimate_fill(self, side: str, size: float) -> Optional[Dict[str, float]]:
+        """
+        Оценка исполнения рыночного ордера по стакану
+
+        Args:
+            side: 'buy' (съедает asks) или 'sell' (съедает bids)
+            size: Объем в базовой валюте
+
+        Returns:
+            Средняя цена, проскальзывание относительно лучшей цены (доля)
+            и исполненный объем; None, если сторона пуста
+        """
+        levels = self.asks if side == 'buy' else self.bids
+        if not levels or size <= 0:
+            return None
+        remaining = size
+        cost = 0.0
+        for price, level_size in levels:
+            take = min(remaining, level_size)
+            cost += take * price
+            remaining -= take
+            if remaining <= 0:
+                break
+        filled = size - max(remaining, 0.0)
+        avg_price = cost / filled
+        best = levels[0][0]
+        return {
+            'avg_price': avg_price,
+            'slippage': abs(avg_price - best) / best,
+            'filled': filled,
+        }
+
+    def to_dict(self) -> Dict:
+        return {'inst_id': self.inst_id, 'bids': self.bids, 'asks': self.asks,
+                'ts': self.ts, 'seq_id': self.seq_id}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BookSnapshot':
+        """Обратное преобразование to_dict (ответ сервиса данных в JSON)"""
+        return cls(data['inst_id'], tuple(tuple(level) for level in data.get('bids', ())),
+                   tuple(tuple(level) for level in data.get('asks', ())),
+                   data.get('ts'), data.get('seq_id'))
+
+
+class OrderBook:
+    """
+    Стакан инструмента, собираемый из снимков и дельт каналов books/books5/bbo-tbt.
+
+    apply_update возвращает False, если обновление нельзя применить
+    (разрыв seqId или несовпадение checksum) - тогда стакан помечается
+    невалидным и его нужно переподписать для нового снимка. Стакан не
+    потокобезопасен: читателям из других потоков отдается snapshot(),
+    снятый под тем же замком, что и применение обновлений.
+    """
+
+    def __init__(self, inst_id: str):
+        self.inst_id = inst_id
+        self.bids = _BookSide(is_bid=True)
+        self.asks = _BookSide(is_bid=False)
+        self.seq_id: Optional[int] = None
+        self.ts: Optional[int] = None
+        self.valid = False
+        self.updates = 0
+        self.resyncs = 0
+
+    # --- Применение данных ---
+
+    def apply(self, data: Dict, action: str = 'snapshot') -> bool:
+        """Применение элемента data из сообщения OKX"""
+        if action == 'update':
+            return self.apply_update(data.get('bids', []), data.get('asks', []),
+                                     data.get('checksum'), data.get('seqId'), data.get('prevSeqId'),
+                                     data.get('ts'))
+        return self.apply_snapshot(data.get('bids', []), data.get('asks', []),
+                                   data.get('checksum'), data.get('seqId'), data.get('ts'))
+
+    def apply_snapshot(self, bids: List[List[str]], asks: List[List[str]],
+                       checksum: Optional[int] = None, seq_id: Optional[int] = None,
+                       ts: Optional[str] = None) -> bool:
+        self.bids.clear()
+        self.asks.clear()
+        for level in bids:
+            self.bids.apply(level)
+        for level in asks:
+            self.asks.apply(level)
+        self.seq_id = seq_id
+        self.ts = int(ts) if ts else None
+        self.valid = checksum is None or self.checksum() == int(checksum)
+        return self.valid
+
+    def apply_update(self, bids: List[List[str]], asks: List[List[str]],
+                     checksum: Optional[int] = None, seq_id: Optional[int] = None,
+                     prev_seq_id: Optional[int] = None, ts: Optional[str] = None) -> bool:
+        if not self.valid:
+            return False
+        if prev_seq_id is not None and self.seq_id is not None and prev_seq_id != self.seq_id:
+            self.valid = False
+            return False
+        for level in bids:
+            self.bids.apply(level)
+        for level in asks:
+            self.asks.apply(level)
+        self.seq_id = seq_id if seq_id is not None else self.seq_id
+        self.ts = int(ts) if ts else self.ts
+        self.updates += 1
+        if checksum is not None and self.checksum() != int(checksum):
+            self.valid = False
+        return self.valid
+
+    def checksum(self) -> int:
+        """CRC32 первых 25 уровней в формате OKX (bid:ask поочередно), знаковый int32"""
+        bids = self.bids.raw_top(CHECKSUM_DEPTH)
+        asks = self.asks.raw_top(CHECKSUM_DEPTH)
+        parts = []
+        for i in range(max(len(bids), len(asks))):
+            if i < len(bids):
+                parts.extend(bids[i])
+            if i < len(asks):
+                parts.extend(asks[i])
+        crc = zlib.crc32(':'.join(parts).encode())
+        return crc - (1 << 32) if crc >= (1 << 31) else crc
+
+    # --- Запросы ---
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        top = self.bids.top(1)
+        return top[0] if top else None
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        top = self.asks.top(1)
+        return top[0] if top else None
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def top(self, n: int = 5) -> Dict[str, List[Tuple[float, float]]]:
+        """Лучшие n уровней каждой стороны: [(цена, размер)]"""
+        return {'bids': self.bids.top(n), 'asks': self.asks.top(n)}
+
+    def depth_at(self, price: float, side: str = 'bids') -> float:
+        """Размер на конкретном ценовом уровне"""
+        return (self.bids if side == 'bids' else self.asks).size_at(price)
+
+    def estimate_fill(self, side: str, size: float) -> Optional[Dict[str, float]]:
+        """Оценка исполнения рыночного ордера (см. BookSnapshot.estimate_fill)"""
+        return self.snapshot().estimate_fill(side, size)
+
+    def snapshot(self, depth: Optional[int] = None) -> BookSnapshot:
+        """Копия верхних depth уровней (None - всех)"""
+        depth = max(len(self.bids), len(self.asks)) if depth is None else depth
+        return BookSnapshot(self.inst_id, tuple(self.bids.top(depth)), tuple(self.asks.top(depth)),
+                            self.ts, self.seq_id)
@@ -0,0 +1,270 @@
+"""
+Отложенная (write-behind) пакетная запись ордеров в БД
+"""
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from okx_client.models import Order
+
+logger = logging.getLogger(__name__)
+
+# Колонки, без которых новую строку orders вставить нельзя
+_REQUIRED = ('symbol', 'side', 'order_type', 'quantity')
+
+_STOP = object()
+
+
+def order_record(order: Dict) -> Dict:
+    """Изменение строки orders по данным ордера OKX (REST или push канала orders)"""
+    avg_px = float(order.get('avgPx') or 0)
+    px = float(order.get('px') or 0)
+    return {
+        'order_id': order['ordId'],
+        'symbol': order.get('instId') or None,
+        'side': order.get('side') or None,
+        'order_type': order.get('ordType') or None,
+        'price': avg_px or px or None,
+        'quantity': float(order['sz']) if order.get('sz') else None,
+        'status': order.get('state') or None,
+    }
+
+
+def upsert_orders(session, records: List[Dict]) -> int:
+    """
+    Применение изменений ордеров в сессии (без commit)
+
+    Изменения одного order_id схлопываются в порядке поступления (None значит
+    "без изменений" и не затирает известное значение), существующие строки
+    обновляются, новые вставляются одним bulk insert. Запись без status
+    (ответ на размещение) статус не меняет; новая строка получает 'pending'.
+    Возвращает число ордеров.
+    """
+    merged: Dict[str, Dict] = {}
+    for record in records:
+        merged.setdefault(record['order_id'], {}).update(
+            {column: value for column, value in record.items() if value is not None})
+
+    existing = {order.order_id: order for order in
+                session.query(Order).filter(Order.order_id.in_(list(merged)))}
+    new_rows = []
+    for order_id, values in merged.items():
+        order = existing.get(order_id)
+        if order is not None:
+            for column, value in values.items():
+                if value is not None:
+                    setattr(order, column, value)
+        elif all(values.get(column) is not None for column in _REQUIRED):
+            new_rows.append(dict({'status': 'pending'}, **values))
+        else:
+            logger.warning("Ордер %s не найден в БД, обновление пропущено", order_id)
+    if new_rows:
+        session.bulk_insert_mappings(Order, new_rows)
+    return len(merged)
+
+
+class OrderWriter:
+    """
+    Фоновая запись событий ордеров.
+
+    submit() кладет изменение строки orders (частичный набор колонок по
+    order_id) в ограниченную очередь и сразу возвращается, поэтому путь
+    размещения ордера не ждет fsync SQLite. Поток записи забирает события
+    пачками, схлопывает изменения одного ордера (последнее побеждает) и
+    пишет пачку одной транзакцией: update существующих строк и bulk insert
+    новых. События применяются строго в порядке поступления: при ошибке
+    записи пачка повторяется (не более max_retries раз), затем события
+    пишутся по одному, а те, что записать не удалось, уходят в dead-letter
+    файл - одна ядовитая запись не останавливает очередь. close()
+    дописывает все, что осталось в очереди.
+    """
+
+    def __init__(self, session_factory, max_queue: int = 10000,
+                 flush_interval: float = 0.2, batch_size: int = 500,
+                 max_backoff: float = 5.0, max_retries: int = 5,
+                 submit_timeout: float = 1.0, dead_letter_path: Optional[str] = None):
+        """
+        Args:
+            session_factory: Фабрика сессий SQLAlchemy
+            max_queue: Размер очереди; при переполнении submit ждет не дольше submit_timeout
+            flush_interval: Сколько ждать накопления пачки после первого события, сек
+            batch_size: Максимум событий в одной транзакции
+            max_backoff: Максимальная пауза между повторами после ошибки БД, сек
+            max_retries: Повторов пачки до записи по одному событию
+            submit_timeout: Сколько submit ждет места в очереди, сек
+            dead_letter_path: JSON Lines файл для событий, которые не удалось записать
+                (None - только лог)
+        """
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        self.submit_timeout = submit_timeout
+        self.dead_letter_path = dead_letter_path
+        self._dead_letter_lock = threading.Lock()
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.dead_letters = 0
+
+    # --- Жизненный цикл ---
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="okx-order-writer", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 10.0):
+        """Дописать очередь и остановить поток записи"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=timeout)
+        else:
+            self._drain_sync()
+
+    # --- Запись ---
+
+    def submit(self, record: Dict) -> bool:
+        """
+        Поставить изменение ордера в очередь
+
+        Ждет места в очереди не дольше submit_timeout: вызывающие (обработчик
+        WebSocket, путь ордера) не должны зависать, если БД недоступна.
+
+        Args:
+            record: Колонки Order; обязателен order_id, остальные - только измененные
+
+        Returns:
+            False, если очередь переполнена и событие ушло в dead-letter
+        """
+        if self._closed:
+            raise RuntimeError("OrderWriter закрыт")
+        record.setdefault('updated_at', datetime.utcnow())
+        try:
+            self._queue.put(record, timeout=self.submit_timeout)
+            return True
+        except queue.Full:
+            self._dead_letter([record], "очередь записи переполнена")
+            return False
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Дождаться записи всего, что уже поставлено в очередь"""
+        if not (self._thread and self._thread.is_alive()):
+            self._drain_sync()
+            return True
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    # --- Поток записи ---
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            if batch[-1] is _STOP:
+                stopping = True
+                batch.pop()
+                # Остаток очереди после остановки пишем без ожидания
+                batch.extend(self._get_nowait_all())
+            self._write_with_retry(batch, stopping)
+            for _ in range(len(batch) + (1 if stopping else 0)):
+                self._queue.task_done()
+
+    def _get_nowait_all(self) -> List[Dict]:
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is not _STOP:
+                items.append(item)
+            else:
+                self._queue.task_done()
+
+    def _drain_sync(self):
+        batch = self._get_nowait_all()
+        if batch:
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_with_retry(self, batch: List[Dict], stopping: bool):
+        backoff = 0.1
+        attempts = 1 if stopping else self.max_retries + 1
+        for attempt in range(attempts):
+            try:
+                self._write(batch)
+                return
+            except Exception as e:
+                self.errors += 1
+                logger.error("Ошибка записи ордеров в БД (%d событий): %s", len(batch), e)
+                if attempt + 1 < attempts:
+                    # Повторяем ту же пачку: порядок событий не нарушается
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, self.max_backoff)
+        # Пачка не пишется целиком - по одному событию в прежнем порядке,
+        # чтобы отделить ядовитые записи от остальных
+        for record in batch:
+            try:
+                self._write([record])
+            except Exception as e:
+                self.errors += 1
+                self._dead_letter([record], str(e))
+
+    def _dead_letter(self, records: List[Dict], reason: str):
+        """Событие, которое не удалось записать: в лог и dead-letter файл"""
+        self.dead_letters += len(records)
+        logger.error("Ордера не записаны в БД (%s): %s", reason,
+                     ', '.join(str(record.get('order_id')) for record in records))
+        if not self.dead_letter_path:
+            return
+        try:
+            with self._dead_letter_lock, open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps({'reason': reason, 'record': record}, default=str) + '\n')
+        except OSError as e:
+            logger.error("Не удалось записать dead-letter файл %s: %s", self.dead_letter_path, e)
+
+    def _write(self, batch: List[Dict]):
+        session = self.session_factory()
+        try:
+            self.written += upsert_orders(session, batch)
+            session.commit()
+            self.batches += 1
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
@@ -0,0 +1,233 @@
+"""
+Фоновый планировщик периодического обновления данных
+"""
+import heapq
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _default_diff(old: Any, new: Any) -> Any:
+    """Изменение по умолчанию: новые данные целиком, если они отличаются"""
+    return None if old == new else new
+
+
+def keyed_diff(old: Optional[Dict], new: Dict) -> Optional[Dict]:
+    """Изменение словаря записей {ключ: запись}: только изменившиеся записи"""
+    old = old or {}
+    changed = {key: value for key, value in new.items() if old.get(key) != value}
+    return changed or None
+
+
+def _is_error(result: Any) -> bool:
+    return isinstance(result, dict) and result.get('code') not in (None, '0')
+
+
+@dataclass
+class PollJob:
+    """Периодическая задача обновления одного вида данных"""
+    name: str
+    fetch: Callable[[], Any]
+    interval: float
+    jitter: float = 0.1
+    max_backoff: float = 300.0
+    diff: Callable[[Any, Any], Any] = _default_diff
+    paused: bool = True
+
+    last_result: Any = None
+    last_success: Optional[float] = None
+    stale: bool = False  # last_result из снимка, живых данных еще не было
+    failures: int = 0
+    running: bool = False
+    listeners: List[Callable[[str, Any], None]] = field(default_factory=list)
+
+    def next_delay(self) -> float:
+        """Интервал с экспоненциальным backoff после ошибок и случайным jitter"""
+        delay = min(self.interval * (2 ** self.failures), max(self.max_backoff, self.interval))
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+
+class RefreshScheduler:
+    """
+    Планировщик фонового обновления.
+
+    Каждый вид данных (баланс, позиции, ордера, тикеры) - отдельная задача
+    со своим интервалом. Запросы выполняются в пуле потоков, ошибки
+    увеличивают интервал (backoff), приостановленные задачи (вкладка не
+    видна) не выполняются. Подписчики получают только изменившиеся данные.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._jobs: Dict[str, PollJob] = {}
+        self._queue: List[tuple] = []
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="okx-poll")
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    # --- Регистрация ---
+
+    def add(self, name: str, fetch: Callable[[], Any], interval: float,
+            jitter: float = 0.1, diff: Optional[Callable[[Any, Any], Any]] = None,
+            paused: bool = True) -> PollJob:
+        """
+        Регистрация задачи
+
+        Args:
+            name: Имя вида данных ('balance', 'positions', ...)
+            fetch: Функция получения данных
+            interval: Базовый интервал обновления, сек
+            jitter: Доля случайного разброса интервала
+            diff: Функция (старое, новое) -> изменение или None
+            paused: Создать задачу приостановленной
+        """
+        job = PollJob(name, fetch, interval, jitter, diff=diff or _default_diff, paused=paused)
+        with self._cond:
+            self._jobs[name] = job
+            if not paused:
+                self._schedule(name, 0)
+        return job
+
+    def subscribe(self, name: str, callback: Callable[[str, Any], None]) -> Callable[[], None]:
+        """Подписка на изменения; возвращает функцию отписки"""
+        job = self._jobs[name]
+        job.listeners.append(callback)
+        if job.last_result is not None:
+            callback(name, job.last_result)
+
+        def unsubscribe():
+            if callback in job.listeners:
+                job.listeners.remove(callback)
+        return unsubscribe
+
+    def latest(self, name: str) -> Any:
+        return self._jobs[name].last_result
+
+    def seed(self, name: str, result: Any):
+        """Начальные данные (из снимка): подписчики получают их до первого обновления"""
+        job = self._jobs.get(name)
+        if job is not None and job.last_result is None:
+            job.last_result = result
+            job.stale = True
+
+    def is_stale(self, name: str) -> bool:
+        return self._jobs[name].stale
+
+    def names(self) -> List[str]:
+        return list(self._jobs)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Состояние задач: приостановлена, ошибки подряд, время последнего успеха"""
+        return {name: {'paused': job.paused, 'failures': job.failures,
+                       'last_success': job.last_success, 'interval': job.interval}
+                for name, job in self._jobs.items()}
+
+    # --- Управление ---
+
+    def _schedule(self, name: str, delay: float):
+        heapq.heappush(self._queue, (time.monotonic() + delay, name))
+        self._cond.notify()
+
+    def pause(self, name: str):
+        with self._cond:
+            self._jobs[name].paused = True
+
+    def resume(self, name: str):
+        """Возобновление; если данные устарели - обновление сразу"""
+        with self._cond:
+            job = self._jobs[name]
+            if not job.paused:
+                return
+            job.paused = False
+            stale = job.last_success is None or time.time() - job.last_success >= job.interval
+            self._schedule(name, 0 if stale else job.interval)
+
+    def set_active(self, names: Iterable[str]):
+        """Оставить активными только задачи видимой вкладки"""
+        names = set(names)
+        for name in self._jobs:
+            if name in names:
+                self.resume(name)
+            else:
+                self.pause(name)
+
+    def trigger(self, name: Optional[str] = None):
+        """Внеочередное обновление задачи (или всех активных)"""
+        with self._cond:
+            for job in self._jobs.values():
+                if (name is None and not job.paused) or job.name == name:
+                    self._schedule(job.name, 0)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="okx-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+
+    # --- Выполнение ---
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if self._queue:
+                        wait = self._queue[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(timeout=wait)
+                    else:
+                        self._cond.wait()
+                if self._stopping:
+                    return
+                _, name = heapq.heappop(self._queue)
+                job = self._jobs[name]
+                if job.paused or job.running:
+                    continue
+                # Удаляем дубликаты задачи из очереди: следующий запуск назначит _execute
+                self._queue = [item for item in self._queue if item[1] != name]
+                heapq.heapify(self._queue)
+                job.running = True
+            self._executor.submit(self._execute, job)
+
+    def _execute(self, job: PollJob):
+        try:
+            result = job.fetch()
+            if _is_error(result):
+                raise RuntimeError(f"{result.get('code')}: {result.get('msg')}")
+            changes = job.diff(job.last_result, result)
+            if job.stale and changes is None:
+                # Снимок совпал с живыми данными - подписчики все равно должны снять отметку
+                changes = result
+            job.stale = False
+            job.last_result = result
+            job.last_success = time.time()
+            job.failures = 0
+            if changes is not None:
+                for callback in list(job.listeners):
+                    try:
+                        callback(job.name, changes)
+                    except Exception:
+                        logger.exception("Ошибка подписчика %s", job.name)
+        except Exception as e:
+            job.failures += 1
+            logger.warning("Ошибка обновления %s (попытка %d): %s", job.name, job.failures, e)
+        finally:
+            with self._cond:
+                job.running = False
+                if not job.paused and not self._stopping:
+                    self._schedule(job.name, job.next_delay())
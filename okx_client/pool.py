@@ -0,0 +1,180 @@
+#okx_client/pool.py
+"""
+Пул клиентов для нескольких аккаунтов (основной + субаккаунты)
+"""
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from okx.Account import AccountAPI
+from okx.Trade import TradeAPI
+
+from okx_client.managers.account import AccountManager
+from okx_client.managers.trade import TradeManager
+from okx_client.rate_limit import RequestScheduler, ScheduledAPI
+from okx_client.transport import use_transport
+
+# Имя основного аккаунта (ключи из Config)
+MAIN_ACCOUNT = 'main'
+
+
+@dataclass
+class AccountCredentials:
+    """Ключи одного аккаунта"""
+    name: str
+    api_key: str
+    secret_key: str
+    passphrase: str
+
+
+class AccountSession:
+    """Приватные менеджеры одного аккаунта"""
+
+    def __init__(self, name: str, account: AccountManager, trader: TradeManager):
+        self.name = name
+        self.account = account
+        self.trader = trader
+
+
+class ClientPool:
+    """
+    Несколько аккаунтов поверх одного OKXClient.
+
+    Основной клиент отдает пулу публичные данные, поток рыночных данных,
+    БД и HTTP-соединения: для субаккаунтов создаются только приватные
+    AccountAPI/TradeAPI на общем транспорте. Лимиты приватных endpoint OKX
+    считает по аккаунту, поэтому у каждого аккаунта свой RequestScheduler.
+    Запросы ко всем аккаунтам выполняются параллельно в пуле потоков, так
+    что обновление N аккаунтов занимает примерно столько же, сколько одного.
+    """
+
+    def __init__(self, client, accounts: Optional[List[AccountCredentials]] = None,
+                 max_workers: int = 32):
+        """
+        Args:
+            client: Основной OKXClient
+            accounts: Ключи субаккаунтов
+            max_workers: Число потоков для параллельных запросов
+        """
+        self.client = client
+        self.sessions: Dict[str, AccountSession] = {
+            MAIN_ACCOUNT: AccountSession(MAIN_ACCOUNT, client.account, client.trader)
+        }
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="okx-pool")
+        for credentials in accounts or []:
+            self.add(credentials)
+
+    def add(self, credentials: AccountCredentials) -> AccountSession:
+        """Добавление аккаунта"""
+        if credentials.name in self.sessions:
+            raise ValueError(f"Аккаунт {credentials.name} уже добавлен")
+
+        scheduler = RequestScheduler()
+        keys = (credentials.api_key, credentials.secret_key, credentials.passphrase, False,
+                self.client.flag)
+        account_api = use_transport(AccountAPI(*keys))
+        trade_api = use_transport(TradeAPI(*keys))
+        session = AccountSession(
+            credentials.name,
+            AccountManager(ScheduledAPI(account_api, scheduler)),
+            TradeManager(ScheduledAPI(trade_api, scheduler), self.client.read_session_factory,
+                         writer=self.client.order_writer),
+        )
+        self.sessions[credentials.name] = session
+        print(f"✅ Аккаунт {credentials.name} добавлен в пул")
+        return session
+
+    def names(self) -> List[str]:
+        return list(self.sessions)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __getitem__(self, name: str) -> AccountSession:
+        return self.sessions[name]
+
+    # --- Параллельные запросы ---
+
+    def map(self, fn: Callable[[AccountSession], Dict]) -> Dict[str, Dict]:
+        """Вызов fn для каждого аккаунта параллельно: {аккаунт: результат}"""
+        futures = {name: self._executor.submit(fn, session) for name, session in self.sessions.items()}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"✗ Ошибка запроса аккаунта {name}: {e}")
+                results[name] = {'code': '-1', 'msg': str(e)}
+        return results
+
+    def get_balances(self) -> Dict[str, Dict]:
+        return self.map(lambda session: session.account.get_balance())
+
+    def get_positions(self, inst_type: str = "SWAP") -> Dict[str, Dict]:
+        return self.map(lambda session: session.account.get_positions(inst_type))
+
+    def get_pending_orders(self, limit: int = 100) -> Dict[str, Dict]:
+        return self.map(lambda session: session.trader.get_pending_orders(limit=limit))
+
+    def refresh(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        Баланс, позиции и активные ордера всех аккаунтов одной волной запросов
+
+        Returns:
+            {'balance': {аккаунт: ответ}, 'positions': {...}, 'orders': {...}}
+        """
+        calls = {
+            'balance': lambda session: session.account.get_balance(),
+            'positions': lambda session: session.account.get_positions(),
+            'orders': lambda session: session.trader.get_pending_orders(),
+        }
+        futures = {(kind, name): self._executor.submit(fn, session)
+                   for kind, fn in calls.items() for name, session in self.sessions.items()}
+        results = {kind: {} for kind in calls}
+        for (kind, name), future in futures.items():
+            try:
+                results[kind][name] = future.result()
+            except Exception as e:
+                print(f"✗ Ошибка запроса аккаунта {name}: {e}")
+                results[kind][name] = {'code': '-1', 'msg': str(e)}
+        return results
+
+    # --- Агрегация ---
+
+    @staticmethod
+    def aggregate_balances(balances: Dict[str, Dict]) -> Dict:
+        """
+        Суммарный баланс всех аккаунтов в формате ответа get_balance
+
+        Аккаунты с ошибкой пропускаются; их имена - в поле 'failed'.
+        """
+        fields = ('cashBal', 'availBal', 'frozenBal', 'eqUsd')
+        totals = defaultdict(lambda: dict.fromkeys(fields, 0.0))
+        failed = []
+        for name, result in balances.items():
+            if not result or result.get('code') != '0':
+                failed.append(name)
+                continue
+            for account_data in result.get('data', []):
+                for detail in account_data.get('details', []):
+                    total = totals[detail.get('ccy', '')]
+                    for field in fields:
+                        total[field] += float(detail.get(field) or 0)
+
+        details = [{'ccy': ccy, **{field: str(value) for field, value in total.items()}}
+                   for ccy, total in totals.items()]
+        return {'code': '0', 'msg': '', 'data': [{'details': details}], 'failed': failed}
+
+    @staticmethod
+    def merge_records(results: Dict[str, Dict]) -> List[Dict]:
+        """Записи (позиции, ордера) всех аккаунтов с полем 'account'"""
+        records = []
+        for name, result in results.items():
+            if result and result.get('code') == '0':
+                records.extend({**record, 'account': name} for record in result.get('data', []))
+        return records
+
+    def close(self):
+        # Общий транспорт закрывает основной клиент
+        self._executor.shutdown(wait=False)
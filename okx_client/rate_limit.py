@@ -0,0 +1,633 @@
+"""
+Ограничение частоты запросов к OKX: token bucket на каждый endpoint и планировщик
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from okx import consts as c
+
+from okx_client.config import Config
+from okx_client.resilience import (CircuitBreaker, CircuitOpenError, LatencyTracker, RetryPolicy,
+                                   has_client_order_ids, is_retryable_result, is_transient_error)
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты очередей: меньше - важнее
+PRIORITY_TRADE = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_MARKET = 2
+
+# Код ответа OKX "Too Many Requests"
+RATE_LIMIT_CODE = '50011'
+
+# Минимальная задержка хеджирующего запроса, сек: не дублируем быстрые ответы
+HEDGE_MIN_DELAY = 0.05
+
+
+@dataclass(frozen=True)
+class RateRule:
+    """Лимит endpoint: не более limit запросов за per секунд"""
+    limit: int
+    per: float
+    priority: int = PRIORITY_ACCOUNT
+    read_only: bool = False
+
+
+def endpoint_key(method: str, path: str) -> str:
+    """
+    Ключ лимита: HTTP-метод и путь.
+
+    OKX лимитирует GET и POST одного пути раздельно (размещение ордера и
+    запрос ордера - оба /api/v5/trade/order), поэтому путь ключом быть не может.
+    """
+    return f"{method} {path}"
+
+
+# Лимиты OKX API v5 по endpoint
+ENDPOINT_RULES: Dict[str, RateRule] = {
+    endpoint_key(c.POST, c.PLACR_ORDER): RateRule(60, 2, PRIORITY_TRADE),
+    endpoint_key(c.POST, c.BATCH_ORDERS): RateRule(300, 2, PRIORITY_TRADE),
+    endpoint_key(c.POST, c.CANCEL_ORDER): RateRule(60, 2, PRIORITY_TRADE),
+    endpoint_key(c.POST, c.CANCEL_BATCH_ORDERS): RateRule(300, 2, PRIORITY_TRADE),
+    endpoint_key(c.POST, c.AMEND_ORDER): RateRule(60, 2, PRIORITY_TRADE),
+    endpoint_key(c.POST, c.AMEND_BATCH_ORDER): RateRule(300, 2, PRIORITY_TRADE),
+    endpoint_key(c.GET, c.ORDER_INFO): RateRule(60, 2, PRIORITY_ACCOUNT, True),
+    endpoint_key(c.GET, c.ORDERS_PENDING): RateRule(60, 2, PRIORITY_ACCOUNT, True),
+    endpoint_key(c.GET, c.ORDERS_HISTORY): RateRule(40, 2, PRIORITY_ACCOUNT, True),
+    endpoint_key(c.GET, c.ORDER_FILLS): RateRule(60, 2, PRIORITY_ACCOUNT, True),
+    endpoint_key(c.GET, c.ORDERS_FILLS_HISTORY): RateRule(10, 2, PRIORITY_ACCOUNT, True),
+    endpoint_key(c.GET, c.ACCOUNT_INFO): RateRule(10, 2, PRIORITY_ACCOUNT, True),
+    endpoint_key(c.GET, c.POSITION_INFO): RateRule(10, 2, PRIORITY_ACCOUNT, True),
+    endpoint_key(c.GET, c.ACCOUNT_CONFIG): RateRule(5, 2, PRIORITY_ACCOUNT, True),
+    endpoint_key(c.GET, c.TICKER_INFO): RateRule(20, 2, PRIORITY_MARKET, True),
+    endpoint_key(c.GET, c.TICKERS_INFO): RateRule(20, 2, PRIORITY_MARKET, True),
+    endpoint_key(c.GET, c.MARKET_CANDLES): RateRule(40, 2, PRIORITY_MARKET, True),
+    endpoint_key(c.GET, c.HISTORY_CANDLES): RateRule(20, 2, PRIORITY_MARKET, True),
+    endpoint_key(c.GET, c.ORDER_BOOKS): RateRule(40, 2, PRIORITY_MARKET, True),
+    endpoint_key(c.GET, c.INSTRUMENT_INFO): RateRule(20, 2, PRIORITY_MARKET, True),
+    endpoint_key(c.GET, c.MARK_PRICE): RateRule(10, 2, PRIORITY_MARKET, True),
+}
+
+DEFAULT_RULE = RateRule(10, 2, PRIORITY_ACCOUNT)
+
+# Методы python-okx -> endpoint (для обертки синхронных клиентов)
+METHOD_ENDPOINTS: Dict[str, str] = {
+    'place_order': endpoint_key(c.POST, c.PLACR_ORDER),
+    'place_multiple_orders': endpoint_key(c.POST, c.BATCH_ORDERS),
+    'cancel_order': endpoint_key(c.POST, c.CANCEL_ORDER),
+    'cancel_multiple_orders': endpoint_key(c.POST, c.CANCEL_BATCH_ORDERS),
+    'amend_order': endpoint_key(c.POST, c.AMEND_ORDER),
+    'amend_multiple_orders': endpoint_key(c.POST, c.AMEND_BATCH_ORDER),
+    'get_order': endpoint_key(c.GET, c.ORDER_INFO),
+    'get_order_list': endpoint_key(c.GET, c.ORDERS_PENDING),
+    'get_orders_history': endpoint_key(c.GET, c.ORDERS_HISTORY),
+    'get_fills': endpoint_key(c.GET, c.ORDER_FILLS),
+    'get_fills_history': endpoint_key(c.GET, c.ORDERS_FILLS_HISTORY),
+    'get_account_balance': endpoint_key(c.GET, c.ACCOUNT_INFO),
+    'get_positions': endpoint_key(c.GET, c.POSITION_INFO),
+    'get_account_config': endpoint_key(c.GET, c.ACCOUNT_CONFIG),
+    'get_ticker': endpoint_key(c.GET, c.TICKER_INFO),
+    'get_tickers': endpoint_key(c.GET, c.TICKERS_INFO),
+    'get_candlesticks': endpoint_key(c.GET, c.MARKET_CANDLES),
+    'get_history_candlesticks': endpoint_key(c.GET, c.HISTORY_CANDLES),
+    'get_orderbook': endpoint_key(c.GET, c.ORDER_BOOKS),
+    'get_instruments': endpoint_key(c.GET, c.INSTRUMENT_INFO),
+    'get_mark_price': endpoint_key(c.GET, c.MARK_PRICE),
+}
+
+
+# Пакетные endpoint: лимит считается по ордерам, а не по запросам
+BATCH_ENDPOINTS = (endpoint_key(c.POST, c.BATCH_ORDERS), endpoint_key(c.POST, c.CANCEL_BATCH_ORDERS),
+                   endpoint_key(c.POST, c.AMEND_BATCH_ORDER))
+
+# Изменяющие endpoint, повтор которых не меняет результат
+IDEMPOTENT_WRITES = (endpoint_key(c.POST, c.CANCEL_ORDER), endpoint_key(c.POST, c.CANCEL_BATCH_ORDERS),
+                     endpoint_key(c.POST, c.AMEND_ORDER), endpoint_key(c.POST, c.AMEND_BATCH_ORDER))
+
+# Размещение ордеров: повтор безопасен, только если у каждого ордера есть clOrdId
+PLACE_ENDPOINTS = (endpoint_key(c.POST, c.PLACR_ORDER), endpoint_key(c.POST, c.BATCH_ORDERS))
+
+
+def rule_for(endpoint: str) -> RateRule:
+    return ENDPOINT_RULES.get(endpoint, DEFAULT_RULE)
+
+
+def is_idempotent(endpoint: str, args, kwargs) -> bool:
+    """Можно ли повторить вызов без риска двойного исполнения"""
+    if rule_for(endpoint).read_only or endpoint in IDEMPOTENT_WRITES:
+        return True
+    # OKX отклонит повтор с тем же clOrdId, второго ордера не будет
+    return endpoint in PLACE_ENDPOINTS and has_client_order_ids(args, kwargs)
+
+
+class TokenBucket:
+    """
+    Token bucket, в котором каждый токен возвращается ровно через окно
+    per после расхода. Это совпадает со скользящим окном OKX: лимит
+    используется полностью, но в любом окне per уходит не больше limit
+    запросов. Небольшой запас margin покрывает разброс сетевой задержки.
+    """
+
+    def __init__(self, limit: int, per: float, margin: float = 0.05):
+        self.limit = limit
+        self.window = per + margin
+        self._spent = deque()
+
+    def _expire(self, now: float):
+        while self._spent and now - self._spent[0] >= self.window:
+            self._spent.popleft()
+
+    def try_acquire(self, now: Optional[float] = None, cost: int = 1) -> float:
+        """Взять cost токенов. Возвращает 0 при успехе или время ожидания до их освобождения"""
+        now = time.monotonic() if now is None else now
+        cost = min(cost, self.limit)
+        self._expire(now)
+        if len(self._spent) + cost <= self.limit:
+            self._spent.extend([now] * cost)
+            return 0.0
+        return self.window - (now - self._spent[len(self._spent) + cost - self.limit - 1])
+
+    def drain(self, now: Optional[float] = None):
+        """Считать все токены израсходованными (после ответа 50011)"""
+        now = time.monotonic() if now is None else now
+        self._spent = deque([now] * self.limit)
+
+    @property
+    def available(self) -> int:
+        self._expire(time.monotonic())
+        return self.limit - len(self._spent)
+
+
+class RequestScheduler:
+    """
+    Центральный планировщик запросов.
+
+    Для каждого endpoint держит свой TokenBucket и очередь ожидания с
+    приоритетами: размещение/отмена ордеров обслуживаются раньше запросов
+    аккаунта и рыночных данных. Одинаковые read-only запросы, уже
+    находящиеся в полете, объединяются в один вызов, а если задан cache -
+    свежие ответы на них отдаются без обращения к OKX.
+
+    Сетевые сбои и коды временной недоступности OKX повторяются с
+    экспоненциальной задержкой, но только для идемпотентных вызовов:
+    размещение ордера без clOrdId не повторяется никогда. Read-only
+    запрос, не ответивший за p95 своего endpoint, дублируется
+    (хеджирование) - если на это есть свободный токен. После серии
+    сбоев подряд endpoint отключается circuit breaker и вызовы сразу
+    завершаются CircuitOpenError, пока OKX не восстановится. Breaker, как
+    и лимит, свой у каждого ключа endpoint_key(метод, путь), то есть у
+    каждого метода python-okx: сбои get_order не отключают place_order,
+    хотя путь у них общий.
+    """
+
+    def __init__(self, cache=None, retry: Optional[RetryPolicy] = None,
+                 hedge: Optional[bool] = None, breaker_threshold: Optional[int] = None,
+                 breaker_reset: Optional[float] = None):
+        """
+        Args:
+            cache: ResponseCache для read-only endpoint с TTL (None - без кэша)
+            retry: Политика повторов (по умолчанию API_RETRY_COUNT и API_RETRY_BACKOFF)
+            hedge: Хеджировать медленные read-only запросы (по умолчанию API_HEDGE_ENABLED)
+            breaker_threshold: Сбоев подряд до отключения endpoint (BREAKER_THRESHOLD)
+            breaker_reset: Через сколько секунд пробовать endpoint снова (BREAKER_RESET)
+        """
+        self.cache = cache
+        self.retry = retry or RetryPolicy(Config.API_RETRY_COUNT, Config.API_RETRY_BACKOFF)
+        self.hedge = Config.API_HEDGE_ENABLED if hedge is None else hedge
+        self.breaker_threshold = breaker_threshold or Config.BREAKER_THRESHOLD
+        self.breaker_reset = Config.BREAKER_RESET if breaker_reset is None else breaker_reset
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, LatencyTracker] = {}
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._cond = threading.Condition()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._waiters: Dict[str, list] = {}
+        self._seq = itertools.count()
+        self._inflight: Dict[tuple, Future] = {}
+        self._async_inflight: Dict[tuple, asyncio.Future] = {}
+        self._metrics: Dict[str, Dict[str, float]] = {}
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            rule = rule_for(endpoint)
+            bucket = self._buckets[endpoint] = TokenBucket(rule.limit, rule.per)
+            self._waiters[endpoint] = []
+            self._breakers[endpoint] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            self._latency[endpoint] = LatencyTracker()
+            self._metrics[endpoint] = {'requests': 0, 'queued': 0, 'max_queued': 0,
+                                       'wait_time': 0.0, 'coalesced': 0, 'throttled': 0,
+                                       'retries': 0, 'hedged': 0, 'hedge_wins': 0,
+                                       'breaker_open': 0}
+        return bucket
+
+    def _count(self, endpoint: str, name: str):
+        with self._cond:
+            self._bucket(endpoint)
+            self._metrics[endpoint][name] += 1
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        with self._cond:
+            self._bucket(endpoint)
+            return self._breakers[endpoint]
+
+    # --- Токены ---
+
+    def try_acquire(self, endpoint: str, cost: int = 1) -> bool:
+        """Неблокирующая попытка взять токены (только если очередь пуста)"""
+        with self._cond:
+            bucket = self._bucket(endpoint)
+            if self._waiters[endpoint] or bucket.try_acquire(cost=cost) > 0:
+                return False
+            self._metrics[endpoint]['requests'] += 1
+            return True
+
+    def acquire(self, endpoint: str, priority: Optional[int] = None, cost: int = 1) -> float:
+        """
+        Блокирующее получение токенов с учетом приоритета. Возвращает время ожидания
+
+        Args:
+            cost: Число токенов (для пакетных endpoint OKX считает каждый ордер)
+        """
+        priority = rule_for(endpoint).priority if priority is None else priority
+        started = time.monotonic()
+        with self._cond:
+            bucket = self._bucket(endpoint)
+            waiters = self._waiters[endpoint]
+            metrics = self._metrics[endpoint]
+            entry = (priority, next(self._seq))
+            heapq.heappush(waiters, entry)
+            metrics['queued'] += 1
+            metrics['max_queued'] = max(metrics['max_queued'], metrics['queued'])
+            try:
+                while True:
+                    if waiters[0] == entry:
+                        wait = bucket.try_acquire(cost=cost)
+                        if wait <= 0:
+                            break
+                        self._cond.wait(timeout=wait)
+                    else:
+                        self._cond.wait()
+            finally:
+                waiters.remove(entry)
+                heapq.heapify(waiters)
+                metrics['queued'] -= 1
+                self._cond.notify_all()
+            waited = time.monotonic() - started
+            metrics['requests'] += 1
+            metrics['wait_time'] += waited
+        return waited
+
+    async def acquire_async(self, endpoint: str, priority: Optional[int] = None,
+                            cost: int = 1) -> float:
+        """Асинхронное получение токенов (ожидание уходит в пул потоков)"""
+        if self.try_acquire(endpoint, cost):
+            return 0.0
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.acquire, endpoint, priority, cost)
+
+    def throttled(self, endpoint: str):
+        """Учет ответа 50011: считаем окно исчерпанным"""
+        with self._cond:
+            self._bucket(endpoint).drain()
+            self._metrics[endpoint]['throttled'] += 1
+
+    # --- Выполнение ---
+
+    def execute(self, endpoint: str, fn: Callable, *args,
+                priority: Optional[int] = None, coalesce_key: Any = None,
+                cost: int = 1, **kwargs):
+        """
+        Выполнение синхронного вызова с соблюдением лимита endpoint
+
+        Args:
+            endpoint: Ключ лимита endpoint_key(метод, путь)
+            fn: Вызываемая функция (метод клиента python-okx)
+            priority: Приоритет (по умолчанию из правила endpoint)
+            coalesce_key: Ключ объединения одинаковых запросов в полете
+            cost: Вес запроса в токенах (число ордеров пакета)
+        """
+        if coalesce_key is None:
+            return self._call(endpoint, fn, args, kwargs, priority, cost)
+
+        cache = self._cache_for(endpoint)
+        if cache is not None:
+            found, cached = cache.get(endpoint, coalesce_key)
+            if found:
+                return cached
+
+        key = (endpoint, coalesce_key)
+        with self._cond:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self._bucket(endpoint)
+                self._metrics[endpoint]['coalesced'] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._call(endpoint, fn, args, kwargs, priority)
+            if cache is not None:
+                cache.put(endpoint, coalesce_key, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._cond:
+                self._inflight.pop(key, None)
+
+    def _cache_for(self, endpoint: str):
+        if self.cache is not None and self.cache.caches(endpoint):
+            return self.cache
+        return None
+
+    def _call(self, endpoint, fn, args, kwargs, priority, cost=1):
+        """Вызов с повторами идемпотентных запросов и circuit breaker"""
+        breaker = self._breaker(endpoint)
+        retryable = is_idempotent(endpoint, args, kwargs)
+        attempt = 0
+        while True:
+            self._check_breaker(endpoint, breaker)
+            try:
+                result = self._attempt(endpoint, fn, args, kwargs, priority, cost)
+            except Exception as e:
+                if not (self._record_error(endpoint, breaker, e)
+                        and self._may_retry(breaker, retryable, attempt)):
+                    raise
+            else:
+                if not (self._record_result(endpoint, breaker, result)
+                        and self._may_retry(breaker, retryable, attempt)):
+                    return result
+            attempt += 1
+            self._count(endpoint, 'retries')
+            time.sleep(self.retry.delay(attempt))
+
+    def _attempt(self, endpoint, fn, args, kwargs, priority, cost):
+        """Одна попытка; медленный read-only запрос дублируется после p95 endpoint"""
+        delay = self._hedge_delay(endpoint)
+        if delay is None:
+            return self._send(endpoint, fn, args, kwargs, priority, cost)
+
+        self.acquire(endpoint, priority, cost)
+        executor = self._hedge_pool()
+        primary = executor.submit(self._send, endpoint, fn, args, kwargs, priority, cost, True)
+        done, _ = wait([primary], timeout=delay)
+        # Хедж только на свободный токен: под нагрузкой дублей не будет
+        if done or not self.try_acquire(endpoint, cost):
+            return primary.result()
+        self._count(endpoint, 'hedged')
+        hedge = executor.submit(self._send, endpoint, fn, args, kwargs, priority, cost, True)
+
+        fallback, error = None, None
+        for future in as_completed((primary, hedge)):
+            try:
+                result = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            if is_retryable_result(result):
+                fallback = fallback or (result,)
+                continue
+            if future is hedge:
+                self._count(endpoint, 'hedge_wins')
+            # Проигравший запрос завершится в фоне, его ответ не нужен
+            return result
+        if fallback is not None:
+            return fallback[0]
+        raise error
+
+    def _send(self, endpoint, fn, args, kwargs, priority, cost=1, acquired=False):
+        if not acquired:
+            self.acquire(endpoint, priority, cost)
+        started = time.monotonic()
+        result = fn(*args, **kwargs)
+        if isinstance(result, dict) and result.get('code') == RATE_LIMIT_CODE:
+            # Лимит все же сработал (например, другой процесс с теми же ключами)
+            self.throttled(endpoint)
+            self.acquire(endpoint, priority, cost)
+            started = time.monotonic()
+            result = fn(*args, **kwargs)
+        self._record_latency(endpoint, result, time.monotonic() - started)
+        return result
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        with self._cond:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=32,
+                                                          thread_name_prefix="okx-hedge")
+            return self._hedge_executor
+
+    # --- Устойчивость ---
+
+    def _hedge_delay(self, endpoint: str) -> Optional[float]:
+        """Через сколько дублировать запрос; None - не хеджировать"""
+        if not self.hedge or not rule_for(endpoint).read_only:
+            return None
+        with self._cond:
+            self._bucket(endpoint)
+            tracker = self._latency[endpoint]
+        p95 = tracker.percentile(0.95)
+        return None if p95 is None else max(p95, HEDGE_MIN_DELAY)
+
+    def _record_latency(self, endpoint: str, result: Any, seconds: float):
+        # Быстрые ответы об ошибке занизили бы p95
+        if not is_retryable_result(result):
+            self._latency[endpoint].record(seconds)
+
+    def _may_retry(self, breaker: CircuitBreaker, retryable: bool, attempt: int) -> bool:
+        # Разомкнутый breaker прекращает повторы: исходная ошибка важнее CircuitOpenError
+        return retryable and attempt < self.retry.retries and breaker.state == CircuitBreaker.CLOSED
+
+    def _check_breaker(self, endpoint: str, breaker: CircuitBreaker):
+        try:
+            breaker.check(endpoint)
+        except CircuitOpenError:
+            self._count(endpoint, 'breaker_open')
+            raise
+
+    def _record_result(self, endpoint: str, breaker: CircuitBreaker, result: Any) -> bool:
+        """Учет ответа в circuit breaker; True - OKX временно недоступен"""
+        if is_retryable_result(result):
+            self._record_failure(endpoint, breaker, f"{result.get('code')}: {result.get('msg')}")
+            return True
+        breaker.record_success()
+        return False
+
+    def _record_error(self, endpoint: str, breaker: CircuitBreaker, error: Exception) -> bool:
+        """Учет исключения; True - сетевой сбой, который имеет смысл повторить"""
+        if is_transient_error(error):
+            self._record_failure(endpoint, breaker, repr(error))
+            return True
+        # Ошибка вызова, а не OKX: на состояние endpoint не влияет
+        breaker.release()
+        return False
+
+    def _record_failure(self, endpoint: str, breaker: CircuitBreaker, reason: str):
+        if breaker.record_failure():
+            logger.warning("Endpoint %s отключен на %.0f с после %d сбоев подряд: %s",
+                           endpoint, breaker.reset_timeout, breaker.failures, reason)
+
+    async def execute_async(self, endpoint: str, coro_fn: Callable, *args,
+                            priority: Optional[int] = None, coalesce_key: Any = None,
+                            cost: int = 1, **kwargs):
+        """Асинхронный аналог execute для корутин"""
+        if coalesce_key is None:
+            return await self._call_async(endpoint, coro_fn, args, kwargs, priority, cost)
+
+        cache = self._cache_for(endpoint)
+        if cache is not None:
+            found, cached = cache.get(endpoint, coalesce_key)
+            if found:
+                return cached
+
+        key = (endpoint, coalesce_key)
+        future = self._async_inflight.get(key)
+        if future is not None and future.get_loop() is asyncio.get_running_loop():
+            with self._cond:
+                self._metrics[endpoint]['coalesced'] += 1
+            return await asyncio.shield(future)
+
+        future = self._async_inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._call_async(endpoint, coro_fn, args, kwargs, priority)
+            if cache is not None:
+                cache.put(endpoint, coalesce_key, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Исключение получит вызывающий; подавляем предупреждение, если ждущих нет
+            future.exception()
+            raise
+        finally:
+            if self._async_inflight.get(key) is future:
+                del self._async_inflight[key]
+
+    async def _call_async(self, endpoint, coro_fn, args, kwargs, priority, cost=1):
+        """Асинхронный аналог _call"""
+        breaker = self._breaker(endpoint)
+        retryable = is_idempotent(endpoint, args, kwargs)
+        attempt = 0
+        while True:
+            self._check_breaker(endpoint, breaker)
+            try:
+                result = await self._attempt_async(endpoint, coro_fn, args, kwargs, priority, cost)
+            except Exception as e:
+                if not (self._record_error(endpoint, breaker, e)
+                        and self._may_retry(breaker, retryable, attempt)):
+                    raise
+            else:
+                if not (self._record_result(endpoint, breaker, result)
+                        and self._may_retry(breaker, retryable, attempt)):
+                    return result
+            attempt += 1
+            self._count(endpoint, 'retries')
+            await asyncio.sleep(self.retry.delay(attempt))
+
+    async def _attempt_async(self, endpoint, coro_fn, args, kwargs, priority, cost):
+        delay = self._hedge_delay(endpoint)
+        if delay is None:
+            return await self._send_async(endpoint, coro_fn, args, kwargs, priority, cost)
+
+        await self.acquire_async(endpoint, priority, cost)
+        primary = asyncio.ensure_future(
+            self._send_async(endpoint, coro_fn, args, kwargs, priority, cost, True))
+        tasks = [primary]
+        fallback, error = None, None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self.try_acquire(endpoint, cost):
+                return await primary
+            self._count(endpoint, 'hedged')
+            hedge = asyncio.ensure_future(
+                self._send_async(endpoint, coro_fn, args, kwargs, priority, cost, True))
+            tasks.append(hedge)
+
+            for task in asyncio.as_completed(tasks):
+                try:
+                    result = await task
+                except Exception as e:
+                    error = error or e
+                    continue
+                if is_retryable_result(result):
+                    fallback = fallback or (result,)
+                    continue
+                if not primary.done() or primary.exception() is not None \
+                        or is_retryable_result(primary.result()):
+                    self._count(endpoint, 'hedge_wins')
+                return result
+        finally:
+            # Проигравший (или брошенный при отмене) запрос отменяем
+            for task in tasks:
+                task.cancel()
+        if fallback is not None:
+            return fallback[0]
+        raise error
+
+    async def _send_async(self, endpoint, coro_fn, args, kwargs, priority, cost=1, acquired=False):
+        if not acquired:
+            await self.acquire_async(endpoint, priority, cost)
+        started = time.monotonic()
+        result = await coro_fn(*args, **kwargs)
+        if isinstance(result, dict) and result.get('code') == RATE_LIMIT_CODE:
+            self.throttled(endpoint)
+            await self.acquire_async(endpoint, priority, cost)
+            started = time.monotonic()
+            result = await coro_fn(*args, **kwargs)
+        self._record_latency(endpoint, result, time.monotonic() - started)
+        return result
+
+    # --- Метрики ---
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Метрики по endpoint: запросы, текущая/максимальная глубина очереди и т.д."""
+        with self._cond:
+            result = {}
+            for endpoint, values in self._metrics.items():
+                p95 = self._latency[endpoint].percentile(0.95)
+                result[endpoint] = dict(values, available=self._buckets[endpoint].available,
+                                        breaker=self._breakers[endpoint].state,
+                                        p95_ms=None if p95 is None else round(p95 * 1000, 1))
+            return result
+
+
+class ScheduledAPI:
+    """Обертка клиента python-okx: все вызовы методов идут через RequestScheduler"""
+
+    def __init__(self, api, scheduler: RequestScheduler):
+        self._api = api
+        self._scheduler = scheduler
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._api, name)
+        endpoint = METHOD_ENDPOINTS.get(name)
+        if endpoint is None or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            key = None
+            if endpoint in BATCH_ENDPOINTS and args and isinstance(args[0], list):
+                # Пакетные запросы OKX лимитирует по числу ордеров
+                return self._scheduler.execute(endpoint, attr, *args, cost=len(args[0]), **kwargs)
+            if rule_for(endpoint).read_only:
+                key = (name, args, tuple(sorted(kwargs.items())))
+                try:
+                    hash(key)
+                except TypeError:
+                    key = None
+            return self._scheduler.execute(endpoint, attr, *args, coalesce_key=key, **kwargs)
+
+        return call
@@ -0,0 +1,293 @@
+#okx_client/remote.py
+"""
+Подключение UI к headless-сервису (okx_client.service) по локальному сокету
+"""
+import asyncio
+import itertools
+import json
+import logging
+import socket
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from okx_client.config import Config
+from okx_client.orderbook import BookSnapshot
+from okx_client.service import to_json
+
+logger = logging.getLogger(__name__)
+
+# Поля строк БД, которые сервис передает строками ISO 8601
+_DATETIME_FIELDS = ('created_at', 'updated_at')
+
+
+class RemoteError(Exception):
+    """Ошибка, возвращенная сервисом"""
+
+
+class RemoteRow:
+    """Строка выборки из сервиса: доступ по атрибутам и через _mapping, как у Row SQLAlchemy"""
+
+    __slots__ = ('_mapping',)
+
+    def __init__(self, mapping: Dict):
+        self._mapping = {key: _parse_datetime(value) if key in _DATETIME_FIELDS else value
+                         for key, value in mapping.items()}
+
+    def __getattr__(self, name: str):
+        try:
+            return self._mapping[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def _parse_datetime(value: Any) -> Any:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _decode_order_book(result: Optional[Dict]) -> Optional[BookSnapshot]:
+    return None if result is None else BookSnapshot.from_dict(result)
+
+
+def _decode_order_history(result: List) -> tuple:
+    rows, cursor = result
+    if cursor is not None:
+        cursor = (_parse_datetime(cursor[0]), cursor[1])
+    return [RemoteRow(row) for row in rows], cursor
+
+
+# Ответы сервиса в JSON -> те же типы, что возвращает локальный OKXClient
+RESULT_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    'public.get_order_book': _decode_order_book,
+    'trader.get_order_history': _decode_order_history,
+}
+
+
+class _RemoteManager:
+    """Прокси менеджера сервиса: manager.method(*args) -> запрос call"""
+
+    def __init__(self, client: 'RemoteClient', target: str):
+        self._client = client
+        self._target = target
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        target = f"{self._target}.{name}"
+        decode = RESULT_DECODERS.get(target)
+
+        def call(*args, **kwargs):
+            result = self._client.request('call', {'target': target, 'args': list(args),
+                                                   'kwargs': kwargs})
+            return decode(result) if decode else result
+        return call
+
+
+class RemotePoller:
+    """
+    Интерфейс RefreshScheduler поверх сервиса
+
+    Задачи выполняет сервис; set_active сообщает, какие задачи нужны этому
+    UI, подписчики получают изменения из событий сервиса.
+    """
+
+    def __init__(self, client: 'RemoteClient'):
+        self._client = client
+        self._listeners: Dict[str, List[Callable[[str, Any], None]]] = {}
+        self._latest: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, name: str, callback: Callable[[str, Any], None]) -> Callable[[], None]:
+        with self._lock:
+            new = name not in self._listeners
+            self._listeners.setdefault(name, []).append(callback)
+            latest = self._latest.get(name)
+        if new:
+            self._client.request('listen', {'jobs': [name]})
+        elif latest is not None:
+            callback(name, latest)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._listeners.get(name, []):
+                    self._listeners[name].remove(callback)
+        return unsubscribe
+
+    def latest(self, name: str) -> Any:
+        return self._latest.get(name)
+
+    def is_stale(self, name: str) -> bool:
+        # Сервис отдает только живые данные
+        return False
+
+    def names(self) -> List[str]:
+        return list(self._client.info.get('jobs', []))
+
+    def set_active(self, names: Iterable[str]):
+        self._client.request('activate', {'jobs': list(names)})
+
+    def trigger(self, name: Optional[str] = None):
+        self._client.request('trigger', {'job': name})
+
+    def start(self):
+        # Задачи выполняет сервис
+        pass
+
+    def stop(self):
+        pass
+
+    def _on_event(self, name: str, data: Any):
+        """Событие сервиса (поток чтения сокета)"""
+        with self._lock:
+            self._latest[name] = data
+            listeners = list(self._listeners.get(name, []))
+        for callback in listeners:
+            try:
+                callback(name, data)
+            except Exception:
+                logger.exception("Ошибка подписчика %s", name)
+
+
+class _RemoteAccounts:
+    """Список аккаунтов сервиса и агрегация их данных (как у ClientPool)"""
+
+    def __init__(self, names: List[str]):
+        self._names = list(names)
+
+    @staticmethod
+    def aggregate_balances(balances: Dict[str, Dict]) -> Dict:
+        from okx_client.pool import ClientPool
+        return ClientPool.aggregate_balances(balances)
+
+    @staticmethod
+    def merge_records(results: Dict[str, Dict]) -> List[Dict]:
+        from okx_client.pool import ClientPool
+        return ClientPool.merge_records(results)
+
+    def names(self) -> List[str]:
+        return list(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+
+class _RemoteAio:
+    """Асинхронные сценарии UI поверх блокирующих запросов к сервису"""
+
+    def __init__(self, client: 'RemoteClient'):
+        self._client = client
+
+    async def refresh_account(self, inst_type: str = "SWAP") -> Dict[str, Dict]:
+        balance, positions = await asyncio.gather(
+            asyncio.to_thread(self._client.account.get_balance),
+            asyncio.to_thread(self._client.account.get_positions, inst_type),
+        )
+        return {'balance': balance, 'positions': positions}
+
+
+class RemoteClient:
+    """
+    Клиент UI к запущенному `python -m okx_client serve`.
+
+    Повторяет интерфейс OKXClient, которым пользуется UI: менеджеры public,
+    account, trader, fills, instruments (вызовы уходят в сервис), poller
+    (события сервиса), portfolio, accounts и aio. Ответы приходят как JSON:
+    объекты вроде строк БД и стакана передаются словарями.
+    """
+
+    def __init__(self, address: Optional[str] = None, token: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        """
+        Args:
+            address: host:port сервиса (по умолчанию Config.SERVICE_ADDR)
+            token: Токен доступа (по умолчанию Config.SERVICE_TOKEN)
+            timeout: Таймаут запроса, сек (по умолчанию Config.API_TIMEOUT)
+        """
+        host, _, port = (address or Config.SERVICE_ADDR).rpartition(':')
+        self.timeout = timeout or Config.API_TIMEOUT
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._send_lock = threading.Lock()
+
+        self._sock = socket.create_connection((host or Config.SERVICE_HOST, int(port)),
+                                              timeout=self.timeout)
+        self._sock.settimeout(None)
+        self._reader = threading.Thread(target=self._read_loop, name="okx-remote", daemon=True)
+        self._reader.start()
+
+        self.poller = RemotePoller(self)
+        if token or Config.SERVICE_TOKEN:
+            self.request('auth', {'token': token or Config.SERVICE_TOKEN})
+        self.info = self.request('hello')
+        self.demo_mode = self.info['demo_mode']
+
+        self.public = _RemoteManager(self, 'public')
+        self.account = _RemoteManager(self, 'account')
+        self.trader = _RemoteManager(self, 'trader')
+        self.fills = _RemoteManager(self, 'fills')
+        self.instruments = _RemoteManager(self, 'instruments')
+        # Push-кэш тикеров живет в сервисе
+        self.public.stream = None
+        self.accounts = _RemoteAccounts(self.info.get('accounts', []))
+        self._portfolio = None
+        self._lazy_lock = threading.Lock()
+        self.aio = _RemoteAio(self)
+        print(f"✅ Подключено к сервису данных {host}:{port}")
+
+    @property
+    def portfolio(self):
+        """Оценка портфеля считается в UI по тикерам из сервиса (pandas - при первом обращении)"""
+        with self._lazy_lock:
+            if self._portfolio is None:
+                from okx_client.managers.portfolio import PortfolioValuation
+                self._portfolio = PortfolioValuation(self.public)
+        return self._portfolio
+
+    def request(self, method: str, params: Optional[Dict] = None) -> Any:
+        """Запрос к сервису с ожиданием ответа"""
+        request_id = next(self._ids)
+        future = Future()
+        self._pending[request_id] = future
+        # datetime (курсор истории ордеров) уходит строкой ISO, сервис разбирает его обратно
+        payload = json.dumps({'id': request_id, 'method': method, 'params': params or {}},
+                             default=to_json, ensure_ascii=False).encode('utf-8') + b'\n'
+        try:
+            with self._send_lock:
+                self._sock.sendall(payload)
+            return future.result(timeout=self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _read_loop(self):
+        stream = self._sock.makefile('rb')
+        try:
+            for line in stream:
+                message = json.loads(line)
+                if 'event' in message:
+                    self.poller._on_event(message['event'], message.get('data'))
+                    continue
+                future = self._pending.get(message.get('id'))
+                if future is None:
+                    continue
+                if 'error' in message:
+                    future.set_exception(RemoteError(message['error']))
+                else:
+                    future.set_result(message.get('result'))
+        except (OSError, ValueError) as e:
+            logger.warning("Соединение с сервисом прервано: %s", e)
+        finally:
+            for future in list(self._pending.values()):
+                if not future.done():
+                    future.set_exception(ConnectionError("Соединение с сервисом закрыто"))
+
+    def metrics(self) -> Dict:
+        return self.request('metrics')
+
+    def close(self):
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        print("✅ Соединение с сервисом данных закрыто")
@@ -0,0 +1,142 @@
+#okx_client/resilience.py
+"""
+Устойчивость REST-вызовов: повторы, хеджирование чтений и circuit breaker
+"""
+import json
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+# Коды OKX о временной недоступности: запрос можно повторить
+# 50001 - сервис недоступен, 50004 - таймаут endpoint, 50013 - система занята,
+# 50026 - системная ошибка
+RETRYABLE_CODES = ('50001', '50004', '50013', '50026')
+
+class CircuitOpenError(RuntimeError):
+    """Endpoint временно отключен после серии сбоев"""
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Сетевые сбои, таймауты и нечитаемый ответ (HTML от балансировщика)"""
+    return isinstance(error, (httpx.TransportError, json.JSONDecodeError))
+
+
+def is_retryable_result(result: Any) -> bool:
+    return isinstance(result, dict) and result.get('code') in RETRYABLE_CODES
+
+
+def _orders(args: Iterable, kwargs: Dict) -> List[Dict]:
+    """Параметры ордеров вызова: kwargs клиента python-okx или dict/list в аргументах"""
+    if 'instId' in kwargs:
+        return [kwargs]
+    orders = []
+    for arg in args:
+        if isinstance(arg, dict):
+            orders.append(arg)
+        elif isinstance(arg, list):
+            orders.extend(item for item in arg if isinstance(item, dict))
+    return orders
+
+
+def has_client_order_ids(args: Iterable, kwargs: Dict) -> bool:
+    """У каждого ордера вызова задан clOrdId (OKX отклонит повтор, второго ордера не будет)"""
+    orders = _orders(args, kwargs)
+    return bool(orders) and all(order.get('clOrdId') for order in orders)
+
+
+class RetryPolicy:
+    """Экспоненциальная задержка между повторами с полным jitter"""
+
+    def __init__(self, retries: int = 3, base_delay: float = 0.2, max_delay: float = 5.0):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Задержка перед повтором номер attempt (с 1)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class LatencyTracker:
+    """Скользящее окно длительностей успешных запросов endpoint"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Перцентиль q (0..1) или None, пока замеров мало"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker одного endpoint.
+
+    После failure_threshold сбоев подряд размыкается: вызовы сразу
+    завершаются CircuitOpenError, не нагружая OKX. Через reset_timeout
+    пропускает один пробный запрос (half-open): успех замыкает цепь,
+    сбой снова размыкает ее.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def check(self, endpoint: str = ''):
+        """Разрешение на вызов; CircuitOpenError, если цепь разомкнута"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(f"{endpoint or 'endpoint'} временно недоступен "
+                                   f"(повтор через {retry_in:.0f} с)")
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def release(self):
+        """Вызов завершился без вердикта о состоянии endpoint (ошибка в параметрах)"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> bool:
+        """Учет сбоя; True, если цепь только что разомкнулась"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                opened = self.state != self.OPEN
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._trial_running = False
+                return opened
+            return False
@@ -0,0 +1,330 @@
+#okx_client/service.py
+"""
+Headless-сервис: движок данных без UI с доступом по локальному сокету
+"""
+import asyncio
+import hmac
+import ipaddress
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+from okx_client.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Методы менеджеров клиента, доступные по сокету (чтение данных)
+SERVICE_METHODS: Dict[str, Tuple[str, ...]] = {
+    'public': ('get_instruments', 'get_candlesticks', 'get_history_candlesticks', 'get_mark_price',
+               'get_ticker', 'get_tickers', 'get_watched_tickers', 'get_order_book', 'watch_tickers'),
+    'account': ('get_balance', 'get_positions', 'get_account_config'),
+    'trader': ('get_order_history', 'get_order_details', 'get_pending_orders', 'get_fills',
+               'get_fills_history'),
+    'fills': ('last_fill', 'daily_pnl', 'sync_and_report'),
+    'instruments': ('get', 'find', 'is_stale', 'ensure', 'validate_order'),
+}
+
+# Торговые методы: доступны только при заданном токене
+TRADING_METHODS: Dict[str, Tuple[str, ...]] = {
+    'trader': ('place_order', 'place_orders', 'amend_orders', 'cancel_order', 'cancel_orders',
+               'cancel_all'),
+}
+
+# Предел строки протокола (ответы со списками инструментов бывают большими)
+_LINE_LIMIT = 64 * 1024 * 1024
+
+
+def to_json(value: Any) -> Any:
+    """Преобразование результатов менеджеров в JSON-совместимые значения"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, '_mapping'):
+        return dict(value._mapping)
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def _decode_order_history_kwargs(kwargs: Dict) -> Dict:
+    """Курсор и интервалы истории ордеров приходят строками ISO 8601"""
+    kwargs = dict(kwargs)
+    for key in ('since', 'until'):
+        if isinstance(kwargs.get(key), str):
+            kwargs[key] = datetime.fromisoformat(kwargs[key])
+    if kwargs.get('cursor'):
+        created_at, order_id = kwargs['cursor']
+        kwargs['cursor'] = (datetime.fromisoformat(created_at), int(order_id))
+    return kwargs
+
+
+# Аргументы из JSON -> типы, которые ожидают менеджеры
+ARGUMENT_DECODERS = {
+    'trader.get_order_history': _decode_order_history_kwargs,
+}
+
+
+def is_loopback(host: str) -> bool:
+    """Адрес доступен только с этой машины"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def check_bind(host: str, token: str):
+    """Без токена сервис можно открыть только на loopback-адресе"""
+    if not token and not is_loopback(host):
+        raise ValueError(f"Сервис на адресе {host} требует токен (OKX_SERVICE_TOKEN)")
+
+
+def encode(message: Dict) -> bytes:
+    return json.dumps(message, default=to_json, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+class _Connection:
+    """Состояние одного подключенного UI"""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.authorized = False
+        self.listening: Set[str] = set()
+        self.active: Set[str] = set()
+
+    def send(self, message: Dict):
+        if not self.writer.is_closing():
+            self.writer.write(encode(message))
+
+
+class DataService:
+    """
+    Движок данных OKX для нескольких UI.
+
+    Один OKXClient (REST, WebSocket, отслеживание ордеров, БД) обслуживает
+    всех подключенных клиентов. Протокол - JSON-строки по TCP на localhost:
+
+        {"id": 1, "method": "call", "params": {"target": "account.get_balance",
+                                                "args": [], "kwargs": {}}}
+        -> {"id": 1, "result": ...}
+
+    Методы: auth, hello, call, listen, activate, trigger, latest, metrics.
+    Фоновые задачи планировщика выполняются, пока хотя бы одно подключение
+    их активировало (activate); изменения рассылаются подписанным (listen)
+    событиями {"event": имя задачи, "data": изменения}.
+
+    call вызывает только методы из SERVICE_METHODS; торговые методы
+    (TRADING_METHODS) - только если задан токен. Без токена сервис
+    слушает лишь loopback-адрес.
+    """
+
+    def __init__(self, client, host: Optional[str] = None, port: Optional[int] = None,
+                 token: Optional[str] = None):
+        """
+        Args:
+            client: OKXClient
+            host, port: Адрес сокета (по умолчанию из Config)
+            token: Токен доступа; пустой - без проверки (только loopback, без торговли)
+        """
+        self.client = client
+        self.host = host or Config.SERVICE_HOST
+        self.port = Config.SERVICE_PORT if port is None else port
+        self.token = Config.SERVICE_TOKEN if token is None else token
+        check_bind(self.host, self.token)
+        self.connections: Set[_Connection] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+
+    # --- Жизненный цикл ---
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        poller = self.client.poller
+        for name in poller.names():
+            poller.subscribe(name, self._on_poll)
+        poller.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  limit=_LINE_LIMIT)
+        logger.info("Сервис данных слушает %s:%s", self.host, self.port)
+        if not self.token:
+            logger.warning("Токен не задан: торговые методы сервиса отключены")
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        for connection in list(self.connections):
+            connection.writer.close()
+
+    # --- Фоновые обновления ---
+
+    def _on_poll(self, name: str, changes: Any):
+        """Вызывается из потока планировщика"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._broadcast, name, changes)
+
+    def _broadcast(self, name: str, changes: Any):
+        message = None
+        for connection in self.connections:
+            if name in connection.listening:
+                message = message or encode({'event': name, 'data': changes})
+                if not connection.writer.is_closing():
+                    connection.writer.write(message)
+
+    def _update_active(self):
+        """Задача выполняется, пока она активна хотя бы у одного подключения"""
+        active = set().union(*(connection.active for connection in self.connections))
+        self.client.poller.set_active(active)
+
+    # --- Подключения ---
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = _Connection(writer)
+        connection.authorized = not self.token
+        self.connections.add(connection)
+        peer = writer.get_extra_info('peername')
+        logger.info("Подключен клиент %s", peer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    connection.send({'error': 'Некорректный JSON'})
+                    continue
+                asyncio.ensure_future(self._dispatch(connection, request))
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.info("Клиент %s отключился: %s", peer, e)
+        finally:
+            self.connections.discard(connection)
+            self._update_active()
+            writer.close()
+            logger.info("Клиент %s отключен", peer)
+
+    async def _dispatch(self, connection: _Connection, request: Dict):
+        request_id = request.get('id')
+        method = request.get('method')
+        params = request.get('params') or {}
+        try:
+            if method == 'auth':
+                connection.authorized = self._check_token(params.get('token'))
+                if not connection.authorized:
+                    raise PermissionError("Неверный токен")
+                result = True
+            elif not connection.authorized:
+                raise PermissionError("Требуется auth")
+            else:
+                handler = getattr(self, f"_method_{method}", None)
+                if handler is None:
+                    raise ValueError(f"Неизвестный метод: {method}")
+                result = await handler(connection, params)
+            connection.send({'id': request_id, 'result': result})
+        except Exception as e:
+            connection.send({'id': request_id, 'error': str(e)})
+        try:
+            await connection.writer.drain()
+        except ConnectionError:
+            pass
+
+    def _check_token(self, token: Any) -> bool:
+        if not self.token:
+            return True
+        # Сравнение за постоянное время: не раскрываем совпавший префикс
+        return isinstance(token, str) and hmac.compare_digest(token.encode('utf-8'),
+                                                               self.token.encode('utf-8'))
+
+    def _resolve(self, target: str):
+        """Метод менеджера по имени 'менеджер.метод' из разрешенного списка"""
+        manager, _, name = target.partition('.')
+        if name in TRADING_METHODS.get(manager, ()):
+            if not self.token:
+                raise PermissionError(f"{target}: торговые методы требуют OKX_SERVICE_TOKEN")
+        elif name not in SERVICE_METHODS.get(manager, ()):
+            raise ValueError(f"Недоступный метод: {target}")
+        return getattr(getattr(self.client, manager), name)
+
+    # --- Методы протокола ---
+
+    async def _method_hello(self, connection: _Connection, params: Dict) -> Dict:
+        return {
+            'demo_mode': self.client.demo_mode,
+            'jobs': self.client.poller.names(),
+            'accounts': self.client.accounts.names(),
+        }
+
+    async def _method_call(self, connection: _Connection, params: Dict) -> Any:
+        target = str(params.get('target', ''))
+        fn = self._resolve(target)
+        args, kwargs = params.get('args', []), params.get('kwargs', {})
+        if target in ARGUMENT_DECODERS:
+            kwargs = ARGUMENT_DECODERS[target](kwargs)
+        # Менеджеры блокирующие - выполняем вне цикла событий
+        return await self._loop.run_in_executor(None, lambda: fn(*args, **kwargs))
+
+    async def _method_listen(self, connection: _Connection, params: Dict) -> bool:
+        poller = self.client.poller
+        for name in params.get('jobs', []):
+            if name not in connection.listening:
+                connection.listening.add(name)
+                latest = poller.latest(name)
+                if latest is not None:
+                    connection.send({'event': name, 'data': latest})
+        return True
+
+    async def _method_activate(self, connection: _Connection, params: Dict) -> bool:
+        connection.active = set(params.get('jobs', []))
+        self._update_active()
+        return True
+
+    async def _method_trigger(self, connection: _Connection, params: Dict) -> bool:
+        self.client.poller.trigger(params.get('job'))
+        return True
+
+    async def _method_latest(self, connection: _Connection, params: Dict) -> Any:
+        return self.client.poller.latest(params['job'])
+
+    async def _method_metrics(self, connection: _Connection, params: Dict) -> Dict:
+        return self.metrics()
+
+    def metrics(self) -> Dict:
+        """Состояние сервиса: лимиты запросов, фоновые задачи, запись в БД"""
+        return {
+            'connections': len(self.connections),
+            'requests': self.client.scheduler.metrics(),
+            'cache': self.client.cache.stats() if self.client.cache else {},
+            'jobs': self.client.poller.status(),
+            'order_writer_pending': self.client.order_writer.pending,
+            'stream_connected': bool(self.client.market_stream and self.client.market_stream.is_connected),
+        }
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None):
+    """Запуск сервиса до Ctrl+C"""
+    from okx_client.client import OKXClient
+
+    # Проверяем адрес до подключения к OKX
+    check_bind(host or Config.SERVICE_HOST, Config.SERVICE_TOKEN)
+    client = OKXClient()
+
+    async def main(service: DataService):
+        try:
+            await service.serve_forever()
+        finally:
+            await service.stop()
+
+    try:
+        asyncio.run(main(DataService(client, host, port)))
+    except KeyboardInterrupt:
+        logger.info("Остановка сервиса")
+    finally:
+        client.close()
@@ -0,0 +1,90 @@
+#okx_client/snapshot.py
+"""
+Снимок последних данных для мгновенной отрисовки при запуске
+"""
+import json
+import logging
+import os
+import time
+import zlib
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Задачи фонового обновления, результаты которых сохраняются в снимок
+SNAPSHOT_JOBS = ('balance', 'positions', 'orders', 'tickers', 'fills', 'accounts')
+
+_VERSION = 1
+
+
+class StartupSnapshot:
+    """
+    Последние результаты фоновых задач и отслеживаемые инструменты.
+
+    Сохраняется при закрытии клиента в сжатый JSON (zlib), загружается при
+    следующем запуске и подставляется в RefreshScheduler как устаревшие
+    данные: представления отрисовывают их сразу, а первое живое обновление
+    приходит к подписчикам как обычное изменение. Справочник инструментов
+    в снимок не входит - он уже хранится в БД (InstrumentRegistry).
+    """
+
+    def __init__(self, path: str, max_age: float = 7 * 24 * 3600):
+        """
+        Args:
+            path: Файл снимка
+            max_age: Снимок старше этого возраста (сек) не используется
+        """
+        self.path = path
+        self.max_age = max_age
+        self.saved_at: Optional[float] = None
+
+    def save(self, poller, watched: Iterable[str] = ()) -> bool:
+        """Запись снимка (атомарно: через временный файл)"""
+        jobs = {}
+        for name in SNAPSHOT_JOBS:
+            try:
+                result = poller.latest(name)
+            except KeyError:
+                continue
+            if result is not None:
+                jobs[name] = result
+
+        payload = {'version': _VERSION, 'saved_at': time.time(), 'jobs': jobs, 'watched': list(watched)}
+        tmp_path = f"{self.path}.tmp"
+        try:
+            data = zlib.compress(json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8'))
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+            logger.info("Снимок сохранен: %s (%d байт)", self.path, len(data))
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Не удалось сохранить снимок: %s", e)
+            return False
+
+    def load(self) -> Optional[Dict]:
+        """Чтение снимка; None, если его нет, он поврежден или устарел"""
+        try:
+            with open(self.path, 'rb') as f:
+                payload = json.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error) as e:
+            logger.warning("Снимок поврежден, пропускаем: %s", e)
+            return None
+
+        if payload.get('version') != _VERSION or time.time() - payload.get('saved_at', 0) > self.max_age:
+            return None
+        self.saved_at = payload['saved_at']
+        return payload
+
+    def restore(self, poller, public_manager=None) -> bool:
+        """Подстановка снимка в планировщик и список отслеживаемых тикеров"""
+        payload = self.load()
+        if payload is None:
+            return False
+        if public_manager is not None and payload.get('watched'):
+            public_manager.watch_tickers(payload['watched'])
+        for name, result in payload.get('jobs', {}).items():
+            poller.seed(name, result)
+        return True
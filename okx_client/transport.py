@@ -0,0 +1,63 @@
+#okx_client/transport.py
+"""
+Общий HTTP-транспорт для клиентов python-okx
+"""
+import threading
+from typing import Optional
+
+import httpx
+
+from okx_client.config import Config
+
+_shared: Optional[httpx.HTTPTransport] = None
+_shared_lock = threading.Lock()
+
+
+def http_limits() -> httpx.Limits:
+    """Пул соединений и keep-alive из Config"""
+    return httpx.Limits(max_connections=Config.HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE,
+                        keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY)
+
+
+def create_transport(retries: Optional[int] = None) -> httpx.HTTPTransport:
+    """
+    HTTP/2 транспорт с пулом соединений
+
+    Args:
+        retries: Повторы установки соединения (по умолчанию Config.API_RETRY_COUNT).
+            httpx повторяет только ошибки подключения, когда запрос еще не
+            отправлен, поэтому это безопасно и для размещения ордеров.
+    """
+    return httpx.HTTPTransport(
+        http2=True,
+        limits=http_limits(),
+        retries=Config.API_RETRY_COUNT if retries is None else retries,
+    )
+
+
+def shared_transport() -> httpx.HTTPTransport:
+    """
+    Транспорт процесса: одни TLS-соединения (и HTTP/2 сессии) с OKX для
+    всех клиентов - основного, субаккаунтов и проверки ключей в настройках
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = create_transport()
+        return _shared
+
+
+def use_transport(api, transport: Optional[httpx.HTTPTransport] = None,
+                  timeout: Optional[float] = None):
+    """
+    Перевод клиента python-okx (httpx.Client) на общий транспорт и таймаут
+
+    Собственный пул соединений клиента закрывается. Возвращает тот же клиент.
+    """
+    transport = transport or shared_transport()
+    if api._transport is not transport:
+        api._transport.close()
+        api._transport = transport
+    api.timeout = httpx.Timeout(Config.API_TIMEOUT if timeout is None else timeout)
+    return api
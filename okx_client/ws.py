@@ -0,0 +1,200 @@
+"""
+Базовые WebSocket-примитивы: фоновый event loop и переподключаемое соединение OKX
+"""
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+# Адреса WebSocket OKX (реальный и демо режим)
+WS_PUBLIC_URL = "wss://ws.okx.com:8443/ws/v5/public"
+WS_PRIVATE_URL = "wss://ws.okx.com:8443/ws/v5/private"
+WS_BUSINESS_URL = "wss://ws.okx.com:8443/ws/v5/business"
+WS_DEMO_PUBLIC_URL = "wss://wspap.okx.com:8443/ws/v5/public"
+WS_DEMO_PRIVATE_URL = "wss://wspap.okx.com:8443/ws/v5/private"
+WS_DEMO_BUSINESS_URL = "wss://wspap.okx.com:8443/ws/v5/business"
+
+
+def default_ws_urls(demo_mode: bool) -> Dict[str, str]:
+    """Адреса WebSocket по умолчанию для выбранного режима"""
+    if demo_mode:
+        return {'public': WS_DEMO_PUBLIC_URL, 'private': WS_DEMO_PRIVATE_URL,
+                'business': WS_DEMO_BUSINESS_URL}
+    return {'public': WS_PUBLIC_URL, 'private': WS_PRIVATE_URL,
+            'business': WS_BUSINESS_URL}
+
+
+def _arg_key(arg: Dict) -> tuple:
+    """Ключ подписки (канал + параметры)"""
+    return tuple(sorted(arg.items()))
+
+
+class WsLoop:
+    """Фоновый поток с собственным asyncio event loop"""
+
+    def __init__(self, name: str = "okx-ws"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self):
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Запуск корутины в фоновом loop из любого потока"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=timeout)
+
+
+class WsConnection:
+    """
+    Одно мультиплексированное WebSocket-соединение с OKX.
+
+    Держит набор подписок, восстанавливает их после переподключения
+    и поддерживает соединение ping-сообщениями. Все входящие сообщения
+    (кроме pong) передаются в on_message уже разобранными.
+    """
+
+    def __init__(self, url: str, on_message: Callable[[Dict], None],
+                 on_connect: Optional[Callable[['WsConnection'], None]] = None,
+                 on_disconnect: Optional[Callable[['WsConnection'], None]] = None,
+                 login_args: Optional[Callable[[], str]] = None,
+                 ping_interval: float = 25.0, max_backoff: float = 30.0,
+                 connect: Callable = websockets.connect):
+        """
+        Args:
+            url: Адрес WebSocket (можно указать локальный стенд для тестов)
+            on_message: Обработчик разобранных сообщений
+            on_connect: Вызывается после (пере)подключения и восстановления подписок
+            on_disconnect: Вызывается при потере соединения
+            login_args: Фабрика login-сообщения для приватных каналов
+            ping_interval: Интервал ping при отсутствии входящих сообщений, сек
+            max_backoff: Максимальная пауза между попытками подключения, сек
+            connect: Фабрика соединений (websockets.connect или совместимая)
+        """
+        self.url = url
+        self.on_message = on_message
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self.login_args = login_args
+        self.ping_interval = ping_interval
+        self.max_backoff = max_backoff
+        self._connect = connect
+
+        self.subscriptions: Dict[tuple, Dict] = {}
+        self.connected = False
+        self.reconnects = 0
+        self._websocket = None
+        self._closing = False
+
+    async def run(self):
+        """Основной цикл: подключение, чтение, переподключение с backoff"""
+        backoff = 1.0
+        while not self._closing:
+            try:
+                async with self._connect(self.url) as websocket:
+                    self._websocket = websocket
+                    if self.login_args:
+                        await self._login(websocket)
+                    if self.subscriptions:
+                        await self._send({'op': 'subscribe',
+                                          'args': list(self.subscriptions.values())})
+                    self.connected = True
+                    backoff = 1.0
+                    logger.info("WebSocket подключен: %s", self.url)
+                    if self.on_connect:
+                        self.on_connect(self)
+                    await self._read_loop(websocket)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not self._closing:
+                    logger.warning("WebSocket %s отключен: %s", self.url, e)
+            finally:
+                was_connected = self.connected
+                self.connected = False
+                self._websocket = None
+                if was_connected and self.on_disconnect:
+                    self.on_disconnect(self)
+
+            if self._closing:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _read_loop(self, websocket):
+        while not self._closing:
+            try:
+                raw = await asyncio.wait_for(websocket.recv(), timeout=self.ping_interval)
+            except asyncio.TimeoutError:
+                await websocket.send('ping')
+                continue
+            if raw == 'pong':
+                continue
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                logger.warning("Некорректное сообщение WebSocket: %r", raw[:200])
+                continue
+            try:
+                self.on_message(message)
+            except Exception:
+                logger.exception("Ошибка обработки сообщения WebSocket")
+
+    async def _login(self, websocket):
+        """Авторизация и ожидание подтверждения login"""
+        await websocket.send(self.login_args())
+        while True:
+            raw = await asyncio.wait_for(websocket.recv(), timeout=10)
+            if raw == 'pong':
+                continue
+            message = json.loads(raw)
+            if message.get('event') == 'login':
+                if message.get('code') != '0':
+                    raise ConnectionError(f"Ошибка авторизации WebSocket: {message.get('msg')}")
+                return
+            if message.get('event') == 'error':
+                raise ConnectionError(f"Ошибка авторизации WebSocket: {message.get('msg')}")
+
+    async def _send(self, payload: Dict):
+        if self._websocket is not None:
+            await self._websocket.send(json.dumps(payload))
+
+    async def subscribe(self, args: List[Dict]):
+        new_args = []
+        for arg in args:
+            key = _arg_key(arg)
+            if key not in self.subscriptions:
+                self.subscriptions[key] = arg
+                new_args.append(arg)
+        if new_args and self.connected:
+            await self._send({'op': 'subscribe', 'args': new_args})
+
+    async def unsubscribe(self, args: List[Dict]):
+        removed = [arg for arg in args if self.subscriptions.pop(_arg_key(arg), None)]
+        if removed and self.connected:
+            await self._send({'op': 'unsubscribe', 'args': removed})
+
+    async def close(self):
+        self._closing = True
+        if self._websocket is not None:
+            await self._websocket.close()
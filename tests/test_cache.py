@@ -0,0 +1,125 @@
+"""
+Тесты кэша ответов публичных endpoint (okx_client.cache)
+"""
+import pytest
+from okx import consts as c
+
+from okx_client import cache as cache_module
+from okx_client.cache import PUBLIC_TTLS, ResponseCache
+from okx_client.rate_limit import RequestScheduler, ScheduledAPI, endpoint_key
+
+TICKER = endpoint_key(c.GET, c.TICKER_INFO)
+INSTRUMENTS = endpoint_key(c.GET, c.INSTRUMENT_INFO)
+OK = {'code': '0', 'msg': '', 'data': [{'last': '1'}]}
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, 'time', fake)
+    return fake
+
+
+class CountingAPI:
+    def __init__(self, result=OK):
+        self.result = result
+        self.calls = 0
+
+    def get_ticker(self, instId):
+        self.calls += 1
+        return self.result
+
+
+def test_entry_expires_after_endpoint_ttl(clock):
+    cache = ResponseCache()
+    cache.put(TICKER, 'BTC-USDT', OK)
+    clock.now += PUBLIC_TTLS[TICKER] * 0.9
+    assert cache.get(TICKER, 'BTC-USDT') == (True, OK)
+    clock.now += PUBLIC_TTLS[TICKER] * 0.2
+    assert cache.get(TICKER, 'BTC-USDT') == (False, None)
+
+
+def test_private_and_write_endpoints_are_not_cached():
+    cache = ResponseCache()
+    assert not cache.caches(endpoint_key(c.GET, c.ORDER_INFO))
+    assert not cache.caches(endpoint_key(c.POST, c.PLACR_ORDER))
+    assert all(endpoint.startswith(c.GET + ' ') for endpoint in PUBLIC_TTLS)
+
+
+def test_errors_are_not_cached(clock):
+    cache = ResponseCache()
+    cache.put(TICKER, 'BTC-USDT', {'code': '50013', 'msg': 'busy', 'data': []})
+    assert cache.get(TICKER, 'BTC-USDT') == (False, None)
+
+
+def test_lru_evicts_oldest_entry(clock):
+    cache = ResponseCache(max_entries=2)
+    for inst_id in ('A', 'B', 'C'):
+        cache.put(TICKER, inst_id, OK)
+    assert cache.get(TICKER, 'A')[0] is False
+    assert cache.get(TICKER, 'C')[0] is True
+    assert cache.stats()[TICKER]['evictions'] == 1
+
+
+def test_disk_tier_survives_restart_for_long_ttls(clock, tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = ResponseCache(disk_path=path)
+    cache.put(INSTRUMENTS, 'SPOT', OK)
+    cache.put(TICKER, 'BTC-USDT', OK)
+    cache.close()
+
+    reopened = ResponseCache(disk_path=path)
+    assert reopened.get(INSTRUMENTS, 'SPOT') == (True, OK)
+    assert reopened.get(TICKER, 'BTC-USDT') == (False, None)
+    clock.now += PUBLIC_TTLS[INSTRUMENTS] + 1
+    reopened.clear()
+    assert reopened.get(INSTRUMENTS, 'SPOT') == (False, None)
+    reopened.close()
+
+
+def test_scheduler_serves_fresh_reads_from_cache(clock):
+    api = ScheduledAPI(CountingAPI(), RequestScheduler(cache=ResponseCache(), hedge=False))
+    assert api.get_ticker('BTC-USDT') == OK
+    assert api.get_ticker('BTC-USDT') == OK
+    assert api._api.calls == 1
+    clock.now += PUBLIC_TTLS[TICKER] + 0.01
+    api.get_ticker('BTC-USDT')
+    assert api._api.calls == 2
+
+
+def test_demo_and_live_responses_are_kept_apart(clock, tmp_path):
+    path = str(tmp_path / 'cache.db')
+    demo = ResponseCache(disk_path=path, demo_mode=True)
+    demo.put(INSTRUMENTS, 'SPOT', {'code': '0', 'msg': '', 'data': [{'instId': 'DEMO-USDT'}]})
+    assert demo.get(INSTRUMENTS, 'SPOT')[0] is True
+    demo.close()
+
+    live = ResponseCache(disk_path=path)
+    assert live.get(INSTRUMENTS, 'SPOT') == (False, None)
+    live.close()
+    assert ResponseCache(disk_path=path, demo_mode=True).get(INSTRUMENTS, 'SPOT')[0] is True
+
+
+def test_callers_cannot_mutate_cached_response(clock, tmp_path):
+    cache = ResponseCache(disk_path=str(tmp_path / 'cache.db'))
+    original = {'code': '0', 'msg': '', 'data': [{'instId': 'BTC-USDT'}]}
+    cache.put(INSTRUMENTS, 'SPOT', original)
+    original['data'].clear()
+
+    _, first = cache.get(INSTRUMENTS, 'SPOT')
+    first['data'][0]['instId'] = 'CHANGED'
+    first['data'].append({'instId': 'EXTRA'})
+    assert cache.get(INSTRUMENTS, 'SPOT') == (True, {'code': '0', 'msg': '', 'data': [{'instId': 'BTC-USDT'}]})
+
+    cache.clear()
+    _, from_disk = cache.get(INSTRUMENTS, 'SPOT')
+    from_disk['data'].clear()
+    assert cache.get(INSTRUMENTS, 'SPOT')[1]['data'] == [{'instId': 'BTC-USDT'}]
@@ -0,0 +1,124 @@
+"""
+Тесты локального хранилища свечей (okx_client.candle_store)
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+from okx_client.candle_store import CandleStore, parse_candles
+
+MINUTE = 60_000
+START = 1_700_000_040_000 // MINUTE * MINUTE
+
+
+def okx_row(ts: int, close: float = 1.0) -> list:
+    return [str(ts), '1', '2', '0.5', str(close), '10', '10', '10', '1']
+
+
+class HistoryPublic:
+    """PublicDataManager с history-candles по курсору after (новые свечи первыми)"""
+
+    def __init__(self, count: int, delay: float = 0.0):
+        self.candles = [START + i * MINUTE for i in range(count)]
+        self.delay = delay
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def get_history_candlesticks(self, inst_id, bar='1m', after='', before='', limit=100):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.delay)
+        older = [ts for ts in self.candles if not after or ts < int(after)]
+        return {'code': '0', 'msg': '', 'data': [okx_row(ts) for ts in reversed(older[-limit:])]}
+
+
+def test_concurrent_get_range_downloads_once(tmp_path):
+    public = HistoryPublic(250, delay=0.02)
+    store = CandleStore(public, str(tmp_path))
+    end = START + 249 * MINUTE
+    results = []
+
+    def read():
+        results.append(len(store.get_range('BTC-USDT', '1m', START, end)))
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [250] * 4
+    assert public.requests == 3
+
+
+def test_newer_candles_are_appended_in_place(tmp_path):
+    store = CandleStore(HistoryPublic(0), str(tmp_path))
+    store.append('BTC-USDT', '1m', parse_candles([okx_row(START + i * MINUTE) for i in range(10)]))
+    data_path, _ = store._paths('BTC-USDT', '1m')
+    inode = os.stat(data_path).st_ino
+
+    # Последняя свеча обновляется, следующие дописываются в тот же файл
+    store.append('BTC-USDT', '1m', parse_candles([okx_row(START + i * MINUTE, close=5.0)
+                                                   for i in range(9, 15)]))
+    assert os.stat(data_path).st_ino == inode
+
+    on_disk = np.load(data_path)
+    assert list(on_disk['ts']) == [START + i * MINUTE for i in range(15)]
+    assert list(on_disk['close'][8:11]) == [1.0, 5.0, 5.0]
+
+    reopened = CandleStore(HistoryPublic(0), str(tmp_path))
+    assert len(reopened.get_range('BTC-USDT', '1m', START, START + 14 * MINUTE, fetch=False)) == 15
+
+
+def test_older_candles_rewrite_series_in_order(tmp_path):
+    store = CandleStore(HistoryPublic(0), str(tmp_path))
+    store.append('BTC-USDT', '1m', parse_candles([okx_row(START + i * MINUTE) for i in range(5, 10)]))
+    store.append('BTC-USDT', '1m', parse_candles([okx_row(START + i * MINUTE) for i in range(0, 5)]))
+    series = store.get_range('BTC-USDT', '1m', START, START + 9 * MINUTE, fetch=False)
+    assert list(series['ts']) == [START + i * MINUTE for i in range(10)]
+
+
+def test_missing_sidecar_is_a_cache_miss(tmp_path):
+    public = HistoryPublic(50)
+    store = CandleStore(public, str(tmp_path))
+    end = START + 49 * MINUTE
+    store.get_range('BTC-USDT', '1m', START, end)
+    _, meta_path = store._paths('BTC-USDT', '1m')
+    os.remove(meta_path)
+
+    reopened = CandleStore(public, str(tmp_path))
+    assert reopened.missing('BTC-USDT', '1m', START, end) == [(START, end)]
+    assert len(reopened.get_range('BTC-USDT', '1m', START, end)) == 50
+    assert os.path.exists(meta_path)
+
+
+def test_rewrite_releases_memory_map_before_replacing_file(tmp_path, monkeypatch):
+    import weakref
+
+    from okx_client import candle_store as candle_store_module
+
+    store = CandleStore(HistoryPublic(0), str(tmp_path))
+    store.append('BTC-USDT', '1m', parse_candles([okx_row(START + i * MINUTE) for i in range(5, 10)]))
+    mapped = store._series[('BTC-USDT', '1m')]
+    assert isinstance(mapped, np.memmap)
+    mapped_ref = weakref.ref(mapped)
+    del mapped
+
+    data_path, _ = store._paths('BTC-USDT', '1m')
+    real_replace = os.replace
+
+    def replace(src, dst):
+        # В Windows подмена отображенного в память файла падает с PermissionError
+        if dst == data_path:
+            assert mapped_ref() is None
+        real_replace(src, dst)
+    monkeypatch.setattr(candle_store_module.os, 'replace', replace)
+
+    # Интервал без новых свечей: файл данных не переписывается
+    inode = os.stat(data_path).st_ino
+    store.append('BTC-USDT', '1m', parse_candles([]), covered=(START, START + 4 * MINUTE))
+    assert os.stat(data_path).st_ino == inode
+
+    store._save('BTC-USDT', '1m')
+    assert len(np.load(data_path)) == 5
@@ -0,0 +1,109 @@
+"""
+Тесты и бенчмарк свечного графика (ui.components.charts)
+"""
+import time
+
+import numpy as np
+import pytest
+
+from ui.components.charts import OHLCChart
+
+MAX_BARS = 500
+
+
+def make_series(count: int, start: int = 0):
+    ts = (np.arange(count, dtype=np.int64) + start) * 60_000
+    close = 100 + np.sin(np.arange(count) / 10)
+    ohlc = np.column_stack([close - 0.1, close + 0.5, close - 0.5, close])
+    return ts, ohlc
+
+
+def static_geometry(chart: OHLCChart):
+    """Координаты фигур статического слоя с учетом его сдвига"""
+    left = chart._static.left or 0
+    return [round(getattr(shape, 'x1', getattr(shape, 'x', 0)) + left, 6)
+            for shape in chart._static.shapes]
+
+
+def full_chart(monkeypatch) -> OHLCChart:
+    chart = OHLCChart(max_bars=MAX_BARS)
+    chart.set_data(*make_series(MAX_BARS))
+    chart.rebuilds = 0
+    original = chart.set_data
+
+    def counting_set_data(ts, ohlc):
+        chart.rebuilds += 1
+        return original(ts, ohlc)
+    monkeypatch.setattr(chart, 'set_data', counting_set_data)
+    return chart
+
+
+def test_full_window_new_bar_shifts_without_rebuild(monkeypatch):
+    chart = full_chart(monkeypatch)
+    ts, ohlc = make_series(MAX_BARS + 10)
+    for i in range(MAX_BARS, MAX_BARS + 10):
+        chart.update_bar(int(ts[i]), *ohlc[i])
+
+    assert chart.rebuilds == 0
+    assert len(chart._ts) == MAX_BARS and chart._ts[0] == ts[10]
+    assert len(chart._static.shapes) == 2 * (MAX_BARS - 1)
+
+    # Сдвинутый слой совпадает с перерисовкой того же окна с нуля
+    fresh = OHLCChart(max_bars=MAX_BARS)
+    fresh._y_min, fresh._y_max = chart._y_min, chart._y_max
+    fresh._ts, fresh._ohlc = chart._ts, chart._ohlc
+    fresh._render_static()
+    assert static_geometry(chart) == pytest.approx(static_geometry(fresh))
+
+
+def test_offset_is_reset_once_per_window(monkeypatch):
+    chart = full_chart(monkeypatch)
+    ts, ohlc = make_series(MAX_BARS * 2)
+    for i in range(MAX_BARS, MAX_BARS * 2):
+        chart.update_bar(int(ts[i]), *ohlc[i])
+    assert chart.rebuilds == 1
+    assert chart._offset < MAX_BARS
+
+
+def test_benchmark_new_bar_on_full_window(monkeypatch):
+    chart = full_chart(monkeypatch)
+    ts, ohlc = make_series(MAX_BARS + 200)
+
+    started = time.perf_counter()
+    chart.set_data(*make_series(MAX_BARS))
+    full_render = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(MAX_BARS, MAX_BARS + 200):
+        chart.update_bar(int(ts[i]), *ohlc[i])
+    per_bar = (time.perf_counter() - started) / 200
+
+    print(f"\nПолная перерисовка {MAX_BARS} баров: {full_render * 1000:.2f} мс, "
+          f"новый бар в полном окне: {per_bar * 1000:.3f} мс")
+    assert per_bar < full_render / 5
+
+
+# Бюджет обновления живой свечи: один кадр при 60 FPS
+LIVE_TICK_BUDGET = 0.016
+
+
+def test_benchmark_live_tick_on_500_bar_chart():
+    chart = OHLCChart(max_bars=MAX_BARS)
+    ts, ohlc = make_series(MAX_BARS)
+    chart.set_data(ts, ohlc)
+    last_ts = int(ts[-1])
+    open_, high, low, close = ohlc[-1]
+    ticks = 2000
+    static_shapes = list(chart._static.shapes)
+
+    started = time.perf_counter()
+    for i in range(ticks):
+        price = low + (high - low) * (i % 100) / 100
+        chart.update_bar(last_ts, open_, high, low, price)
+    per_tick = (time.perf_counter() - started) / ticks
+
+    print(f"\nТик живой свечи на {MAX_BARS} барах: {per_tick * 1000:.4f} мс")
+    assert per_tick < LIVE_TICK_BUDGET
+    # Тик внутри шкалы не трогает статический слой
+    assert chart._static.shapes == static_shapes
+    assert chart._ohlc[-1][3] == pytest.approx(low + (high - low) * 0.99)
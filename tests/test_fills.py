@@ -0,0 +1,40 @@
+"""
+Дневной PnL по локальной истории сделок
+"""
+from datetime import date, datetime
+
+from okx_client.database import DatabaseManager
+from okx_client.managers.fills import FillHistory
+from okx_client.managers.portfolio import PortfolioValuation
+
+
+def fill(bill_id: int, inst_id: str, pnl: str, fee: str, fee_ccy: str) -> dict:
+    ts = int(datetime.combine(date(2026, 1, 5), datetime.min.time()).timestamp() * 1000) + bill_id
+    return {'billId': str(bill_id), 'instId': inst_id, 'instType': 'SWAP', 'fillPnl': pnl,
+            'fee': fee, 'feeCcy': fee_ccy, 'ts': str(ts)}
+
+
+def test_daily_pnl_is_grouped_by_settlement_currency():
+    database = DatabaseManager('sqlite://')
+    database.init_db()
+    history = FillHistory(None, database.session_factory)
+    history._store([
+        fill(1, 'BTC-USDT-SWAP', '10', '-0.5', 'USDT'),
+        fill(2, 'ETH-USDT-SWAP', '-4', '-0.5', 'USDT'),
+        # Инверсный контракт: PnL и комиссия в BTC
+        fill(3, 'BTC-USD-SWAP', '0.01', '-0.0001', 'BTC'),
+    ])
+
+    report = history.daily_pnl(date(2026, 1, 5))
+    assert report['pnl'] == {'USDT': 6.0, 'BTC': 0.01}
+    assert report['fees'] == {'USDT': -1.0, 'BTC': -0.0001}
+    assert report['fills'] == 3
+
+
+def test_to_usd_converts_by_price_and_keeps_unpriced_currencies():
+    portfolio = PortfolioValuation(None)
+    portfolio.set_prices({'BTC': 50000.0})
+
+    usd, unpriced = portfolio.to_usd({'USDT': 5.0, 'BTC': 0.01, 'XYZ': 3.0})
+    assert usd == 505.0
+    assert unpriced == {'XYZ': 3.0}
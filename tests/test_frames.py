@@ -0,0 +1,38 @@
+"""
+Тесты преобразования свечей в DataFrame (okx_client.frames)
+"""
+import numpy as np
+
+from okx_client.candle_store import parse_candles
+from okx_client.frames import FRAME_COLUMNS, candles_to_frame, rows_to_frame
+
+
+def okx_rows(count: int):
+    """Ответ OKX: строки, новые свечи первыми"""
+    rows = [[str(1_700_000_000_000 + 60_000 * i), *(str(i + k / 10) for k in range(7)), '1']
+            for i in range(count)]
+    return rows[::-1]
+
+
+def test_rows_to_frame_matches_structured_path():
+    rows = okx_rows(10)
+    frame = rows_to_frame(rows)
+    expected = candles_to_frame(parse_candles(rows))
+    assert frame.equals(expected)
+    assert list(frame.dtypes) == list(expected.dtypes)
+    assert frame.index.is_monotonic_increasing
+    assert str(frame.index.tz) == 'UTC'
+
+
+def test_rows_to_frame_columns_are_views_of_one_block():
+    frame = rows_to_frame(okx_rows(10))
+    bases = {id(frame[name].to_numpy().base) for name in FRAME_COLUMNS if name != 'confirm'}
+    assert len(bases) == 1
+    assert frame['close'].to_numpy().flags['C_CONTIGUOUS']
+
+
+def test_candles_to_frame_copies_interleaved_fields_once():
+    candles = parse_candles(okx_rows(10))
+    frame = candles_to_frame(candles)
+    assert not np.shares_memory(frame['open'].to_numpy(), candles)
+    assert frame['open'].to_numpy().flags['C_CONTIGUOUS']
@@ -0,0 +1,60 @@
+"""
+Тесты свечного кэша потока рыночных данных (okx_client.market_stream)
+"""
+import pytest
+
+from okx_client.market_stream import MarketDataStream
+
+MINUTE = 60_000
+START = 1_700_000_040_000 // MINUTE * MINUTE
+
+
+def rows(count: int, start: int = START) -> list:
+    """Ответ REST: новые свечи первыми"""
+    return [[str(start + i * MINUTE), '1', '2', '0.5', '1', '10', '10', '10', '1']
+            for i in reversed(range(count))]
+
+
+@pytest.fixture
+def stream():
+    stream = MarketDataStream(max_candles=50)
+    stream.business.connected = True
+    return stream
+
+
+def test_full_window_is_served_from_stream(stream):
+    stream.seed_candles('BTC-USDT', '1m', rows(100), limit=100)
+    candles = stream.get_candles('BTC-USDT', '1m', limit=40)
+    assert len(candles) == 40 and candles[0][0] == str(START + 99 * MINUTE)
+
+
+def test_short_history_is_served_once_seeded(stream):
+    stream.seed_candles('NEW-USDT', '1m', rows(30), limit=40)
+    assert len(stream.get_candles('NEW-USDT', '1m', limit=40)) == 30
+
+    # Новая свеча из канала дополняет ряд, он по-прежнему вся история
+    stream._apply_candles('NEW-USDT', '1m', rows(1, START + 30 * MINUTE))
+    assert len(stream.get_candles('NEW-USDT', '1m', limit=40)) == 31
+
+
+def test_short_series_without_complete_history_falls_back_to_rest(stream):
+    stream.seed_candles('BTC-USDT', '1m', rows(30), limit=30)
+    assert stream.get_candles('BTC-USDT', '1m', limit=40) is None
+
+
+def test_capped_rest_response_is_not_complete_history(stream):
+    stream.max_candles = 500
+    stream.seed_candles('BTC-USDT', '1m', rows(300), limit=400)
+    assert stream.get_candles('BTC-USDT', '1m', limit=400) is None
+
+
+def test_trimmed_series_is_not_complete_history(stream):
+    stream.seed_candles('NEW-USDT', '1m', rows(49), limit=60)
+    stream._apply_candles('NEW-USDT', '1m', rows(2, START + 49 * MINUTE)[::-1])
+    assert stream.get_candles('NEW-USDT', '1m', limit=60) is None
+
+
+def test_disconnect_marks_series_stale(stream):
+    stream.seed_candles('NEW-USDT', '1m', rows(30), limit=40)
+    stream._on_business_disconnect(stream.business)
+    assert stream.get_candles('NEW-USDT', '1m', limit=40) is None
@@ -0,0 +1,141 @@
+"""
+Тесты сверки ордеров трекера с REST (okx_client.order_tracker)
+"""
+import asyncio
+import threading
+
+from okx_client import order_tracker as order_tracker_module
+from okx_client.managers.trade import PENDING_PAGE_LIMIT, TradeManager
+from okx_client.order_tracker import OrderTracker
+
+
+def make_order(ord_id: int, state: str = 'live') -> dict:
+    return {'ordId': str(ord_id), 'instId': 'BTC-USDT', 'instType': 'SPOT',
+            'state': state, 'uTime': '1000'}
+
+
+class PagedTradeAPI:
+    """TradeAPI с постраничным orders-pending по курсору after"""
+
+    def __init__(self, pending):
+        self.pending = pending
+        self.pages = []
+        self.details = []
+
+    def get_order_list(self, instType='', instId='', after='', limit='100'):
+        self.pages.append(after)
+        start = 0
+        if after:
+            start = next(i for i, order in enumerate(self.pending) if order['ordId'] == after) + 1
+        return {'code': '0', 'msg': '', 'data': self.pending[start:start + int(limit)]}
+
+    def get_order(self, instId, ordId):
+        self.details.append(ordId)
+        return {'code': '0', 'msg': '', 'data': [dict(make_order(ordId, 'canceled'), uTime='2000')]}
+
+
+class BlockingWriter:
+    """OrderWriter, чей submit ждет освобождения очереди"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.entered = threading.Event()
+        self.records = []
+
+    def submit(self, record):
+        self.entered.set()
+        self.release.wait(timeout=5)
+        self.records.append(record)
+
+
+def make_tracker(api, writer=None) -> OrderTracker:
+    trade = TradeManager(api, None)
+    return OrderTracker('key', 'secret', 'pass', writer=writer, trade_manager=trade)
+
+
+def test_get_all_pending_orders_pages_past_limit():
+    api = PagedTradeAPI([make_order(i) for i in range(PENDING_PAGE_LIMIT * 2 + 5)])
+    result = TradeManager(api, None).get_all_pending_orders()
+    assert len(result['data']) == PENDING_PAGE_LIMIT * 2 + 5
+    assert api.pages == ['', str(PENDING_PAGE_LIMIT - 1), str(PENDING_PAGE_LIMIT * 2 - 1)]
+
+
+def test_reconcile_does_not_treat_later_pages_as_missing():
+    orders = [make_order(i) for i in range(PENDING_PAGE_LIMIT + 50)]
+    api = PagedTradeAPI(orders)
+    tracker = make_tracker(api)
+    tracker.apply_orders(orders + [make_order(9999)])
+
+    tracker.reconcile()
+
+    # Только ордер, которого нет ни на одной странице, запрошен отдельно
+    assert api.details == ['9999']
+    assert tracker.get_order('9999')['state'] == 'canceled'
+    assert tracker.synced
+
+
+def test_apply_orders_submits_outside_state_lock():
+    writer = BlockingWriter()
+    tracker = make_tracker(PagedTradeAPI([]), writer=writer)
+    thread = threading.Thread(target=tracker.apply_orders, args=([make_order(1)],))
+    thread.start()
+    assert writer.entered.wait(timeout=5)
+
+    # Пока запись ждет очередь, читатели кэша не блокируются
+    acquired = tracker._lock.acquire(timeout=1)
+    assert acquired
+    tracker._lock.release()
+    assert tracker.get_order('1') is not None
+
+    writer.release.set()
+    thread.join()
+    assert len(writer.records) == 1
+
+
+class FlakyTradeAPI(PagedTradeAPI):
+    """orders-pending недоступен первые failures запросов"""
+
+    def __init__(self, pending, failures: int):
+        super().__init__(pending)
+        self.failures = failures
+
+    def get_order_list(self, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            return {'code': '50001', 'msg': 'Service temporarily unavailable', 'data': []}
+        return super().get_order_list(**kwargs)
+
+
+def test_failed_reconcile_is_retried_until_synced(monkeypatch):
+    monkeypatch.setattr(order_tracker_module, 'RECONCILE_BACKOFF', 0.01)
+    api = FlakyTradeAPI([make_order(1)], failures=3)
+    tracker = make_tracker(api)
+
+    assert tracker.reconcile() is False and not tracker.synced
+    asyncio.run(tracker._reconcile_until_synced())
+    assert tracker.synced
+    assert tracker.get_order('1') is not None
+
+
+def test_reconcile_interrupted_by_disconnect_is_not_synced():
+    api = PagedTradeAPI([make_order(1)])
+    tracker = make_tracker(api)
+    original = api.get_order_list
+
+    def disconnect_midway(**kwargs):
+        tracker._on_disconnect(tracker.connection)
+        return original(**kwargs)
+    api.get_order_list = disconnect_midway
+    assert tracker.reconcile() is False and not tracker.synced
+
+
+def test_finished_orders_are_evicted_beyond_limit():
+    tracker = make_tracker(PagedTradeAPI([]))
+    tracker.max_finished_orders = 10
+    tracker.apply_orders([make_order(i) for i in range(30)])
+    tracker.apply_orders([make_order(i, 'filled') for i in range(25)])
+
+    assert len(tracker.orders) == 5 + 10
+    # Остались активные и 10 последних завершенных
+    assert all(tracker.get_order(str(i)) is not None for i in range(15, 30))
+    assert tracker.get_order('0') is None
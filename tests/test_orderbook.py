@@ -0,0 +1,92 @@
+"""
+Тесты стакана (okx_client.orderbook) и его хранения в потоке рыночных данных
+"""
+import threading
+import zlib
+
+import pytest
+
+from okx_client.market_stream import MarketDataStream
+from okx_client.orderbook import CHECKSUM_DEPTH, BookSnapshot, OrderBook
+
+
+def okx_checksum(bids, asks) -> int:
+    bids, asks = bids[:CHECKSUM_DEPTH], asks[:CHECKSUM_DEPTH]
+    parts = []
+    for i in range(max(len(bids), len(asks))):
+        if i < len(bids):
+            parts.extend(bids[i][:2])
+        if i < len(asks):
+            parts.extend(asks[i][:2])
+    crc = zlib.crc32(':'.join(parts).encode())
+    return crc - (1 << 32) if crc >= (1 << 31) else crc
+
+
+def book_message(channel, inst_id, bids, asks, action='snapshot'):
+    return {'arg': {'channel': channel, 'instId': inst_id}, 'action': action,
+            'data': [{'bids': bids, 'asks': asks, 'checksum': okx_checksum(bids, asks), 'ts': '1'}]}
+
+
+@pytest.fixture
+def stream():
+    stream = MarketDataStream()
+    stream.public.connected = True
+    return stream
+
+
+def test_snapshot_is_detached_from_live_book():
+    book = OrderBook('BTC-USDT')
+    book.apply_snapshot([['100', '1', '0', '1'], ['99', '2', '0', '1']], [['101', '1', '0', '1']])
+    snapshot = book.snapshot()
+    book.apply_update([['100', '0', '0', '0']], [])
+    assert snapshot.best_bid() == (100.0, 1.0)
+    assert book.best_bid() == (99.0, 2.0)
+
+
+def test_estimate_fill_walks_levels():
+    snapshot = BookSnapshot('BTC-USDT', bids=(), asks=((100.0, 1.0), (102.0, 1.0)))
+    estimate = snapshot.estimate_fill('buy', 2)
+    assert estimate['avg_price'] == pytest.approx(101.0)
+    assert estimate['slippage'] == pytest.approx(0.01)
+    assert snapshot.estimate_fill('sell', 1) is None
+
+
+def test_snapshot_round_trips_through_dict():
+    snapshot = BookSnapshot('BTC-USDT', ((100.0, 1.0),), ((101.0, 2.0),), ts=5, seq_id=7)
+    assert BookSnapshot.from_dict(snapshot.to_dict()) == snapshot
+
+
+def test_books_of_different_channels_do_not_resync_each_other(stream):
+    stream.handle_message(book_message('books5', 'BTC-USDT', [['100', '1', '0', '1']], [['101', '1', '0', '1']]))
+    stream.handle_message(book_message('books', 'BTC-USDT', [['100', '3', '0', '1'], ['99', '1', '0', '1']],
+                                       [['101', '2', '0', '1']]))
+    assert stream.get_book('BTC-USDT', 'books5').best_bid() == (100.0, 1.0)
+    assert stream.get_book('BTC-USDT', 'books').best_bid() == (100.0, 3.0)
+    assert all(book.resyncs == 0 for book in stream._books.values())
+
+
+def test_get_book_is_consistent_under_concurrent_updates(stream):
+    asks = [[str(100 + i), '1', '0', '1'] for i in range(50)]
+    stream.handle_message(book_message('books', 'BTC-USDT', [['99', '1', '0', '1']], asks))
+    stop = threading.Event()
+
+    def churn():
+        # Попеременно удаляем и возвращаем верхние уровни
+        while not stop.is_set():
+            for level in asks[:10]:
+                stream.handle_message({'arg': {'channel': 'books', 'instId': 'BTC-USDT'}, 'action': 'update',
+                                       'data': [{'bids': [], 'asks': [[level[0], '0', '0', '0']]}]})
+            for level in asks[:10]:
+                stream.handle_message({'arg': {'channel': 'books', 'instId': 'BTC-USDT'}, 'action': 'update',
+                                       'data': [{'bids': [], 'asks': [level]}]})
+
+    writer = threading.Thread(target=churn)
+    writer.start()
+    try:
+        for _ in range(2000):
+            book = stream.get_book('BTC-USDT', 'books')
+            estimate = book.estimate_fill('buy', 45)
+            assert estimate['filled'] == pytest.approx(min(45, len(book.asks)))
+    finally:
+        stop.set()
+        writer.join()
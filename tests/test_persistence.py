@@ -0,0 +1,134 @@
+"""
+Тесты фоновой записи ордеров (okx_client.persistence)
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from okx_client.database import DatabaseManager
+from okx_client.managers.trade import TradeManager
+from okx_client.models import Order
+from okx_client.persistence import OrderWriter, order_record
+
+
+def make_record(order_id: str) -> dict:
+    return {'order_id': order_id, 'symbol': 'BTC-USDT', 'side': 'buy',
+            'order_type': 'limit', 'quantity': 1.0, 'status': 'live'}
+
+
+class PoisonWriter(OrderWriter):
+    """Запись падает на каждой транзакции, где есть ордер 'poison'"""
+
+    def _write(self, batch):
+        if any(record['order_id'] == 'poison' for record in batch):
+            raise ValueError("poison")
+        super()._write(batch)
+
+
+class StuckWriter(OrderWriter):
+    """Запись не завершается, пока не выставлено событие release"""
+
+    release = threading.Event()
+
+    def _write(self, batch):
+        self.release.wait(timeout=5)
+
+
+def test_poison_record_is_dead_lettered_and_queue_moves_on(tmp_path):
+    database = DatabaseManager('sqlite://')
+    database.init_db()
+    dead_letter = tmp_path / 'dead.jsonl'
+    writer = PoisonWriter(database.session_factory, flush_interval=0.05, max_retries=2,
+                          max_backoff=0.01, dead_letter_path=str(dead_letter))
+    writer.start()
+    for order_id in ('1', 'poison', '2'):
+        writer.submit(make_record(order_id))
+    assert writer.flush(timeout=5)
+
+    session = database.session_factory()
+    assert {order.order_id for order in session.query(Order)} == {'1', '2'}
+    session.close()
+    lines = [json.loads(line) for line in dead_letter.read_text().splitlines()]
+    assert [line['record']['order_id'] for line in lines] == ['poison']
+    assert writer.dead_letters == 1
+
+    writer.submit(make_record('3'))
+    assert writer.flush(timeout=5)
+    writer.close()
+
+
+def test_submit_does_not_block_on_full_queue():
+    writer = StuckWriter(lambda: None, max_queue=1, flush_interval=0, batch_size=1,
+                         submit_timeout=0.05)
+    writer.start()
+    writer.submit(make_record('1'))
+    time.sleep(0.05)
+    writer.submit(make_record('2'))
+
+    started = time.monotonic()
+    assert writer.submit(make_record('3')) is False
+    assert time.monotonic() - started < 1
+    assert writer.dead_letters == 1
+
+    StuckWriter.release.set()
+    writer.close()
+
+
+def order_push(ord_id: str, state: str) -> dict:
+    return {'ordId': ord_id, 'instId': 'BTC-USDT', 'side': 'buy', 'ordType': 'limit',
+            'px': '100', 'sz': '1', 'state': state, 'uTime': '1000'}
+
+
+def stored_orders(database):
+    session = database.session_factory()
+    try:
+        return {order.order_id: (order.status, order.price, order.quantity)
+                for order in session.query(Order)}
+    finally:
+        session.close()
+
+
+@pytest.mark.parametrize('same_batch', [True, False])
+def test_stream_before_ack_keeps_stream_status(same_batch):
+    database = DatabaseManager('sqlite://')
+    database.init_db()
+    writer = OrderWriter(database.session_factory, flush_interval=0.2 if same_batch else 0)
+    writer.start()
+    trader = TradeManager(None, database.session_factory, writer=writer)
+
+    # Push канала orders о fill пришел раньше ответа REST на размещение
+    writer.submit(order_record(order_push('1', 'filled')))
+    if not same_batch:
+        assert writer.flush(timeout=5)
+    trader._save_order_to_db({'ordId': '1', 'sCode': '0'}, 'BTC-USDT', 'buy', 'limit', '1', '100')
+    assert writer.flush(timeout=5)
+    assert stored_orders(database)['1'][0] == 'filled'
+    writer.close()
+
+
+def test_ack_without_stream_inserts_pending_row():
+    database = DatabaseManager('sqlite://')
+    database.init_db()
+    trader = TradeManager(None, database.session_factory)
+    trader._save_order_to_db({'ordId': '1', 'sCode': '0'}, 'BTC-USDT', 'buy', 'limit', '1', '100')
+    assert stored_orders(database)['1'] == ('pending', 100.0, 1.0)
+
+
+def test_none_values_do_not_erase_earlier_changes_in_batch():
+    database = DatabaseManager('sqlite://')
+    database.init_db()
+    writer = OrderWriter(database.session_factory, flush_interval=0.2)
+    writer.start()
+    trader = TradeManager(None, database.session_factory, writer=writer)
+
+    trader._save_order_to_db({'ordId': '1'}, 'BTC-USDT', 'buy', 'limit', '1', '100')
+    # Изменен только объем: цена в записи изменения отсутствует
+    trader._amend_orders_in_db([{'instId': 'BTC-USDT', 'ordId': '1', 'newSz': '2'}],
+                               [{'ordId': '1', 'sCode': '0'}])
+    # Частичный push без instId/side
+    writer.submit({'order_id': '1', 'symbol': None, 'side': None, 'status': 'live'})
+    assert writer.flush(timeout=5)
+    assert stored_orders(database)['1'] == ('live', 100.0, 2.0)
+    writer.close()
@@ -0,0 +1,88 @@
+"""
+Тесты лимитов и планировщика запросов (okx_client.rate_limit)
+"""
+import threading
+import time
+
+import pytest
+from okx import consts as c
+
+from okx_client.rate_limit import (METHOD_ENDPOINTS, PRIORITY_ACCOUNT, PRIORITY_TRADE, RequestScheduler,
+                                   ScheduledAPI, TokenBucket, endpoint_key, rule_for)
+
+
+class SlowAPI:
+    """Клиент python-okx с задержкой ответа: запросы успевают пересечься"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _respond(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return {'code': '0', 'data': []}
+
+    def get_ticker(self, instId):
+        return self._respond()
+
+    def get_order(self, instId, ordId):
+        return self._respond()
+
+    def place_order(self, **params):
+        return self._respond()
+
+
+def run_concurrently(fn, count: int = 5):
+    threads = [threading.Thread(target=fn) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_place_and_get_order_have_separate_rules():
+    place = METHOD_ENDPOINTS['place_order']
+    get = METHOD_ENDPOINTS['get_order']
+    assert place != get
+    assert rule_for(place).priority == PRIORITY_TRADE and not rule_for(place).read_only
+    assert rule_for(get).priority == PRIORITY_ACCOUNT and rule_for(get).read_only
+
+
+def test_read_only_rules_match_http_method():
+    for name, endpoint in METHOD_ENDPOINTS.items():
+        method = c.GET if name.startswith('get_') else c.POST
+        assert endpoint == endpoint_key(method, endpoint.split(' ', 1)[1]), name
+        assert rule_for(endpoint).read_only == (method == c.GET), name
+
+
+def test_token_bucket_sliding_window():
+    bucket = TokenBucket(limit=2, per=1.0, margin=0)
+    assert bucket.try_acquire(now=0.0) == 0
+    assert bucket.try_acquire(now=0.1) == 0
+    assert bucket.try_acquire(now=0.2) == pytest.approx(0.8)
+    assert bucket.try_acquire(now=1.0) == 0
+
+
+def test_identical_reads_in_flight_are_coalesced():
+    api = ScheduledAPI(SlowAPI(), RequestScheduler(hedge=False))
+    run_concurrently(lambda: api.get_ticker('BTC-USDT'))
+    assert api._api.calls == 1
+
+
+def test_identical_place_orders_are_not_coalesced():
+    api = ScheduledAPI(SlowAPI(), RequestScheduler(hedge=False))
+    run_concurrently(lambda: api.place_order(instId='BTC-USDT', side='buy', sz='1'))
+    assert api._api.calls == 5
+
+
+def test_place_and_get_order_use_separate_buckets():
+    scheduler = RequestScheduler(hedge=False)
+    api = ScheduledAPI(SlowAPI(delay=0), scheduler)
+    api.place_order(instId='BTC-USDT', side='buy', sz='1')
+    api.get_order('BTC-USDT', '1')
+    metrics = scheduler.metrics()
+    assert metrics[endpoint_key(c.POST, c.PLACR_ORDER)]['requests'] == 1
+    assert metrics[endpoint_key(c.GET, c.ORDER_INFO)]['requests'] == 1
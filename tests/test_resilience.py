@@ -0,0 +1,210 @@
+"""
+Тесты повторов, хеджирования и circuit breaker (okx_client.resilience, RequestScheduler)
+"""
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from okx import consts as c
+
+from okx_client.rate_limit import RequestScheduler, ScheduledAPI, endpoint_key
+from okx_client.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+GET_ORDER = endpoint_key(c.GET, c.ORDER_INFO)
+PLACE_ORDER = endpoint_key(c.POST, c.PLACR_ORDER)
+TICKER = endpoint_key(c.GET, c.TICKER_INFO)
+
+OK = {'code': '0', 'msg': '', 'data': []}
+BUSY = {'code': '50013', 'msg': 'Systems are busy', 'data': []}
+
+
+class ScriptedAPI:
+    """Клиент python-okx, отвечающий по сценарию: исключение, dict или (пауза, ответ)"""
+
+    def __init__(self, *script, default=OK):
+        self.script = list(script)
+        self.default = default
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _respond(self, name):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            step = self.script.pop(0) if self.script else self.default
+        if isinstance(step, tuple):
+            time.sleep(step[0])
+            step = step[1]
+        if isinstance(step, Exception):
+            raise step
+        return step
+
+    def get_order(self, instId, ordId):
+        return self._respond('get_order')
+
+    def get_ticker(self, instId):
+        return self._respond('get_ticker')
+
+    def place_order(self, **params):
+        return self._respond('place_order')
+
+
+def make_scheduler(**kwargs) -> RequestScheduler:
+    options = dict(retry=RetryPolicy(retries=3, base_delay=0), hedge=False,
+                   breaker_threshold=3, breaker_reset=60)
+    options.update(kwargs)
+    return RequestScheduler(**options)
+
+
+def connect_error() -> httpx.ConnectError:
+    return httpx.ConnectError("connection refused")
+
+
+# --- Повторы ---
+
+def test_read_is_retried_after_transient_errors():
+    scheduler = make_scheduler(breaker_threshold=10)
+    api = ScheduledAPI(ScriptedAPI(connect_error(), connect_error()), scheduler)
+    assert api.get_order('BTC-USDT', '1') == OK
+    assert api._api.calls['get_order'] == 3
+    assert scheduler.metrics()[GET_ORDER]['retries'] == 2
+
+
+def test_busy_code_is_retried_and_returned_when_retries_run_out():
+    scheduler = make_scheduler(breaker_threshold=10)
+    api = ScheduledAPI(ScriptedAPI(default=BUSY), scheduler)
+    assert api.get_order('BTC-USDT', '1') == BUSY
+    assert api._api.calls['get_order'] == 4
+
+
+def test_place_order_without_client_id_is_never_retried():
+    api = ScheduledAPI(ScriptedAPI(connect_error()), make_scheduler())
+    with pytest.raises(httpx.ConnectError):
+        api.place_order(instId='BTC-USDT', side='buy', sz='1')
+    assert api._api.calls['place_order'] == 1
+
+
+def test_place_order_with_client_id_is_retried():
+    api = ScheduledAPI(ScriptedAPI(connect_error()), make_scheduler())
+    assert api.place_order(instId='BTC-USDT', side='buy', sz='1', clOrdId='a1') == OK
+    assert api._api.calls['place_order'] == 2
+
+
+def test_call_errors_are_not_retried():
+    api = ScheduledAPI(ScriptedAPI(ValueError("bad params")), make_scheduler())
+    with pytest.raises(ValueError):
+        api.get_order('BTC-USDT', '1')
+    assert api._api.calls['get_order'] == 1
+
+
+# --- Circuit breaker ---
+
+def test_breaker_opens_and_keeps_original_error():
+    scheduler = make_scheduler(retry=RetryPolicy(retries=5, base_delay=0))
+    api = ScheduledAPI(ScriptedAPI(default=connect_error()), scheduler)
+    # Повторы прекращаются, как только цепь разомкнулась: наружу - исходный сбой
+    with pytest.raises(httpx.ConnectError):
+        api.get_order('BTC-USDT', '1')
+    assert api._api.calls['get_order'] == 3
+    with pytest.raises(CircuitOpenError):
+        api.get_order('BTC-USDT', '1')
+    assert api._api.calls['get_order'] == 3
+    assert scheduler.metrics()[GET_ORDER]['breaker'] == CircuitBreaker.OPEN
+
+
+def test_breaker_is_per_method():
+    scheduler = make_scheduler(retry=RetryPolicy(retries=0))
+    failing = ScheduledAPI(ScriptedAPI(default=connect_error()), scheduler)
+    for _ in range(3):
+        with pytest.raises(httpx.ConnectError):
+            failing.get_order('BTC-USDT', '1')
+
+    # get_order и place_order - один путь /api/v5/trade/order, но разные операции
+    healthy = ScheduledAPI(ScriptedAPI(), scheduler)
+    assert healthy.place_order(instId='BTC-USDT', side='buy', sz='1') == OK
+    assert healthy.get_ticker('BTC-USDT') == OK
+    metrics = scheduler.metrics()
+    assert metrics[GET_ORDER]['breaker'] == CircuitBreaker.OPEN
+    assert metrics[PLACE_ORDER]['breaker'] == CircuitBreaker.CLOSED
+    assert metrics[TICKER]['breaker'] == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    assert breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    time.sleep(0.06)
+    breaker.check()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    breaker.record_success()
+    breaker.check()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_trial_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+# --- Хеджирование ---
+
+def prime_latency(api: ScheduledAPI, samples: int = 20):
+    """Набрать замеры быстрых ответов: без них p95 неизвестен и хеджа нет"""
+    for i in range(samples):
+        api.get_order('BTC-USDT', str(i))
+
+
+def test_slow_read_is_hedged():
+    scheduler = make_scheduler(hedge=True)
+    api = ScheduledAPI(ScriptedAPI(), scheduler)
+    prime_latency(api)
+
+    api._api.script = [(1.0, {'code': '0', 'msg': 'slow', 'data': []})]
+    started = time.monotonic()
+    result = api.get_order('BTC-USDT', 'slow')
+    assert time.monotonic() - started < 0.5
+    assert result == OK
+    metrics = scheduler.metrics()[GET_ORDER]
+    assert metrics['hedged'] == 1 and metrics['hedge_wins'] == 1
+
+
+def test_writes_are_never_hedged():
+    scheduler = make_scheduler(hedge=True)
+    api = ScheduledAPI(ScriptedAPI(), scheduler)
+    for _ in range(20):
+        api.place_order(instId='BTC-USDT', side='buy', sz='1')
+    api._api.script = [(0.2, OK)]
+    api.place_order(instId='BTC-USDT', side='buy', sz='1')
+    assert api._api.calls['place_order'] == 21
+    assert scheduler.metrics()[PLACE_ORDER]['hedged'] == 0
+
+
+# --- Асинхронный путь ---
+
+def test_async_identical_reads_are_coalesced_and_retried():
+    scheduler = make_scheduler()
+    calls = []
+
+    async def fetch(inst_id):
+        calls.append(inst_id)
+        await asyncio.sleep(0.05)
+        if len(calls) == 1:
+            raise connect_error()
+        return OK
+
+    async def run():
+        return await asyncio.gather(*(scheduler.execute_async(TICKER, fetch, 'BTC-USDT',
+                                                              coalesce_key=('BTC-USDT',))
+                                      for _ in range(5)))
+
+    assert asyncio.run(run()) == [OK] * 5
+    assert len(calls) == 2
+    assert scheduler.metrics()[TICKER]['coalesced'] == 4
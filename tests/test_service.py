@@ -0,0 +1,138 @@
+"""
+Тесты сервиса данных (okx_client.service) и подключения к нему (okx_client.remote)
+"""
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+from okx_client.orderbook import BookSnapshot
+from okx_client.poller import RefreshScheduler
+from okx_client.remote import RemoteClient, RemoteRow
+from okx_client.service import DataService
+
+
+class FakePublic:
+    def get_order_book(self, inst_id, channel='books', depth=400):
+        return BookSnapshot(inst_id, ((100.0, 1.0),), ((101.0, 2.0),))
+
+
+class FakeTrader:
+    def __init__(self):
+        self.cursors = []
+        self.placed = []
+
+    def get_order_history(self, symbol=None, limit=100, cursor=None, **filters):
+        self.cursors.append(cursor)
+        row = {'id': 7, 'order_id': '42', 'symbol': 'BTC-USDT', 'created_at': datetime(2026, 1, 2, 3, 4, 5)}
+        return [row], (row['created_at'], row['id'])
+
+    def place_order(self, **params):
+        self.placed.append(params)
+        return {'code': '0'}
+
+
+class FakeAccounts:
+    def names(self):
+        return ['main']
+
+
+class FakeClient:
+    demo_mode = True
+
+    def __init__(self):
+        self.poller = RefreshScheduler(max_workers=1)
+        self.public = FakePublic()
+        self.trader = FakeTrader()
+        self.accounts = FakeAccounts()
+
+
+@pytest.fixture
+def running_service():
+    """Сервис на свободном порту loopback в отдельном потоке"""
+    services = []
+
+    def start(token=''):
+        client = FakeClient()
+        service = DataService(client, '127.0.0.1', 0, token=token)
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(service.start())
+            ready.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait(5)
+        services.append((service, loop))
+        port = service._server.sockets[0].getsockname()[1]
+        return client, f"127.0.0.1:{port}"
+
+    yield start
+    for service, loop in services:
+        asyncio.run_coroutine_threadsafe(service.stop(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        service.client.poller.stop()
+
+
+def test_refuses_public_host_without_token():
+    with pytest.raises(ValueError):
+        DataService(FakeClient(), '0.0.0.0', 0, token='')
+    DataService(FakeClient(), '0.0.0.0', 0, token='secret')
+
+
+def test_only_allowlisted_methods_are_callable():
+    service = DataService(FakeClient(), '127.0.0.1', 0, token='')
+    assert service._resolve('public.get_order_book')
+    for target in ('trader._persist', 'trader.db', 'public.market', 'poller.stop', 'trader.place_order'):
+        with pytest.raises((ValueError, PermissionError)):
+            service._resolve(target)
+
+
+def test_trading_methods_need_token():
+    service = DataService(FakeClient(), '127.0.0.1', 0, token='secret')
+    assert service._resolve('trader.place_order')
+    assert service._check_token('secret')
+    assert not service._check_token('secreT')
+    assert not service._check_token(None)
+
+
+def test_remote_results_match_local_types(running_service):
+    client, address = running_service()
+    remote = RemoteClient(address, token='')
+    try:
+        book = remote.public.get_order_book('BTC-USDT')
+        assert isinstance(book, BookSnapshot)
+        assert book.best_bid() == (100.0, 1.0)
+
+        rows, cursor = remote.trader.get_order_history(limit=1)
+        assert isinstance(rows[0], RemoteRow)
+        assert dict(rows[0]._mapping)['order_id'] == '42'
+        assert rows[0].created_at == datetime(2026, 1, 2, 3, 4, 5)
+        assert cursor == (datetime(2026, 1, 2, 3, 4, 5), 7)
+
+        # Курсор возвращается в сервис и приходит в менеджер снова как datetime
+        remote.trader.get_order_history(limit=1, cursor=cursor)
+        assert client.trader.cursors[-1] == cursor
+    finally:
+        remote.close()
+
+
+def test_remote_trading_requires_token(running_service):
+    client, address = running_service()
+    remote = RemoteClient(address, token='')
+    try:
+        with pytest.raises(Exception, match='OKX_SERVICE_TOKEN'):
+            remote.trader.place_order(instId='BTC-USDT')
+        assert client.trader.placed == []
+    finally:
+        remote.close()
+
+
+def test_wrong_token_is_rejected(running_service):
+    _, address = running_service(token='secret')
+    with pytest.raises(Exception, match='Неверный токен'):
+        RemoteClient(address, token='wrong')
@@ -0,0 +1,46 @@
+"""
+Бюджет импорта на пути запуска UI (main.py -> ui.main_app)
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Бюджет импорта модулей оболочки, сек (часть STARTUP_BUDGET из main.py)
+IMPORT_BUDGET = 1.0
+
+# Пакеты, которые грузятся только при первом использовании
+LAZY_PACKAGES = ('pandas', 'okx', 'sqlalchemy')
+
+
+def import_profile(modules: str, cwd: Path):
+    """Модули, загруженные импортом, и суммарное время импорта, сек (по -X importtime)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {modules}'],
+                            cwd=cwd, env={'PYTHONPATH': str(ROOT), 'PATH': ''},
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr[-2000:]
+    loaded = set()
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        loaded.add(name.strip())
+        # Модули верхнего уровня: без отступа перед именем
+        if not name[1:].startswith(' '):
+            total_us += int(cumulative)
+    return loaded, total_us / 1e6
+
+
+def test_startup_imports_are_lazy_and_within_budget(tmp_path):
+    # cwd - временный каталог: main.py создает файл лога в текущем каталоге
+    loaded, seconds = import_profile('main, ui.main_app', tmp_path)
+    eager = sorted(name for name in loaded if name.split('.')[0] in LAZY_PACKAGES)
+    assert not eager, f"Тяжелые модули импортированы при запуске: {eager[:10]}"
+    assert seconds < IMPORT_BUDGET, f"Импорт оболочки занял {seconds:.2f} с (бюджет {IMPORT_BUDGET} с)"
+
+
+def test_config_check_does_not_load_client(tmp_path):
+    loaded, _ = import_profile('okx_client, okx_client.config', tmp_path)
+    assert not {name.split('.')[0] for name in loaded} & {*LAZY_PACKAGES, 'numpy', 'httpx'}
@@ -0,0 +1,76 @@
+"""
+Тесты пакетной отмены ордеров (okx_client.managers.trade)
+"""
+from okx_client.managers.trade import BATCH_LIMIT, PENDING_PAGE_LIMIT, TradeManager
+
+
+class CancelTradeAPI:
+    """TradeAPI с постраничным orders-pending и пакетной отменой"""
+
+    def __init__(self, pending):
+        self.pending = pending
+        self.canceled = []
+
+    def get_order_list(self, instType='', instId='', after='', limit='100'):
+        orders = [order for order in self.pending if not instId or order['instId'] == instId]
+        start = 0
+        if after:
+            start = next(i for i, order in enumerate(orders) if order['ordId'] == after) + 1
+        return {'code': '0', 'msg': '', 'data': orders[start:start + int(limit)]}
+
+    def cancel_multiple_orders(self, params):
+        assert len(params) <= BATCH_LIMIT
+        self.canceled.extend(item['ordId'] for item in params)
+        return {'code': '0', 'msg': '',
+                'data': [{'ordId': item['ordId'], 'sCode': '0', 'sMsg': ''} for item in params]}
+
+
+def make_pending(count: int, inst_id: str, offset: int = 0):
+    return [{'ordId': str(offset + i), 'instId': inst_id, 'state': 'live'} for i in range(count)]
+
+
+def test_cancel_all_covers_every_page():
+    api = CancelTradeAPI(make_pending(PENDING_PAGE_LIMIT + 30, 'BTC-USDT'))
+    result = TradeManager(api, None).cancel_all('BTC-USDT')
+    assert result['code'] == '0'
+    assert len(api.canceled) == PENDING_PAGE_LIMIT + 30
+
+
+def test_cancel_all_keeps_other_instruments():
+    api = CancelTradeAPI(make_pending(5, 'BTC-USDT') + make_pending(5, 'ETH-USDT', offset=100))
+    TradeManager(api, None).cancel_all('ETH-USDT')
+    assert sorted(api.canceled) == [str(100 + i) for i in range(5)]
+
+
+def test_cancel_all_without_instrument_requires_confirmation():
+    api = CancelTradeAPI(make_pending(5, 'BTC-USDT'))
+    manager = TradeManager(api, None)
+    assert manager.cancel_all(None)['code'] == '-1'
+    assert api.canceled == []
+    assert manager.cancel_all(None, all_instruments=True)['code'] == '0'
+    assert len(api.canceled) == 5
+
+
+def test_local_reads_use_own_session_per_thread(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from okx_client.database import DatabaseManager
+    from okx_client.persistence import OrderWriter
+
+    database = DatabaseManager(f"sqlite:///{tmp_path / 'orders.db'}")
+    database.init_db()
+    writer = OrderWriter(database.session_factory, flush_interval=0.01)
+    writer.start()
+    manager = TradeManager(CancelTradeAPI([]), database.read_session_factory, writer=writer)
+    manager._persist([{'order_id': str(i), 'symbol': 'BTC-USDT', 'side': 'buy', 'order_type': 'limit',
+                       'quantity': 1.0, 'status': 'live'} for i in range(50)])
+
+    def read(_):
+        rows, _cursor = manager.get_order_history(limit=20)
+        return len(rows), len(manager.get_local_orders('BTC-USDT'))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert set(pool.map(read, range(40))) == {(20, 50)}
+    assert manager.get_local_orders()[0].symbol == 'BTC-USDT'
+    writer.close()
+    database.close()
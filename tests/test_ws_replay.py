@@ -0,0 +1,138 @@
+"""
+Поток рыночных данных против локального WebSocket-стенда с записанными кадрами OKX
+"""
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from websockets.asyncio.server import serve
+
+from okx_client.market_stream import MarketDataStream
+
+FRAMES = json.loads((Path(__file__).parent / 'data' / 'okx_market_frames.json').read_text())
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class ReplayServer:
+    """Стенд OKX: на подписку отвечает записанными кадрами этого канала"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.subscriptions = []
+        self.connections = set()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._server = None
+
+    def start(self) -> int:
+        self._thread.start()
+        async def start_server():
+            return await serve(self._handle, '127.0.0.1', 0)
+        self._server = asyncio.run_coroutine_threadsafe(start_server(), self.loop).result(timeout=5)
+        return self._server.sockets[0].getsockname()[1]
+
+    def stop(self):
+        self._server.close()
+        asyncio.run_coroutine_threadsafe(self._server.wait_closed(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+    def drop_connections(self):
+        """Разрыв всех соединений со стороны биржи"""
+        async def drop():
+            for connection in list(self.connections):
+                await connection.close()
+        asyncio.run_coroutine_threadsafe(drop(), self.loop).result(timeout=5)
+
+    async def _handle(self, websocket):
+        self.connections.add(websocket)
+        try:
+            async for raw in websocket:
+                if raw == 'ping':
+                    await websocket.send('pong')
+                    continue
+                message = json.loads(raw)
+                if message.get('op') != 'subscribe':
+                    continue
+                self.subscriptions.append((websocket.request.path, message['args']))
+                for arg in message['args']:
+                    for frame in FRAMES:
+                        if frame['arg'] == arg:
+                            await websocket.send(json.dumps(frame))
+        finally:
+            self.connections.discard(websocket)
+
+    def subscribed(self, path: str):
+        return [sorted(arg.items()) for request_path, args in self.subscriptions
+                if request_path == path for arg in args]
+
+
+@pytest.fixture
+def server():
+    server = ReplayServer()
+    server.port = server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def stream(server):
+    stream = MarketDataStream(public_url=f'ws://127.0.0.1:{server.port}/public',
+                              business_url=f'ws://127.0.0.1:{server.port}/business')
+    stream.subscribe_ticker('BTC-USDT')
+    stream.subscribe_books('BTC-USDT')
+    stream.seed_candles('BTC-USDT', '1m', [], limit=100)
+    stream.start()
+    yield stream
+    stream.stop()
+
+
+def test_replayed_frames_fill_stream_caches(stream):
+    assert wait_for(lambda: stream.get_ticker('BTC-USDT') is not None)
+    assert stream.get_ticker('BTC-USDT')['last'] == '67215.1'
+
+    assert wait_for(lambda: stream.get_book('BTC-USDT') is not None)
+    book = stream.get_book('BTC-USDT')
+    assert book.best_bid()[0] == 67215.1 and book.best_ask()[0] == 67215.2
+
+    assert wait_for(lambda: len(stream.get_candles('BTC-USDT', '1m', limit=100) or []) == 2)
+    candles = stream.get_candles('BTC-USDT', '1m', limit=100)
+    assert [row[0] for row in candles] == ['1718000040000', '1717999980000']
+
+
+def test_disconnect_marks_data_stale_and_reconnect_restores_subscriptions(server, stream):
+    assert wait_for(lambda: stream.get_ticker('BTC-USDT') is not None)
+    assert wait_for(lambda: stream.get_candles('BTC-USDT', '1m') is not None)
+    assert wait_for(lambda: len(server.subscribed('/public')) == 2)
+    first_public = server.subscribed('/public')
+    assert sorted(first_public) == sorted([sorted({'channel': 'tickers', 'instId': 'BTC-USDT'}.items()),
+                                           sorted({'channel': 'books5', 'instId': 'BTC-USDT'}.items())])
+
+    server.drop_connections()
+    assert wait_for(lambda: not stream.public.connected and not stream.business.connected)
+    # Пока соединения нет, кэши не отдают устаревшие данные
+    assert stream.get_ticker('BTC-USDT') is None
+    assert stream.get_book('BTC-USDT') is None
+    assert stream.get_candles('BTC-USDT', '1m') is None
+
+    # Переподключение (backoff 1 с) с прежним набором подписок
+    assert wait_for(lambda: stream.public.connected and stream.business.connected)
+    # Стенд фиксирует подписку, когда обработает кадр - ждем, а не проверяем сразу
+    assert wait_for(lambda: sorted(server.subscribed('/public')) == sorted(first_public * 2))
+    assert wait_for(lambda: server.subscribed('/business').count(
+        sorted({'channel': 'candle1m', 'instId': 'BTC-USDT'}.items())) == 2)
+    assert stream.public.reconnects == 1
+    assert wait_for(lambda: stream.get_ticker('BTC-USDT') is not None)
+    assert wait_for(lambda: stream.get_book('BTC-USDT') is not None)
+    # Свечные ряды ждут REST gap-fill после разрыва
+    assert stream.get_candles('BTC-USDT', '1m') is None
@@ -1,9 +1,17 @@
 # ui/account_view.py
 
 import flet as ft
-import pandas as pd
 from datetime import datetime
 
+from okx_client.pool import MAIN_ACCOUNT
+from ui.components.data_table import KeyedDataTable, TableColumn
+
+# Значение выбора "все аккаунты" (суммарный баланс субаккаунтов)
+ALL_ACCOUNTS = '*'
+
+# Прозрачность данных из снимка прошлого запуска (до первого живого обновления)
+STALE_OPACITY = 0.5
+
 
 class AccountView(ft.Column):
     def __init__(self, okx_client):
@@ -46,26 +54,42 @@ class AccountView(ft.Column):
             width=200,
         )
 
-        # Таблица балансов
-        self.balance_data = ft.DataTable(
+        # Выбор аккаунта (только если настроены субаккаунты)
+        accounts = okx_client.accounts
+        self.account_select = ft.Dropdown(
+            label="Аккаунт",
+            width=200,
+            options=[ft.dropdown.Option(ALL_ACCOUNTS, "Все аккаунты")]
+                    + [ft.dropdown.Option(name) for name in accounts.names()],
+            value=MAIN_ACCOUNT,
+            visible=len(accounts) > 1,
+            on_change=self.on_account_change,
+        )
+
+        # Таблица балансов (строки по валюте, обновляются только изменившиеся ячейки)
+        amount = lambda value: f"{value:.8f}"
+        self.balance_data = KeyedDataTable(
             columns=[
-                ft.DataColumn(ft.Text("Валюта")),
-                ft.DataColumn(ft.Text("Баланс"), numeric=True),
-                ft.DataColumn(ft.Text("Доступно"), numeric=True),
-                ft.DataColumn(ft.Text("Заморожено"), numeric=True),
-                ft.DataColumn(ft.Text("Эквивалент USD"), numeric=True),
+                TableColumn("ccy", "Валюта"),
+                TableColumn("balance", "Баланс", numeric=True, fmt=amount),
+                TableColumn("avail", "Доступно", numeric=True, fmt=amount),
+                TableColumn("frozen", "Заморожено", numeric=True, fmt=amount),
+                TableColumn("usd", "Эквивалент USD", numeric=True, fmt=lambda value: f"${value:.2f}"),
             ],
-            rows=[],
+            key="ccy",
         )
 
         self.controls = [
             ft.Row([
                 ft.Text("Аккаунт", size=24, weight=ft.FontWeight.BOLD),
-                ft.ElevatedButton(
-                    "Обновить",
-                    icon=ft.Icons.REFRESH,
-                    on_click=self.update_account_data
-                ),
+                ft.Row([
+                    self.account_select,
+                    ft.ElevatedButton(
+                        "Обновить",
+                        icon=ft.Icons.REFRESH,
+                        on_click=self.update_account_data
+                    ),
+                ]),
             ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
 
             ft.Row([
@@ -85,52 +109,96 @@ class AccountView(ft.Column):
             ),
         ]
 
-        self.update_account_data(None)
+    def did_mount(self):
+        # Фоновые обновления присылают только изменившиеся данные
+        poller = self.okx_client.poller
+        self._unsubscribe = [
+            poller.subscribe('balance', self._on_poll),
+            poller.subscribe('positions', self._on_poll),
+            poller.subscribe('prices', self._on_poll),
+            poller.subscribe('fills', self._on_poll),
+        ]
+        if self.account_select.visible:
+            self._unsubscribe.append(poller.subscribe('accounts', self._on_poll))
+        if poller.latest('balance') is None:
+            # Загружаем данные асинхронно, не блокируя отрисовку
+            self.page.run_task(self.update_account_data, None)
+
+    def will_unmount(self):
+        for unsubscribe in getattr(self, '_unsubscribe', []):
+            unsubscribe()
+        self._unsubscribe = []
+
+    def _on_poll(self, name, result):
+        """Обработчик фонового обновления (вызывается из потока планировщика)"""
+        if name in ('balance', 'positions') and self.account_select.value != MAIN_ACCOUNT:
+            # Выбран другой аккаунт - данные придут из задачи 'accounts'
+            return
+        if name == 'accounts':
+            if self.account_select.value == MAIN_ACCOUNT:
+                return
+            self._render_accounts(result)
+        elif name == 'balance':
+            self._render_balance(result)
+        elif name == 'positions':
+            self._render_positions(result)
+        elif name == 'prices':
+            self._render_prices(result)
+        else:
+            self._render_pnl(result)
+        self._mark_stale(name)
+        if self.page:
+            self.update()
 
-    def update_account_data(self, e):
+    def _mark_stale(self, name):
+        """Данные из снимка показываются приглушенными, пока не придут живые"""
+        stale = self.okx_client.poller.is_stale(name)
+        controls = {
+            'balance': (self.balance_card, self.balance_data),
+            'positions': (self.positions_card,),
+            'fills': (self.pnl_card,),
+        }.get(name, ())
+        for control in controls:
+            control.opacity = STALE_OPACITY if stale else 1.0
+
+    def on_account_change(self, e):
+        """Смена аккаунта: показываем последние данные без ожидания запроса"""
+        poller = self.okx_client.poller
+        if self.account_select.value == MAIN_ACCOUNT:
+            self._render_balance(poller.latest('balance'))
+            self._render_positions(poller.latest('positions'))
+        elif poller.latest('accounts') is not None:
+            self._render_accounts(poller.latest('accounts'))
+        else:
+            poller.trigger('accounts')
+        self.update()
+
+    def _render_accounts(self, result):
+        """Баланс и позиции выбранного субаккаунта или сумма по всем аккаунтам"""
+        selected = self.account_select.value
+        if selected == ALL_ACCOUNTS:
+            pool = self.okx_client.accounts
+            balance = pool.aggregate_balances(result['balance'])
+            positions = {'code': '0', 'data': pool.merge_records(result['positions'])}
+        else:
+            balance = result['balance'].get(selected)
+            positions = result['positions'].get(selected)
+        self._render_balance(balance)
+        self._render_positions(positions)
+
+    async def update_account_data(self, e):
         """Обновление данных аккаунта"""
+        if self.account_select.value != MAIN_ACCOUNT:
+            self.okx_client.poller.trigger('accounts')
+            return
         try:
-            # Получаем баланс через account менеджер
-            result = self.okx_client.account.get_balance()
+            # Баланс и позиции запрашиваем параллельно
+            account = await self.okx_client.aio.refresh_account()
+            result = account['balance']
 
             if result and result.get('code') == '0':
-                data = result.get('data', [])
-                total_usd = 0
-                self.balance_data.rows.clear()
-
-                for account_data in data:
-                    for detail in account_data.get('details', []):
-                        ccy = detail.get('ccy', '')
-                        avail = float(detail.get('availBal', 0))
-                        frozen = float(detail.get('frozenBal', 0))
-                        balance = float(detail.get('cashBal', avail + frozen))
-
-                        # Для примера считаем что все валюты стоят 1 USD
-                        # В реальном приложении нужно получить текущие курсы
-                        usd_value = balance
-                        total_usd += usd_value
-
-                        if balance > 0 or frozen > 0:
-                            self.balance_data.rows.append(
-                                ft.DataRow(cells=[
-                                    ft.DataCell(ft.Text(ccy)),
-                                    ft.DataCell(ft.Text(f"{balance:.8f}")),
-                                    ft.DataCell(ft.Text(f"{avail:.8f}")),
-                                    ft.DataCell(ft.Text(f"{frozen:.8f}")),
-                                    ft.DataCell(ft.Text(f"${usd_value:.2f}")),
-                                ])
-                            )
-
-                # Обновляем карточки
-                self.balance_card.content.content.controls[1].value = f"${total_usd:.2f}"
-
-                # Получаем информацию о позициях
-                positions_result = self.okx_client.account.get_positions()
-                if positions_result and positions_result.get('code') == '0':
-                    positions = positions_result.get('data', [])
-                    active_positions = len([p for p in positions if float(p.get('pos', 0)) > 0])
-                    self.positions_card.content.content.controls[1].value = str(active_positions)
-
+                self._render_balance(result)
+                self._render_positions(account['positions'])
                 self.update()
 
                 if e:
@@ -145,6 +213,49 @@ class AccountView(ft.Column):
         except Exception as ex:
             self.show_error(f"Ошибка: {str(ex)}")
 
+    def _render_balance(self, result):
+        """Таблица балансов и карточка общего баланса"""
+        portfolio = self.okx_client.portfolio
+        valuation = portfolio.value(result)
+        if valuation is None:
+            return
+        self.balance_data.set_data(portfolio.rows(valuation))
+        self._render_total()
+
+    def _render_prices(self, changed):
+        """Пересчет стоимости валют, цены которых изменились"""
+        portfolio = self.okx_client.portfolio
+        valuation = portfolio.reprice(changed)
+        if valuation is None:
+            return
+        self.balance_data.upsert(portfolio.rows(valuation))
+        self._render_total()
+
+    def _render_total(self):
+        portfolio = self.okx_client.portfolio
+        total_usd = portfolio.total(portfolio.valuation())
+        self.balance_card.content.content.controls[1].value = f"${total_usd:.2f}"
+
+    def _render_positions(self, result):
+        """Карточка активных позиций"""
+        if result and result.get('code') == '0':
+            positions = result.get('data', [])
+            active_positions = len([p for p in positions if float(p.get('pos', 0)) > 0])
+            self.positions_card.content.content.controls[1].value = str(active_positions)
+
+    def _render_pnl(self, report):
+        """Карточка дневного PnL: PnL с комиссиями по валютам расчетов, переведенный в USD"""
+        net = dict(report['pnl'])
+        for ccy, fee in report['fees'].items():
+            net[ccy] = net.get(ccy, 0.0) + fee
+        pnl, unpriced = self.okx_client.portfolio.to_usd(net)
+        text = self.pnl_card.content.content.controls[1]
+        # Валюты без цены к USD показываем отдельно, а не складываем с долларами
+        text.value = " ".join([f"{'+' if pnl > 0 else ''}${pnl:.2f}",
+                               *(f"{'+' if amount > 0 else ''}{amount:.6g} {ccy}"
+                                 for ccy, amount in unpriced.items() if amount)])
+        text.color = ft.Colors.GREEN if pnl >= 0 else ft.Colors.RED
+
     def show_error(self, message):
         """Показать ошибку"""
         # В реальном приложении нужно добавить доступ к page
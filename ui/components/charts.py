@@ -1,70 +1,190 @@
-# ui/components/charts.py
 import flet as ft
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
+import flet.canvas as cv
 import numpy as np
 
 
-class OHLCChart(ft.UserControl):
-    def __init__(self, width=800, height=400):
-        super().__init__()
-        self.width = width
-        self.height = height
+class OHLCChart(ft.Stack):
+    """
+    Свечной график на примитивах Flet canvas.
 
-    def build(self):
-        # Создаем заглушку для графика
-        self.chart_container = ft.Container(
-            width=self.width,
-            height=self.height,
+    Закрытые свечи рисуются на статическом слое и не перерисовываются
+    при тиках; живая (последняя) свеча - на отдельном слое, где при
+    обновлении меняются только две фигуры. Когда окно заполнено, новый бар
+    сдвигает статический слой на одну позицию (left) и удаляет фигуры
+    самой старой свечи, не пересоздавая остальные. Полная перерисовка
+    нужна лишь при выходе цены за текущую шкалу и раз в max_bars сдвигов,
+    чтобы сбросить накопленное смещение.
+    """
+
+    def __init__(self, width=800, height=400, max_bars=500,
+                 up_color=ft.Colors.GREEN, down_color=ft.Colors.RED, padding=0.05):
+        super().__init__(width=width, height=height, clip_behavior=ft.ClipBehavior.HARD_EDGE)
+        self.chart_width = width
+        self.chart_height = height
+        self.max_bars = max_bars
+        self.up_color = up_color
+        self.down_color = down_color
+        self.padding = padding
+
+        self._ts = np.empty(0, dtype=np.int64)
+        self._ohlc = np.empty((0, 4), dtype=np.float64)
+        self._y_min = 0.0
+        self._y_max = 1.0
+        # На сколько баров сдвинут статический слой с последней полной перерисовки
+        self._offset = 0
+
+        self._placeholder = ft.Container(
+            width=width,
+            height=height,
             border=ft.border.all(1, ft.Colors.OUTLINE),
             border_radius=5,
             alignment=ft.alignment.center,
             content=ft.Text("График будет здесь", size=16)
         )
-        return self.chart_container
+        self._static = cv.Canvas(shapes=[], width=width, height=height, left=0, top=0)
+        self._live = cv.Canvas(shapes=[], width=width, height=height)
+        self._live_wick = cv.Line(paint=ft.Paint(stroke_width=1))
+        self._live_body = cv.Rect(paint=ft.Paint(style=ft.PaintingStyle.FILL))
+        self._live.shapes = [self._live_wick, self._live_body]
+        self._live_wick.visible = self._live_body.visible = False
+
+        self.controls = [self._placeholder, self._static, self._live]
+
+    # --- Данные ---
 
     def update_chart(self, ohlc_data):
-        """Обновить график OHLC данными"""
-        if not ohlc_data:
+        """
+        Обновить график OHLC данными
+
+        Args:
+            ohlc_data: DataFrame из PublicDataManager.get_candles_frame,
+                структурированный массив CandleStore или dict колонок
+        """
+        if ohlc_data is None or len(ohlc_data) == 0:
             return
 
-        # Создаем график Plotly
-        fig = go.Figure(data=[go.Candlestick(
-            x=ohlc_data['timestamp'],
-            open=ohlc_data['open'],
-            high=ohlc_data['high'],
-            low=ohlc_data['low'],
-            close=ohlc_data['close']
-        )])
-
-        fig.update_layout(
-            title="Ценовой график",
-            yaxis_title="Цена",
-            xaxis_title="Время",
-            template="plotly_dark",
-            height=self.height,
-            width=self.width
-        )
+        if hasattr(ohlc_data, 'index') and hasattr(ohlc_data, 'columns'):
+            ts = ohlc_data.index.asi8 // 1_000_000
+        elif isinstance(ohlc_data, np.ndarray):
+            ts = ohlc_data['ts']
+        else:
+            ts = np.asarray(ohlc_data['timestamp'])
+            if np.issubdtype(ts.dtype, np.datetime64):
+                ts = ts.astype('datetime64[ms]').astype(np.int64)
 
-        # Конвертируем в изображение (в реальном проекте нужно использовать plotly.io)
-        # Здесь упрощенная версия
+        ohlc = np.column_stack([np.asarray(ohlc_data[name], dtype=np.float64)
+                                for name in ('open', 'high', 'low', 'close')])
+        self.set_data(np.asarray(ts, dtype=np.int64), ohlc)
 
-        self.chart_container.content = ft.Image(
-            src_base64=self.fig_to_base64(fig),
-            width=self.width,
-            height=self.height,
-            fit=ft.ImageFit.CONTAIN
-        )
-        self.update()
-
-    def fig_to_base64(self, fig):
-        """Конвертация графика в base64"""
-        import io
-        import base64
-
-        buf = io.BytesIO()
-        fig.write_image(buf, format='png')
-        buf.seek(0)
-        img_str = base64.b64encode(buf.read()).decode()
-        return f"data:image/png;base64,{img_str}"
+    def set_data(self, ts: np.ndarray, ohlc: np.ndarray):
+        """Полная загрузка ряда: ts (мс) и матрица [open, high, low, close]"""
+        self._ts = np.array(ts[-self.max_bars:], dtype=np.int64)
+        self._ohlc = np.array(ohlc[-self.max_bars:], dtype=np.float64)
+        self._offset = 0
+        self._static.left = 0
+        self._rescale()
+        self._render_static()
+        self._render_live()
+        self._refresh(self._static, self._live)
+
+    def update_bar(self, ts: int, open_: float, high: float, low: float, close: float):
+        """
+        Тик живой свечи: обновление последнего бара или добавление нового
+
+        Обычный тик меняет только слой живой свечи.
+        """
+        row = np.array([open_, high, low, close], dtype=np.float64)
+        if len(self._ts) and ts == self._ts[-1]:
+            self._ohlc[-1] = row
+            if low < self._y_min or high > self._y_max:
+                return self.set_data(self._ts, self._ohlc)
+            self._render_live()
+            return self._refresh(self._live)
+
+        if len(self._ts) and ts < self._ts[-1]:
+            return
+        self._ts = np.append(self._ts, ts)
+        self._ohlc = np.vstack([self._ohlc, row])
+        if len(self._ts) == 1 or low < self._y_min or high > self._y_max:
+            # Шкала изменилась - перерисовываем все
+            return self.set_data(self._ts, self._ohlc)
+
+        if len(self._ts) > self.max_bars:
+            if self._offset + 1 >= self.max_bars:
+                # Смещение слоя выросло на целое окно - сбрасываем полной перерисовкой
+                return self.set_data(self._ts, self._ohlc)
+            # Окно сдвинулось: убираем самую старую свечу и сдвигаем слой на один бар
+            self._ts = self._ts[1:]
+            self._ohlc = self._ohlc[1:]
+            del self._static.shapes[:2]
+            self._offset += 1
+            self._static.left = -self._offset * self._slot
+
+        # Бывшая живая свеча закрыта - переносим ее на статический слой
+        if len(self._ts) > 1:
+            self._static.shapes.extend(
+                self._bar_shapes(len(self._ts) - 2 + self._offset, *self._ohlc[-2]))
+        self._render_live()
+        self._refresh(self._static, self._live)
+
+    # --- Геометрия ---
+
+    def _rescale(self):
+        if not len(self._ohlc):
+            return
+        low = float(self._ohlc[:, 2].min())
+        high = float(self._ohlc[:, 1].max())
+        span = (high - low) or abs(high) or 1.0
+        self._y_min = low - span * self.padding
+        self._y_max = high + span * self.padding
+
+    @property
+    def _slot(self) -> float:
+        return self.chart_width / max(self.max_bars, len(self._ts), 1)
+
+    def _y(self, price: float) -> float:
+        scale = self.chart_height / (self._y_max - self._y_min)
+        return self.chart_height - (price - self._y_min) * scale
+
+    def _bar_geometry(self, index: int, open_: float, high: float, low: float, close: float):
+        slot = self._slot
+        center = index * slot + slot / 2
+        body_top = self._y(max(open_, close))
+        body_height = max(abs(self._y(open_) - self._y(close)), 1.0)
+        color = self.up_color if close >= open_ else self.down_color
+        return (center, self._y(high), self._y(low),
+                index * slot + slot * 0.15, body_top, slot * 0.7, body_height, color)
+
+    def _bar_shapes(self, index: int, open_: float, high: float, low: float, close: float):
+        center, y_high, y_low, x, y, width, height, color = self._bar_geometry(
+            index, open_, high, low, close)
+        return [
+            cv.Line(center, y_high, center, y_low, paint=ft.Paint(color=color, stroke_width=1)),
+            cv.Rect(x, y, width, height, paint=ft.Paint(color=color, style=ft.PaintingStyle.FILL)),
+        ]
+
+    def _render_static(self):
+        shapes = []
+        for index in range(len(self._ts) - 1):
+            shapes.extend(self._bar_shapes(index, *self._ohlc[index]))
+        self._static.shapes = shapes
+        self._placeholder.content = None
+
+    def _render_live(self):
+        if not len(self._ts):
+            return
+        center, y_high, y_low, x, y, width, height, color = self._bar_geometry(
+            len(self._ts) - 1, *self._ohlc[-1])
+        wick, body = self._live_wick, self._live_body
+        wick.x1 = wick.x2 = center
+        wick.y1, wick.y2 = y_high, y_low
+        wick.paint = ft.Paint(color=color, stroke_width=1)
+        body.x, body.y, body.width, body.height = x, y, width, height
+        body.paint = ft.Paint(color=color, style=ft.PaintingStyle.FILL)
+        wick.visible = body.visible = True
+
+    def _refresh(self, *layers):
+        # До монтирования на страницу обновлять нечего
+        if self.page:
+            for layer in layers:
+                layer.update()
@@ -1 +1,160 @@
 # ui/components/data_table.py
+import flet as ft
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+@dataclass
+class TableColumn:
+    """Колонка таблицы: поле записи, заголовок и форматирование значения"""
+    field: str
+    label: str
+    numeric: bool = False
+    fmt: Callable[[Any], str] = str
+
+
+class KeyedDataTable(ft.Column):
+    """
+    Таблица с обновлением по ключу записи.
+
+    Строки и ячейки создаются один раз и переиспользуются: при новых
+    данных меняется только value у изменившихся ячеек, строки
+    добавляются и удаляются по ключу. Flet отправляет клиенту разницу
+    дерева контролов, поэтому обновление тикера - это одна ячейка, а не
+    вся таблица. Для больших списков (тысячи ордеров) рисуется только
+    текущая страница из page_size строк.
+    """
+
+    def __init__(self, columns: List[TableColumn], key: str,
+                 page_size: int = 100, sort_key: Optional[Callable[[Dict], Any]] = None,
+                 sort_reverse: bool = False, **kwargs):
+        """
+        Args:
+            columns: Колонки таблицы
+            key: Поле записи, уникально идентифицирующее строку
+            page_size: Число строк, которые рендерятся одновременно
+            sort_key: Функция сортировки записей (по умолчанию - порядок поступления)
+            sort_reverse: Обратный порядок сортировки
+        """
+        super().__init__(**kwargs)
+        self.columns = columns
+        self.key = key
+        self.page_size = page_size
+        self.sort_key = sort_key
+        self.sort_reverse = sort_reverse
+        self.offset = 0
+
+        self._records: Dict[Any, Dict] = {}
+        self._order: List[Any] = []
+        self._rows: Dict[Any, ft.DataRow] = {}
+        self._texts: Dict[Any, List[ft.Text]] = {}
+
+        self.table = ft.DataTable(
+            columns=[ft.DataColumn(ft.Text(column.label), numeric=column.numeric)
+                     for column in columns],
+            rows=[],
+        )
+        self.page_info = ft.Text("", size=12)
+        self.prev_button = ft.IconButton(ft.Icons.CHEVRON_LEFT, on_click=self._prev_page)
+        self.next_button = ft.IconButton(ft.Icons.CHEVRON_RIGHT, on_click=self._next_page)
+        self.pager = ft.Row([self.prev_button, self.page_info, self.next_button],
+                            alignment=ft.MainAxisAlignment.END, visible=False)
+        self.controls = [self.table, self.pager]
+
+    # --- Данные ---
+
+    def __len__(self):
+        return len(self._records)
+
+    def get(self, key) -> Optional[Dict]:
+        return self._records.get(key)
+
+    def set_data(self, records: Iterable[Dict]) -> bool:
+        """Полный снимок данных: отсутствующие в нем строки удаляются"""
+        records = {record[self.key]: record for record in records}
+        removed = [key for key in self._records if key not in records]
+        return self._apply(records, removed)
+
+    def upsert(self, records: Iterable[Dict]) -> bool:
+        """Добавление и обновление строк без удаления остальных"""
+        return self._apply({record[self.key]: record for record in records}, [])
+
+    def remove(self, keys: Iterable) -> bool:
+        """Удаление строк по ключу"""
+        return self._apply({}, [key for key in keys if key in self._records])
+
+    def _apply(self, records: Dict[Any, Dict], removed: List) -> bool:
+        """Применение изменений; возвращает True, если видимая часть изменилась"""
+        changed_keys = {key for key, record in records.items() if self._records.get(key) != record}
+        if not changed_keys and not removed:
+            return False
+
+        structure_changed = bool(removed) or any(key not in self._records for key in changed_keys)
+        for key in removed:
+            del self._records[key]
+        for key in changed_keys:
+            self._records[key] = records[key]
+
+        if structure_changed or self.sort_key:
+            self._order = list(self._records)
+            if self.sort_key:
+                self._order.sort(key=lambda k: self.sort_key(self._records[k]),
+                                 reverse=self.sort_reverse)
+        self._render()
+        self._refresh()
+        return True
+
+    # --- Отрисовка ---
+
+    def _render(self):
+        """Синхронизация строк текущей страницы с данными"""
+        self.offset = min(self.offset, max(len(self._order) - 1, 0) // self.page_size * self.page_size)
+        visible = self._order[self.offset:self.offset + self.page_size]
+
+        rows = []
+        for key in visible:
+            record = self._records[key]
+            values = [column.fmt(record.get(column.field, "")) for column in self.columns]
+            texts = self._texts.get(key)
+            if texts is None:
+                texts = [ft.Text(value) for value in values]
+                self._texts[key] = texts
+                self._rows[key] = ft.DataRow(cells=[ft.DataCell(text) for text in texts])
+            else:
+                for text, value in zip(texts, values):
+                    if text.value != value:
+                        text.value = value
+            rows.append(self._rows[key])
+
+        # Строки за пределами страницы не держим
+        visible_keys = set(visible)
+        for key in [key for key in self._rows if key not in visible_keys]:
+            del self._rows[key]
+            del self._texts[key]
+
+        if [id(row) for row in rows] != [id(row) for row in self.table.rows]:
+            self.table.rows = rows
+
+        total = len(self._order)
+        self.pager.visible = total > self.page_size
+        if self.pager.visible:
+            last = min(self.offset + self.page_size, total)
+            self.page_info.value = f"{self.offset + 1}-{last} из {total}"
+            self.prev_button.disabled = self.offset == 0
+            self.next_button.disabled = last >= total
+
+    def _refresh(self):
+        # До монтирования на страницу обновлять нечего
+        if self.page:
+            self.update()
+
+    def _prev_page(self, e):
+        self.offset = max(self.offset - self.page_size, 0)
+        self._render()
+        self._refresh()
+
+    def _next_page(self, e):
+        if self.offset + self.page_size < len(self._order):
+            self.offset += self.page_size
+            self._render()
+            self._refresh()
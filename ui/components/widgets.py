@@ -3,6 +3,8 @@ import flet as ft
 from typing import Callable, Dict, List, Optional
 from datetime import datetime
 
+from ui.components.data_table import KeyedDataTable, TableColumn
+
 
 class StatusIndicator:
     """Индикатор статуса подключения"""
@@ -81,35 +83,32 @@ class MetricCard:
 class DataTableWidget:
     """Виджет таблицы данных"""
 
-    def __init__(self, headers: List[str], data: List[Dict]):
+    def __init__(self, headers: List[str], data: List[Dict], key: Optional[str] = None,
+                 page_size: int = 100):
         self.headers = headers
         self.data = data
+        self.key = key
+        self.table = KeyedDataTable(
+            [TableColumn(header, header) for header in headers],
+            key=key or '_index',
+            page_size=page_size,
+        )
 
     def build(self):
-        columns = [ft.DataColumn(ft.Text(header)) for header in self.headers]
-        rows = []
-
-        for item in self.data:
-            cells = []
-            for header in self.headers:
-                value = item.get(header, "")
-                cells.append(ft.DataCell(ft.Text(str(value))))
-            rows.append(ft.DataRow(cells=cells))
-
+        self.update_data(self.data)
         return ft.Container(
-            content=ft.DataTable(
-                columns=columns,
-                rows=rows,
-                horizontal_lines=ft.BorderSide(1, ft.Colors.GREY_800),
-                vertical_lines=ft.BorderSide(1, ft.Colors.GREY_800)
-            ),
+            content=self.table,
             border_radius=5,
             padding=5
         )
 
     def update_data(self, data: List[Dict]):
+        """Обновление только изменившихся строк и ячеек"""
         self.data = data
-        # Здесь должна быть логика обновления таблицы
+        if self.key is None:
+            # Без ключа строки сопоставляются по позиции
+            data = [dict(item, _index=index) for index, item in enumerate(data)]
+        self.table.set_data(data)
 
 
 class OrderForm:
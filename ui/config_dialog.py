@@ -105,16 +105,21 @@ class ConfigDialog(ft.Column):
         self.page.update()
 
         try:
-            from okx_client.client import OKXClient
-            client = OKXClient(
-                api_key=self.api_key.value,
-                secret_key=self.secret_key.value,
-                passphrase=self.passphrase.value,
-                demo_mode=self.demo_mode.value
-            )
+            # Для проверки ключей достаточно AccountAPI на общем транспорте:
+            # без БД, потоков и повторного TLS-рукопожатия
+            from okx.Account import AccountAPI
+            from okx_client.managers.account import AccountManager
+            from okx_client.transport import use_transport
+            account_api = use_transport(AccountAPI(
+                self.api_key.value,
+                self.secret_key.value,
+                self.passphrase.value,
+                False,
+                "1" if self.demo_mode.value else "0",
+            ))
 
             # Пробуем получить баланс
-            result = client.account.get_balance()
+            result = AccountManager(account_api).get_balance()
             if result and result.get('code') == '0':
                 self.connection_status.value = f"✅ Подключение успешно! Режим: {'Демо' if self.demo_mode.value else 'Реальный'}"
                 self.connection_status.color = ft.Colors.GREEN
@@ -8,8 +8,28 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from ui.view_manager import ViewManager
+
 logger = logging.getLogger(__name__)
 
+# Представления вкладок (индекс NavigationRail): модуль и класс
+TAB_VIEWS = {
+    0: ('ui.dashboard', 'DashboardView'),
+    1: ('ui.account_view', 'AccountView'),
+    2: ('ui.market_view', 'MarketView'),
+    3: ('ui.trading_view', 'TradingView'),
+    4: ('ui.orders_view', 'OrdersView'),
+}
+
+# Фоновые обновления, нужные каждой вкладке (индекс NavigationRail)
+TAB_JOBS = {
+    0: ('balance',),
+    1: ('balance', 'positions', 'prices', 'fills', 'accounts'),
+    2: ('tickers',),
+    3: ('tickers', 'orders'),
+    4: ('orders',),
+}
+
 
 class OKXDesktopApp:
     def __init__(self, page: ft.Page):
@@ -21,23 +41,42 @@ class OKXDesktopApp:
         self.page.window.min_width = 1200
         self.page.window.min_height = 800
 
+        # Закрытие окна: сначала останавливаем клиента (он сохраняет снимок данных)
+        self.page.window.prevent_close = True
+        self.page.window.on_event = self.on_window_event
+
         self.okx_client = None
         self.initialize_ui()
         self.check_and_init_client()
 
     def check_and_init_client(self):
-        """Проверка и инициализация клиента"""
+        """Проверка конфигурации и запуск инициализации клиента в фоне"""
+        from okx_client.config import Config
+
+        # Проверяем наличие конфигурации (не нужна при подключении к сервису)
+        if not Config.SERVICE_ADDR and not (Config.API_KEY and Config.API_SECRET and Config.PASSPHRASE):
+            self.show_config_dialog()
+            return
+
+        # Клиент (импорт SDK, БД, WebSocket) создается в фоне: оболочка уже на экране
+        self.page.run_thread(self.init_client)
+
+    def init_client(self):
+        """Инициализация клиента (фоновый поток)"""
         try:
             from okx_client.config import Config
-            from okx_client.client import OKXClient
 
-            # Проверяем наличие конфигурации
-            if not Config.API_KEY or not Config.API_SECRET or not Config.PASSPHRASE:
-                self.show_config_dialog()
-                return
+            # Старый клиент останавливаем вместе с фоновыми обновлениями
+            if self.okx_client:
+                self.okx_client.close()
 
-            # Инициализируем клиента
-            self.okx_client = OKXClient()
+            if Config.SERVICE_ADDR:
+                # Подключение к запущенному headless-сервису вместо своего клиента
+                from okx_client.remote import RemoteClient
+                self.okx_client = RemoteClient(Config.SERVICE_ADDR)
+            else:
+                from okx_client.client import OKXClient
+                self.okx_client = OKXClient()
 
             # Перезагружаем интерфейс с клиентом
             self.initialize_main_interface()
@@ -47,6 +86,15 @@ class OKXDesktopApp:
             self.show_error_dialog(f"Ошибка инициализации: {str(e)}")
             self.show_config_dialog()
 
+    def on_window_event(self, e):
+        if e.type == ft.WindowEventType.CLOSE:
+            if self.okx_client:
+                try:
+                    self.okx_client.close()
+                except Exception as ex:
+                    logger.error(f"Ошибка закрытия клиента: {ex}")
+            self.page.window.destroy()
+
     def initialize_ui(self):
         """Начальная инициализация UI (до клиента)"""
         self.appbar = ft.AppBar(
@@ -120,7 +168,7 @@ class OKXDesktopApp:
             content=ft.Row([
                 ft.Text("✅ Подключено", color=ft.Colors.GREEN),
                 ft.Divider(height=20),
-                ft.Text("Последнее обновление: --:--:--"),
+                ft.Text(self._snapshot_status()),
                 ft.Divider(height=20),
                 ft.Text(f"Режим: {'Тестовый' if self.okx_client.demo_mode else 'Рабочий'}"),
             ], alignment=ft.MainAxisAlignment.START),
@@ -129,14 +177,16 @@ class OKXDesktopApp:
             height=40
         )
 
-        # Основной контент
+        # Основной контент: представления создаются один раз и кэшируются
+        self.views = ViewManager(self.page, self.okx_client, TAB_VIEWS)
         self.content_area = ft.Container(
+            content=self.views.stack,
             expand=True,
             padding=20
         )
 
         # Загружаем начальный view
-        self.load_dashboard()
+        self.views.show(0)
 
         # Собираем layout
         self.page.add(
@@ -153,60 +203,41 @@ class OKXDesktopApp:
 
         self.page.update()
 
+        # Фоновые обновления только для видимой вкладки
+        poller = self.okx_client.poller
+        for name in ('balance', 'positions', 'orders', 'tickers', 'prices', 'fills'):
+            poller.subscribe(name, self.on_data_refreshed)
+        poller.set_active(TAB_JOBS[0])
+        poller.start()
+
+    def _snapshot_status(self) -> str:
+        """Подпись статус-бара до первого живого обновления"""
+        snapshot = getattr(self.okx_client, 'snapshot', None)
+        if snapshot is None or snapshot.saved_at is None:
+            return "Последнее обновление: --:--:--"
+        saved_at = datetime.fromtimestamp(snapshot.saved_at).strftime('%d.%m %H:%M')
+        return f"Данные снимка от {saved_at}, обновление..."
+
+    def on_data_refreshed(self, name, changes):
+        """Отметка времени последнего фонового обновления"""
+        if self.okx_client.poller.is_stale(name):
+            return
+        self.status_bar.content.controls[2].value = f"Последнее обновление: {datetime.now().strftime('%H:%M:%S')}"
+        self.status_bar.update()
+
     def on_nav_change(self, e):
         """Обработчик смены раздела"""
         index = e.control.selected_index
-        if index == 0:
-            self.load_dashboard()
-        elif index == 1:
-            self.load_account_view()
-        elif index == 2:
-            self.load_market_view()
-        elif index == 3:
-            self.load_trading_view()
-        elif index == 4:
-            self.load_orders_view()
-
-    def load_dashboard(self):
-        """Загрузка дашборда"""
-        from ui.dashboard import DashboardView
-        self.content_area.content = DashboardView(self.okx_client)
-        self.page.update()
-
-    def load_account_view(self):
-        """Загрузка представления аккаунта"""
-        from ui.account_view import AccountView
-        self.content_area.content = AccountView(self.okx_client)
-        self.page.update()
-
-    def load_market_view(self):
-        """Загрузка представления рынка"""
-        from ui.market_view import MarketView
-        self.content_area.content = MarketView(self.okx_client)
-        self.page.update()
-
-    def load_trading_view(self):
-        """Загрузка представления торговли"""
-        from ui.trading_view import TradingView
-        self.content_area.content = TradingView(self.okx_client)
-        self.page.update()
-
-    def load_orders_view(self):
-        """Загрузка представления ордеров"""
-        from ui.orders_view import OrdersView
-        self.content_area.content = OrdersView(self.okx_client)
-        self.page.update()
+        self.okx_client.poller.set_active(TAB_JOBS.get(index, ()))
+        self.views.show(index)
 
     def refresh_data(self, e):
         """Обновление всех данных"""
         self.status_bar.content.controls[2].value = f"Последнее обновление: {datetime.now().strftime('%H:%M:%S')}"
-        # Обновляем текущий view
-        current_index = self.nav_rail.selected_index
-        if current_index == 0:
-            self.load_dashboard()
-        elif current_index == 1:
-            self.load_account_view()
-        # ... другие view
+        # Внеочередное обновление активных задач: представления получат изменения по подписке
+        self.okx_client.poller.trigger()
+        if self.nav_rail.selected_index == 0:
+            self.views.show(0, rebuild=True)
         self.page.update()
 
     def open_settings(self, e):
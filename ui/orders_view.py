@@ -1,15 +1,89 @@
 # ui/orders_view.py
 import flet as ft
 
+from ui.components.data_table import KeyedDataTable, TableColumn
+
 
 class OrdersView(ft.Column):
+    PAGE_SIZE = 100
+
     def __init__(self, okx_client):
         super().__init__()
         self.okx_client = okx_client
         self.expand = True
+        self.scroll = ft.ScrollMode.AUTO
+        self._cursor = None
+
+        # Фильтры истории
+        self.symbol_filter = ft.TextField(label="Инструмент", width=180, on_submit=self.apply_filters)
+        self.status_filter = ft.Dropdown(
+            label="Статус",
+            width=180,
+            options=[
+                ft.dropdown.Option("", "Все"),
+                ft.dropdown.Option("live", "Активные"),
+                ft.dropdown.Option("partially_filled", "Частично исполнены"),
+                ft.dropdown.Option("filled", "Исполнены"),
+                ft.dropdown.Option("canceled", "Отменены"),
+            ],
+            value="",
+            on_change=self.apply_filters,
+        )
+
+        number = lambda value: "" if value is None else f"{value:.8g}"
+        self.orders_table = KeyedDataTable(
+            columns=[
+                TableColumn("created_at", "Время", fmt=lambda value: value.strftime('%Y-%m-%d %H:%M:%S')),
+                TableColumn("symbol", "Инструмент"),
+                TableColumn("side", "Сторона"),
+                TableColumn("order_type", "Тип"),
+                TableColumn("price", "Цена", numeric=True, fmt=number),
+                TableColumn("quantity", "Количество", numeric=True, fmt=number),
+                TableColumn("status", "Статус"),
+            ],
+            key="order_id",
+            page_size=self.PAGE_SIZE,
+        )
+        self.load_more_btn = ft.TextButton("Загрузить еще", on_click=self.load_more, visible=False)
 
         self.controls = [
             ft.Text("Ордера", size=24, weight=ft.FontWeight.BOLD),
-            ft.Text("Здесь будут активные и исторические ордера"),
-            # Добавьте таблицу с ордерами
+            ft.Row([self.symbol_filter, self.status_filter], spacing=20),
+            ft.Container(
+                content=self.orders_table,
+                border=ft.border.all(1, ft.Colors.OUTLINE),
+                border_radius=10,
+                padding=10,
+            ),
+            self.load_more_btn,
         ]
+
+    def did_mount(self):
+        # История читается из локальной БД после первой отрисовки
+        self.page.run_thread(self.load_page)
+
+    def apply_filters(self, e):
+        """Новые фильтры - выборка с первой страницы"""
+        self._cursor = None
+        self.orders_table.set_data([])
+        self.load_page()
+
+    def load_more(self, e):
+        self.load_page()
+
+    def load_page(self):
+        """Следующая страница истории (keyset-пагинация, кортежи колонок)"""
+        try:
+            rows, self._cursor = self.okx_client.trader.get_order_history(
+                symbol=self.symbol_filter.value or None,
+                status=self.status_filter.value or None,
+                limit=self.PAGE_SIZE,
+                cursor=self._cursor,
+            )
+            # Показываем только что загруженную страницу
+            self.orders_table.offset = len(self.orders_table) // self.PAGE_SIZE * self.PAGE_SIZE
+            self.orders_table.upsert(dict(row._mapping) for row in rows)
+            self.load_more_btn.visible = self._cursor is not None
+            self.update()
+        except Exception as e:
+            print(f"Ошибка загрузки истории ордеров: {e}")
@@ -1,6 +1,8 @@
 # ui/trading_view.py
 import flet as ft
 
+from okx_client.config import Config
+
 
 class TradingView(ft.Column):
     def __init__(self, okx_client):
@@ -59,6 +61,7 @@ class TradingView(ft.Column):
         )
 
         self.total_cost = ft.Text("Стоимость: $0.00", size=12)
+        self.book_info = ft.Text("", size=12, color=ft.Colors.GREY)
 
         self.place_order_btn = ft.ElevatedButton(
             "Разместить ордер",
@@ -68,6 +71,12 @@ class TradingView(ft.Column):
             style=ft.ButtonStyle(padding=20)
         )
 
+        self.cancel_all_btn = ft.OutlinedButton(
+            "Отменить все",
+            icon=ft.Icons.CANCEL,
+            on_click=self.cancel_all_orders,
+        )
+
         self.controls = [
             ft.Text("Торговля", size=24, weight=ft.FontWeight.BOLD),
             ft.Row([
@@ -96,9 +105,13 @@ class TradingView(ft.Column):
                 ft.Column([
                     ft.Text(" "),
                     self.total_cost,
+                    self.book_info,
                 ]),
             ], wrap=True, spacing=20),
-            ft.Container(self.place_order_btn, padding=20),
+            ft.Row([
+                ft.Container(self.place_order_btn, padding=20),
+                self.cancel_all_btn,
+            ]),
             ft.Divider(),
             ft.Text("Активные ордера", size=18),
             ft.Container(
@@ -123,7 +136,9 @@ class TradingView(ft.Column):
         self.quantity.on_change = self.calculate_total
         self.price.on_change = self.calculate_total
 
-        self.load_instruments()
+    def did_mount(self):
+        # Справочник может потребовать запроса к бирже - загружаем после отрисовки
+        self.page.run_thread(self.load_instruments)
 
     def on_instrument_change(self, e):
         """Обработчик изменения инструмента"""
@@ -131,7 +146,9 @@ class TradingView(ft.Column):
         if inst_id:
             self.quantity.suffix_text = inst_id.split('-')[0]  # BTC из BTC-USDT
             self.price.suffix_text = inst_id.split('-')[1]  # USDT из BTC-USDT
+            self.okx_client.public.watch_tickers([inst_id])
             self.update_ticker_info(inst_id)
+            self.update_book_info()
 
     def calculate_total(self, e):
         """Расчет общей стоимости"""
@@ -140,35 +157,33 @@ class TradingView(ft.Column):
             price = float(self.price.value or 0)
             total = qty * price
             self.total_cost.value = f"Стоимость: ${total:.2f}"
+            self.update_book_info()
             self.update()
         except:
             self.total_cost.value = "Стоимость: $0.00"
             self.update()
 
     def load_instruments(self):
-        """Загрузка доступных инструментов"""
+        """Загрузка доступных инструментов из локального справочника"""
         try:
-            result = self.okx_client.public.get_instruments(instType="SPOT")
-            if result and result.get('code') == '0':
-                instruments = result.get('data', [])
-                options = []
-                for inst in instruments[:50]:  # Первые 50 инструментов
-                    if inst['instId'].endswith('-USDT'):
-                        options.append(
-                            ft.dropdown.Option(inst['instId'])
-                        )
-                self.instrument_dropdown.options = options
-                if options:
-                    self.instrument_dropdown.value = options[0].key
-                    self.on_instrument_change(None)
-                self.update()
+            instruments = self.okx_client.instruments.ensure("SPOT")
+            options = [
+                ft.dropdown.Option(inst['instId'])
+                for inst in instruments
+                if inst.get('quoteCcy') == 'USDT' and inst.get('state', 'live') == 'live'
+            ][:Config.MAX_TICKERS]
+            self.instrument_dropdown.options = options
+            if options:
+                self.instrument_dropdown.value = options[0].key
+                self.on_instrument_change(None)
+            self.update()
         except Exception as e:
             print(f"Ошибка загрузки инструментов: {e}")
 
     def update_ticker_info(self, inst_id):
         """Обновление информации о тикере"""
         try:
-            result = self.okx_client.public.get_ticker(instId=inst_id)
+            result = self.okx_client.public.get_ticker(inst_id)
             if result and result.get('code') == '0':
                 ticker = result.get('data', [{}])[0]
                 self.instrument_info.value = f"Последняя цена: {ticker.get('last', 'N/A')} | 24h Изм: {ticker.get('vol24h', 'N/A')}"
@@ -178,6 +193,31 @@ class TradingView(ft.Column):
         except Exception as e:
             print(f"Ошибка получения тикера: {e}")
 
+    def update_book_info(self):
+        """Лучшие цены и оценка проскальзывания рыночного ордера по стакану"""
+        inst_id = self.instrument_dropdown.value
+        if not inst_id:
+            return
+        try:
+            book = self.okx_client.public.get_order_book(inst_id)
+        except Exception as e:
+            print(f"Ошибка получения стакана: {e}")
+            book = None
+        if book is None or book.best_bid() is None or book.best_ask() is None:
+            self.book_info.value = ""
+            return
+
+        text = f"Bid: {book.best_bid()[0]} | Ask: {book.best_ask()[0]}"
+        try:
+            qty = float(self.quantity.value or 0)
+        except ValueError:
+            qty = 0
+        side = list(self.side.selected)[0] if self.side.selected else "buy"
+        estimate = book.estimate_fill(side, qty)
+        if estimate:
+            text += f" | Ср. цена: {estimate['avg_price']:.8g} | Проскальзывание: {estimate['slippage']:.3%}"
+        self.book_info.value = text
+
     def place_order(self, e):
         """Размещение ордера"""
         if not all([self.instrument_dropdown.value, self.quantity.value]):
@@ -186,15 +226,26 @@ class TradingView(ft.Column):
             )
             return
 
+        # Проверка шага цены и размера по справочнику (без запросов к бирже)
+        px = self.price.value if self.order_type.value == "limit" else None
+        error = self.okx_client.instruments.validate_order(
+            self.instrument_dropdown.value, self.quantity.value, px
+        )
+        if error:
+            e.page.show_snack_bar(
+                ft.SnackBar(ft.Text(error), bgcolor=ft.Colors.RED)
+            )
+            return
+
         try:
             # Определяем сторону
             side = list(self.side.selected)[0] if self.side.selected else "buy"
 
             order_data = {
-                "instId": self.instrument_dropdown.value,
-                "tdMode": "cash",  # Spot trading
+                "inst_id": self.instrument_dropdown.value,
+                "td_mode": "cash",  # Spot trading
                 "side": side,
-                "ordType": self.order_type.value,
+                "ord_type": self.order_type.value,
                 "sz": self.quantity.value,
             }
 
@@ -235,3 +286,18 @@ class TradingView(ft.Column):
                     bgcolor=ft.Colors.RED
                 )
             )
+
+    def cancel_all_orders(self, e):
+        """Отмена всех активных ордеров выбранного инструмента (пакетами)"""
+        inst_id = self.instrument_dropdown.value
+        if not inst_id:
+            # Без инструмента отмена затронула бы все ордера аккаунта
+            e.page.show_snack_bar(ft.SnackBar(ft.Text("Выберите инструмент"), bgcolor=ft.Colors.ORANGE))
+            return
+        result = self.okx_client.trader.cancel_all(inst_id)
+        if result.get('code') == '0':
+            message, color = f"Отменено ордеров: {len(result.get('data', []))}", ft.Colors.GREEN
+        else:
+            failed = [item for item in result.get('data', []) if item.get('sCode') != '0']
+            message, color = f"Ошибка отмены: {failed[0].get('sMsg') if failed else result.get('msg')}", ft.Colors.RED
+        e.page.show_snack_bar(ft.SnackBar(ft.Text(message), bgcolor=color))
@@ -0,0 +1,84 @@
+# ui/view_manager.py
+import flet as ft
+import importlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ViewManager:
+    """
+    Кэш представлений для навигации.
+
+    Каждое представление создается один раз при первом открытии вкладки
+    и остается смонтированным в общем Stack; переключение вкладки лишь
+    меняет visible у двух контролов, поэтому состояние (введенные поля,
+    выбранный инструмент, таблицы) сохраняется, а повторных запросов к
+    API нет. Данные представления загружают сами в did_mount - уже после
+    первой отрисовки. При превышении max_cached самое давно открытое
+    скрытое представление выгружается.
+    """
+
+    def __init__(self, page: ft.Page, okx_client, views: Dict[int, Tuple[str, str]],
+                 max_cached: int = 5):
+        """
+        Args:
+            page: Страница Flet
+            okx_client: OKXClient, передаваемый в конструкторы представлений
+            views: Индекс вкладки -> (модуль, имя класса)
+            max_cached: Сколько представлений держать смонтированными
+        """
+        self.page = page
+        self.okx_client = okx_client
+        self.views = views
+        self.max_cached = max_cached
+        self.current: Optional[int] = None
+        self.stack = ft.Stack(expand=True)
+        self._cache: "OrderedDict[int, ft.Control]" = OrderedDict()
+
+    def _build(self, index: int) -> ft.Control:
+        module_name, class_name = self.views[index]
+        view_class = getattr(importlib.import_module(module_name), class_name)
+        view = view_class(self.okx_client)
+        view.visible = False
+        return view
+
+    def show(self, index: int, rebuild: bool = False):
+        """Показать вкладку, создав ее представление при первом обращении"""
+        started = time.perf_counter()
+        if rebuild:
+            self.discard(index)
+
+        view = self._cache.get(index)
+        if view is None:
+            view = self._build(index)
+            self._cache[index] = view
+            self.stack.controls.append(view)
+        self._cache.move_to_end(index)
+
+        previous = self._cache.get(self.current)
+        if previous is not None and previous is not view:
+            previous.visible = False
+        view.visible = True
+        self.current = index
+        self._evict()
+
+        if self.stack.page:
+            self.stack.update()
+        logger.debug("Вкладка %s открыта за %.1f мс", index, (time.perf_counter() - started) * 1000)
+
+    def discard(self, index: int):
+        """Выгрузить представление (при следующем открытии оно будет создано заново)"""
+        view = self._cache.pop(index, None)
+        if view is not None:
+            self.stack.controls.remove(view)
+
+    def _evict(self):
+        while len(self._cache) > self.max_cached:
+            oldest = next(iter(self._cache))
+            if oldest == self.current:
+                break
+            self.discard(oldest)